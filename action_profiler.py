@@ -0,0 +1,256 @@
+# action_profiler.py
+"""
+Opt-in profiling of page actions, for "this page is slow" reports.
+
+With MIS_PROFILE set, main.py instruments each page class as it is
+built: the methods named like actions (load_*, search_*, add_*,
+create_*, update_*, delete_*, export_*, import_*, on_search) run in a
+profiling session. The session follows the action onto the query
+executor's workers and CSV export threads, and ends when the last of
+their results has been delivered. Each session writes to MIS_PROFILE_DIR
+(default ./profiles):
+    <time>_<Page.method>.pstats   cProfile of every participating thread
+                                  (python -m pstats, snakeviz, ...)
+    <time>_<Page.method>.folded   sampled stacks, one "a;b;c count" line per
+                                  stack (flamegraph.pl, speedscope)
+
+    MIS_PROFILE=1           both
+    MIS_PROFILE=cprofile    .pstats only (exact call counts, slows Python code down)
+    MIS_PROFILE=sample      .folded only (a stack every SAMPLE_INTERVAL, cheap)
+
+When MIS_PROFILE is unset nothing is wrapped: the page methods are the
+plain functions, and the executor hooks return at once.
+"""
+import contextlib
+import cProfile
+import functools
+import inspect
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+MODE = os.environ.get("MIS_PROFILE", "").lower()
+ENABLED = MODE not in ("", "0")
+USE_CPROFILE = ENABLED and MODE != "sample"
+USE_SAMPLER = ENABLED and MODE != "cprofile"
+PROFILE_DIR = os.environ.get("MIS_PROFILE_DIR", "profiles")
+
+SAMPLE_INTERVAL = 0.001     # seconds between stack samples
+ACTION_METHODS = re.compile(
+    r"^(load_|search_|add_|create_|update_|delete_|export_|import_)|^on_search$"
+)
+
+_local = threading.local()
+_active = set()             # running sessions, sampled by the sampler thread
+_active_lock = threading.Lock()
+_wakeup = threading.Event()
+_sampler = None
+
+
+class Session:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.profiles = []          # one cProfile.Profile per thread activation
+        self.samples = Counter()    # collapsed stack -> samples
+        self.threads = Counter()    # thread ident -> activations running
+
+        self._lock = threading.Lock()
+        self._holds = 0
+        self._closed = False
+        self._finished = False
+
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+
+    def release(self):
+        with self._lock:
+            self._holds -= 1
+            done = self._closed and self._holds <= 0 and not self._finished
+            self._finished = self._finished or done
+        if done:
+            _finish(self)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            done = self._holds <= 0 and not self._finished
+            self._finished = self._finished or done
+        if done:
+            _finish(self)
+
+
+# ---------- Sessions across threads ----------
+
+def current():
+    return getattr(_local, "session", None)
+
+
+def hold():
+    """The current session, kept open until release() (work handed to another thread)."""
+    session = current()
+    if session is not None:
+        session.hold()
+    return session
+
+
+def release(session):
+    if session is not None:
+        session.release()
+
+
+def activate(session):
+    """Run the with-block as part of `session` (profiled on this thread)."""
+    if session is None or current() is session:
+        return contextlib.nullcontext()
+    return _activated(session)
+
+
+@contextlib.contextmanager
+def _activated(session):
+    previous = current()
+    _local.session = session
+    ident = threading.get_ident()
+    with session._lock:
+        session.threads[ident] += 1
+    profiler = None
+    if USE_CPROFILE and previous is None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield session
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        with session._lock:
+            if profiler is not None:
+                session.profiles.append(profiler)
+            session.threads[ident] -= 1
+            if not session.threads[ident]:
+                del session.threads[ident]
+        _local.session = previous
+
+
+def run(name: str, fn, *args, **kwargs):
+    """fn(*args, **kwargs) in a new session named `name` (or the current one)."""
+    if current() is not None:
+        return fn(*args, **kwargs)
+    session = Session(name)
+    _start_sampling(session)
+    try:
+        with _activated(session):
+            return fn(*args, **kwargs)
+    finally:
+        session.close()
+
+
+# ---------- Instrumenting page classes ----------
+
+def instrument(cls):
+    """Wrap the action methods of `cls` in place (once); a no-op when disabled."""
+    if not ENABLED or cls.__dict__.get("_profiled_actions"):
+        return cls
+    for name, fn in list(vars(cls).items()):
+        if inspect.isfunction(fn) and ACTION_METHODS.search(name):
+            setattr(cls, name, _profiled(f"{cls.__name__}.{name}", fn))
+    cls._profiled_actions = True
+    return cls
+
+
+def _profiled(label, fn):
+    # Qt drops the signal arguments a slot cannot take (clicked's `checked`);
+    # the wrapper takes any, so it drops them itself
+    parameters = inspect.signature(fn).parameters.values()
+    if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+        max_positional = None
+    else:
+        max_positional = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if max_positional is not None:
+            args = args[:max_positional]
+        return run(label, fn, *args, **kwargs)
+    return wrapper
+
+
+# ---------- Stack sampling ----------
+
+def _start_sampling(session):
+    global _sampler
+    if not USE_SAMPLER:
+        return
+    with _active_lock:
+        _active.add(session)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="action-profiler", daemon=True)
+            _sampler.start()
+    _wakeup.set()
+
+
+def _sample_loop():
+    main_ident = threading.main_thread().ident
+    while True:
+        with _active_lock:
+            sessions = list(_active)
+        if not sessions:
+            _wakeup.wait()
+            _wakeup.clear()
+            continue
+
+        frames = sys._current_frames()
+        for session in sessions:
+            with session._lock:
+                for ident in session.threads:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        root = "main" if ident == main_ident else "worker"
+                        session.samples[_collapse(frame, root)] += 1
+        del frames
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def _collapse(frame, root: str) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+# ---------- Output ----------
+
+def _finish(session):
+    with _active_lock:
+        _active.discard(session)
+    wall_ms = (time.perf_counter() - session.started) * 1000
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+    stem = os.path.join(PROFILE_DIR, f"{stamp}_{re.sub(r'[^A-Za-z0-9_.-]', '_', session.name)}")
+    written = []
+    if session.profiles:
+        stats = pstats.Stats(session.profiles[0])
+        for profiler in session.profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(stem + ".pstats")
+        written.append(stem + ".pstats")
+    with session._lock:
+        samples = sorted(session.samples.items())
+    if samples:
+        with open(stem + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in samples:
+                f.write(f"{stack} {count}\n")
+        written.append(stem + ".folded")
+
+    print(f"[profile] {session.name}: {wall_ms:.0f} ms -> {', '.join(written) or 'nothing'}",
+          file=sys.stderr)
@@ -0,0 +1,262 @@
+# analytics_export.py
+"""
+Columnar export of whole tables for analytics (Parquet or Arrow IPC).
+
+Each table is read with Core selects in batches (yield_per, one stream
+per table) and written batch by batch, so memory stays flat whatever the
+table size. Column types come from models.py: integers stay integers
+(level, credits, semester...), dates stay dates, grade points stay
+floats, and NULLs stay nulls - no CSV round trip.
+
+    --denormalize           add the department and faculty names (and for
+                            enrollments the student and course columns an
+                            analysis needs), so no join is needed later
+    --partition-by-year     enrollments only: one file per academic year,
+                            Hive style (enrollments/academic_year=2025%2F2026/),
+                            read back with pyarrow.dataset / pandas / DuckDB
+
+Needs pyarrow (pip install pyarrow); the app itself does not.
+
+Headless usage:
+    python analytics_export.py exports/ [--tables students enrollments] [--denormalize]
+                               [--partition-by-year] [--format parquet|arrow]
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from urllib.parse import quote
+
+from sqlalchemy import Date, Float, Integer, select
+
+from database import engine
+from models import Student, Course, Instructor, Enrollment, Department, Faculty
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # optional: only this export needs it
+    pa = None
+
+
+TABLES = {
+    "students": Student,
+    "courses": Course,
+    "instructors": Instructor,
+    "enrollments": Enrollment,
+}
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+DEFAULT_BATCH_SIZE = 50_000
+PARTITION_COLUMN = "academic_year"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"     # pyarrow's name for a NULL value
+
+
+@dataclass
+class ExportReport:
+    rows: dict = field(default_factory=dict)       # table -> rows written
+    files: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        tables = ", ".join(f"{table} {rows:,}" for table, rows in self.rows.items())
+        return f"{tables} rows in {len(self.files)} file(s), {self.seconds:.2f}s"
+
+
+# ---------- Queries ----------
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def table_query(name: str, denormalize: bool = False):
+    """The Core select of one table's rows, ordered by id."""
+    model = TABLES[name]
+    columns = list(model.__table__.columns)
+    query = select(*columns)
+    if not denormalize:
+        return query.order_by(model.id)
+
+    if name == "enrollments":
+        # the course's department, like the enrollment list view
+        query = (
+            select(
+                *columns,
+                Student.university_id.label("university_id"),
+                Student.level.label("student_level"),
+                Course.code.label("course_code"),
+                Course.name.label("course_name"),
+                Course.credits.label("credits"),
+                Department.name.label("department"),
+                Faculty.name.label("faculty"),
+            )
+            .join(Student, Enrollment.student_id == Student.id)
+            .join(Course, Enrollment.course_id == Course.id)
+            .outerjoin(Department, Course.department_id == Department.id)
+        )
+    else:
+        extra = [Department.name.label("department"), Faculty.name.label("faculty")]
+        if name == "courses":
+            extra.append(Instructor.full_name.label("instructor"))
+        query = select(*columns, *extra).outerjoin(Department, model.department_id == Department.id)
+        if name == "courses":
+            query = query.outerjoin(Instructor, Course.instructor_id == Instructor.id)
+
+    return query.outerjoin(Faculty, Department.faculty_id == Faculty.id).order_by(model.id)
+
+
+def query_schema(query):
+    return pa.schema([
+        pa.field(column.name, _arrow_type(column)) for column in query.selected_columns
+    ])
+
+
+# ---------- Writing ----------
+
+class _Writer:
+    """One output file, written a record batch at a time."""
+
+    def __init__(self, path, schema, file_format):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._sink = None
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _record_batch(rows, schema):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=f.type) for values, f in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def partition_dir(value) -> str:
+    return f"{PARTITION_COLUMN}={NULL_PARTITION if value is None else quote(str(value), safe='')}"
+
+
+def export_table(conn, name, out_dir, file_format="parquet", denormalize=False,
+                 partition_by_year=False, batch_size=DEFAULT_BATCH_SIZE, report=None):
+    """Write one table; returns the number of rows written."""
+    query = table_query(name, denormalize)
+    schema = query_schema(query)
+    extension = FORMATS[file_format]
+    partitioned = partition_by_year and name == "enrollments"
+
+    if partitioned:
+        # the value lives in the directory name (Hive style), not in the files
+        year_index = schema.get_field_index(PARTITION_COLUMN)
+        file_schema = schema.remove(year_index)
+        keep = [i for i in range(len(schema)) if i != year_index]
+    writers = {}
+    rows_written = 0
+
+    result = conn.execution_options(yield_per=batch_size).execute(query)
+    try:
+        for rows in result.partitions():
+            if not partitioned:
+                writer = writers.get(None)
+                if writer is None:
+                    writer = writers[None] = _Writer(
+                        os.path.join(out_dir, name + extension), schema, file_format)
+                writer.write(_record_batch(rows, schema))
+            else:
+                by_year = {}
+                for row in rows:
+                    by_year.setdefault(row[year_index], []).append([row[i] for i in keep])
+                for year, year_rows in by_year.items():
+                    writer = writers.get(year)
+                    if writer is None:
+                        writer = writers[year] = _Writer(
+                            os.path.join(out_dir, name, partition_dir(year), "part-0" + extension),
+                            file_schema, file_format)
+                    writer.write(_record_batch(year_rows, file_schema))
+            rows_written += len(rows)
+    finally:
+        result.close()
+        for writer in writers.values():
+            writer.close()
+
+    if not writers:
+        # an empty table still gets a file with its schema
+        writer = _Writer(os.path.join(out_dir, name + extension), schema, file_format)
+        writer.close()
+        writers[None] = writer
+
+    if report is not None:
+        report.rows[name] = rows_written
+        report.files.extend(writer.path for writer in writers.values())
+    return rows_written
+
+
+def export_tables(out_dir, tables=tuple(TABLES), file_format="parquet", denormalize=False,
+                  partition_by_year=False, batch_size=DEFAULT_BATCH_SIZE, bind=engine) -> ExportReport:
+    """Export `tables` into `out_dir`; all are read from one snapshot."""
+    if pa is None:
+        raise RuntimeError("The analytics export needs pyarrow: pip install pyarrow")
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}' (parquet or arrow)")
+
+    started = time.perf_counter()
+    report = ExportReport()
+    # one read transaction: the tables agree with each other. pysqlite only
+    # opens a transaction for writes, so take the snapshot explicitly (WAL:
+    # the export does not block writers, it just does not see them)
+    with bind.connect() as conn, conn.begin():
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN")
+        for name in tables:
+            export_table(conn, name, out_dir, file_format, denormalize,
+                         partition_by_year, batch_size, report)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tables to Parquet / Arrow for analytics.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES))
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--denormalize", action="store_true",
+                        help="add department/faculty names (and student/course columns to enrollments)")
+    parser.add_argument("--partition-by-year", action="store_true",
+                        help="one enrollments file per academic year (Hive-style directories)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        report = export_tables(args.out_dir, args.tables, args.format, args.denormalize,
+                               args.partition_by_year, args.batch_size)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for path in report.files:
+        print(path)
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# api_client.py
+"""
+How the pages reach the operations in operations.py.
+
+Standalone (the default) every call runs in this process, against the
+local database. With MIS_SERVER_URL set (e.g. http://10.0.0.5:8765) the
+desk is a client of server.py: calls are POSTed as JSON and no local
+database is opened at all.
+
+    api_client.call("students.get", id=42)
+    api_client.batch([("stats.dashboard", {}), ("reference.data", {})])
+
+A remote desk logs in first (the login window's auth.login); the token
+the server returns is kept for the process and sent with every request.
+
+Each thread keeps one keep-alive HTTP connection to the server, so the
+query executor's workers do not reconnect for every window of rows.
+"""
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+import operations
+from operations import OperationError, NotFound, Conflict
+import reference_cache
+import sql_trace
+
+
+SERVER_URL = os.environ.get("MIS_SERVER_URL", "").rstrip("/")
+REMOTE = bool(SERVER_URL)
+
+TIMEOUT_SECONDS = 30
+# other desks change faculties/departments/courses without us noticing
+REMOTE_REFERENCE_MAX_AGE = 60
+
+_local = threading.local()
+_token = None       # from the server's auth.login, shared by every thread
+
+
+class ServerUnavailable(OperationError):
+    status = 503
+
+
+class NotLoggedIn(OperationError):
+    status = 401
+
+
+_ERRORS = {400: OperationError, 401: NotLoggedIn, 404: NotFound, 409: Conflict}
+
+
+# ---------- HTTP transport ----------
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        parts = urlsplit(SERVER_URL)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=TIMEOUT_SECONDS)
+        _local.conn = conn
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        conn.close()
+
+
+def post(path: str, payload):
+    """POST `payload` as JSON to the server; the decoded JSON reply."""
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if _token is not None:
+        headers["Authorization"] = f"Bearer {_token}"
+
+    reused = getattr(_local, "conn", None) is not None
+    try:
+        data, status = _send(path, body, headers)
+    except (ConnectionError, http.client.HTTPException, OSError) as e:
+        _drop_connection()
+        # a kept-alive connection the server closed while idle: retry once on
+        # a fresh one (never the fresh one itself, the request may have run)
+        if not reused:
+            raise ServerUnavailable(f"Server {SERVER_URL} unavailable: {e}") from None
+        try:
+            data, status = _send(path, body, headers)
+        except (ConnectionError, http.client.HTTPException, OSError) as e:
+            _drop_connection()
+            raise ServerUnavailable(f"Server {SERVER_URL} unavailable: {e}") from None
+
+    reply = json.loads(data) if data else None
+    if status != 200:
+        message = reply.get("error") if isinstance(reply, dict) else None
+        raise _ERRORS.get(status, OperationError)(message or f"HTTP {status}")
+    return reply
+
+
+def _send(path, body, headers):
+    conn = _connection()
+    conn.request("POST", path, body, headers)
+    response = conn.getresponse()
+    return response.read(), response.status
+
+
+# ---------- Calls ----------
+
+def call(name: str, db=None, **params):
+    """Run operation `name` locally (in `db`, or its own unit of work) or on the server."""
+    sql_trace.enter(name)
+    if REMOTE:
+        result = post(f"/api/{name}", params)
+        if name == "auth.login" and result:
+            _remember_login(result)
+        _after_remote_write(name)
+        return result
+    if db is not None:
+        return operations.run(db, name, params)
+    return operations.run_in_scope(name, params)
+
+
+def batch(calls, db=None) -> list:
+    """Run several (name, params) operations in one round trip; their results in order.
+
+    The calls are one unit of work: if any fails, it raises like call()
+    would and none of their writes are kept.
+    """
+    calls = list(calls)
+    for name, _ in calls:
+        sql_trace.enter(name)
+    if REMOTE:
+        results = post("/batch", [{"op": name, "params": params} for name, params in calls])
+        for name, _ in calls:
+            _after_remote_write(name)
+        return results
+
+    if db is not None:
+        return [operations.run(db, name, params) for name, params in calls]
+    return operations.run_batch_in_scope(calls)
+
+
+def _remember_login(user: dict):
+    global _token
+    _token = user.pop("token", None)
+
+
+def _after_remote_write(name: str):
+    # the server commits, so the local commit listener never sees these
+    if name.startswith("courses.") and name.rsplit(".", 1)[1] in (
+        "create", "create_with_slots", "update", "delete",
+    ):
+        reference_cache.invalidate()
+
+
+def _load_reference():
+    return reference_cache.ReferenceData.from_lists(call("reference.data"))
+
+
+if REMOTE:
+    reference_cache.use_loader(_load_reference, REMOTE_REFERENCE_MAX_AGE)
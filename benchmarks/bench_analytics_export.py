@@ -0,0 +1,112 @@
+# benchmarks/bench_analytics_export.py
+"""
+Weekly analytics extract: CSV (what export_to_csv produces) vs. Parquet.
+
+Builds a synthetic database (seed_data), then for the enrollments table,
+denormalized with student, course, department and faculty columns:
+    - writes it as CSV (csv.writer over the same batched Core read) and
+      with analytics_export (Parquet, zstd),
+    - reads each back into typed columns: the CSV parsed with csv.reader
+      and converted field by field (ints, floats, empty = NULL), the
+      Parquet file with pyarrow.parquet.read_table.
+Reported: seconds for each step and the file sizes.
+
+Run from the project folder:
+    python -m benchmarks.bench_analytics_export                  # 40k students
+    python -m benchmarks.bench_analytics_export --students 200000
+"""
+import argparse
+import csv
+import os
+import shutil
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="CSV vs. Parquet analytics export.")
+    parser.add_argument("--students", type=int, default=40_000)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--enrollments-per-student", type=int, default=6)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+work_dir = tempfile.mkdtemp()
+db_path = os.path.join(work_dir, "bench.db")
+
+# must be set before the app modules create their engine
+os.environ["MIS_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+import pyarrow.parquet as pq
+from sqlalchemy import Float, Integer
+
+from database import engine
+from migrations import upgrade
+from seed_data import create_initial_data, generate_bulk_data
+import analytics_export
+
+
+def timed(fn, *a, **kw):
+    started = time.perf_counter()
+    result = fn(*a, **kw)
+    return result, time.perf_counter() - started
+
+
+def write_csv(path):
+    query = analytics_export.table_query("enrollments", denormalize=True)
+    with engine.connect() as conn, open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([c.name for c in query.selected_columns])
+        result = conn.execution_options(yield_per=analytics_export.DEFAULT_BATCH_SIZE).execute(query)
+        for rows in result.partitions():
+            writer.writerows(["" if v is None else v for v in row] for row in rows)
+
+
+def read_csv_typed(path):
+    query = analytics_export.table_query("enrollments", denormalize=True)
+    converters = []
+    for column in query.selected_columns:
+        kind = int if isinstance(column.type, Integer) else float if isinstance(column.type, Float) else str
+        converters.append(kind)
+    columns = [[] for _ in converters]
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            for values, convert, value in zip(columns, converters, row):
+                values.append(convert(value) if value != "" else None)
+    return len(columns[0])
+
+
+def main():
+    try:
+        upgrade()
+        print(f"Generating {args.students:,} students ...")
+        create_initial_data()
+        generate_bulk_data(students=args.students, courses=args.courses,
+                           enrollments_per_student=args.enrollments_per_student)
+
+        csv_path = os.path.join(work_dir, "enrollments.csv")
+        out_dir = os.path.join(work_dir, "parquet")
+        _, csv_write = timed(write_csv, csv_path)
+        report, parquet_write = timed(
+            analytics_export.export_tables, out_dir, ["enrollments"], denormalize=True)
+        parquet_path = report.files[0]
+        rows, csv_read = timed(read_csv_typed, csv_path)
+        table, parquet_read = timed(pq.read_table, parquet_path)
+        assert rows == table.num_rows
+
+        print(f"\n  enrollments (denormalized): {rows:,} rows, {table.num_columns} columns")
+        print(f"  {'':<10}{'write s':>9}{'read s':>9}{'MB':>8}")
+        for label, write, read, path in (("CSV", csv_write, csv_read, csv_path),
+                                         ("Parquet", parquet_write, parquet_read, parquet_path)):
+            print(f"  {label:<10}{write:>9.2f}{read:>9.3f}{os.path.getsize(path) / 1e6:>8.1f}")
+    finally:
+        engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_cohort_enrollment.py
+"""
+Cohort enrollment: one set-based INSERT ... SELECT vs. one ORM add per pair.
+
+For each cohort size, enrolls the cohort into COURSES courses on a fresh
+database (other departments/levels make up the rest of the students)
+and then runs the same cohort again, which must insert nothing. The
+per-pair baseline is what clicking "Add" once per pair amounts to.
+
+Run from the project folder:
+    python -m benchmarks.bench_cohort_enrollment              # 5k / 20k / 50k students
+    python -m benchmarks.bench_cohort_enrollment 100000       # custom sizes
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Faculty, Department, Student, Course, Enrollment
+from cohort_enrollment import enroll_cohort
+
+
+DEFAULT_SIZES = [5_000, 20_000, 50_000]
+COURSES = 6
+OTHER_STUDENTS = 50_000         # not in the cohort
+BASELINE_LIMIT = 20_000         # per-pair inserts are only timed up to this many pairs
+
+
+def fill(engine, cohort_size: int):
+    with engine.begin() as conn:
+        conn.execute(insert(Faculty), [{"id": 1, "name": "Faculty"}])
+        conn.execute(insert(Department), [
+            {"id": 1, "name": "Cohort", "faculty_id": 1},
+            {"id": 2, "name": "Other", "faculty_id": 1},
+        ])
+        conn.execute(insert(Course), [
+            {"id": i, "code": f"C{i:03d}", "name": f"Course {i}", "department_id": 1}
+            for i in range(1, COURSES + 1)
+        ])
+        rows = [
+            {"university_id": f"2025-{i:07d}", "full_name": f"Student {i}",
+             "department_id": 1 if i < cohort_size else 2,
+             "level": 1 if i < cohort_size else 1 + i % 4, "status": "active"}
+            for i in range(cohort_size + OTHER_STUDENTS)
+        ]
+        for start in range(0, len(rows), 10_000):
+            conn.execute(insert(Student), rows[start:start + 10_000])
+
+
+def time_set_based(engine, label):
+    started = time.perf_counter()
+    with Session(engine) as db:
+        report = enroll_cohort(db, 1, 1, "2025/2026", 1, list(range(1, COURSES + 1)))
+        db.commit()
+    seconds = time.perf_counter() - started
+    print(f"  {label:<22}{report.inserted:>10,}{report.already_enrolled:>10,}{seconds:>10.2f}")
+
+
+def time_per_pair(engine, cohort_size):
+    pairs = min(cohort_size * COURSES, BASELINE_LIMIT)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        student_ids = [i for (i,) in db.query(Student.id).filter(Student.department_id == 1)]
+        done = 0
+        for student_id in student_ids:
+            for course_id in range(1, COURSES + 1):
+                if done == pairs:
+                    break
+                exists = db.query(Enrollment.id).filter_by(
+                    student_id=student_id, course_id=course_id,
+                    academic_year="2024/2025", semester=1,
+                ).first()
+                if not exists:
+                    db.add(Enrollment(student_id=student_id, course_id=course_id,
+                                      academic_year="2024/2025", semester=1))
+                    db.flush()
+                done += 1
+        db.commit()
+    seconds = time.perf_counter() - started
+    print(f"  {'per pair (ORM)':<22}{pairs:>10,}{0:>10,}{seconds:>10.2f}"
+          + ("" if pairs == cohort_size * COURSES else "   (first pairs only)"))
+
+
+def run(cohort_size: int):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    try:
+        Base.metadata.create_all(engine)
+        fill(engine, cohort_size)
+
+        print(f"\n{cohort_size:,} students x {COURSES} courses")
+        print(f"  {'':<22}{'inserted':>10}{'already':>10}{'seconds':>10}")
+        time_set_based(engine, "set-based")
+        time_set_based(engine, "set-based, again")
+        time_per_pair(engine, cohort_size)
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    for n in sizes:
+        run(n)
@@ -0,0 +1,110 @@
+# benchmarks/bench_engine_profile.py
+"""
+Insert and read throughput under the "default" and "tuned" engine profiles.
+
+Each profile gets a fresh database file and runs the same workload:
+  * single-row inserts, one commit each (like the Add buttons)
+  * batched inserts, one commit per 5000 rows (like the CSV import)
+  * random primary-key lookups (like clicking table rows)
+  * a full list-view scan with a join (like opening the Students page)
+
+Run from the project folder:
+    python -m benchmarks.bench_engine_profile            # 20k rows
+    python -m benchmarks.bench_engine_profile 100000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+
+from database import Base, SQLITE_PROFILES, make_engine
+from models import Student, Department, Faculty
+
+
+DEFAULT_ROWS = 20_000
+SINGLE_INSERTS = 1_000
+LOOKUPS = 5_000
+BATCH = 5_000
+
+
+def student_row(i):
+    return {
+        "university_id": f"2025-{i:07d}",
+        "full_name": f"Student {i}",
+        "email": f"student{i}@example.edu",
+        "phone": f"0100{i:07d}",
+        "level": 1 + i % 4,
+        "department_id": 1 + i % 4,
+    }
+
+
+def run_profile(profile: str, rows: int):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.remove(path)
+    engine = make_engine(f"sqlite:///{path}", profile)
+    results = {}
+
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Faculty).values(id=1, name="Faculty"))
+            conn.execute(insert(Department), [
+                {"id": d, "name": f"Dept {d}", "faculty_id": 1} for d in range(1, 5)
+            ])
+
+        start = time.perf_counter()
+        for i in range(SINGLE_INSERTS):
+            with engine.begin() as conn:
+                conn.execute(insert(Student).values(**student_row(i)))
+        results["single inserts/s"] = SINGLE_INSERTS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for first in range(SINGLE_INSERTS, SINGLE_INSERTS + rows, BATCH):
+            with engine.begin() as conn:
+                conn.execute(insert(Student), [
+                    student_row(i) for i in range(first, min(first + BATCH, SINGLE_INSERTS + rows))
+                ])
+        results["batched inserts/s"] = rows / (time.perf_counter() - start)
+
+        total = SINGLE_INSERTS + rows
+        rnd = random.Random(1)
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            for _ in range(LOOKUPS):
+                conn.execute(
+                    select(Student.full_name).where(Student.id == rnd.randint(1, total))
+                ).first()
+        results["pk lookups/s"] = LOOKUPS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            scanned = len(conn.execute(
+                select(Student.id, Student.full_name, Department.name)
+                .outerjoin(Department, Student.department_id == Department.id)
+            ).all())
+        results["scan rows/s"] = scanned / (time.perf_counter() - start)
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    return results
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    profiles = list(SQLITE_PROFILES)
+    all_results = {p: run_profile(p, rows) for p in profiles}
+
+    print(f"{'metric':<22}" + "".join(f"{p:>14}" for p in profiles) + f"{'speed-up':>11}")
+    for metric in all_results[profiles[0]]:
+        values = [all_results[p][metric] for p in profiles]
+        print(
+            f"{metric:<22}" + "".join(f"{v:>14,.0f}" for v in values)
+            + f"{values[-1] / values[0]:>10.1f}x"
+        )
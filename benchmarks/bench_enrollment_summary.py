@@ -0,0 +1,173 @@
+# benchmarks/bench_enrollment_summary.py
+"""
+Enrollment summary tables: report reads vs. counting on the fly, and
+what the triggers add to writes.
+
+Builds a synthetic database (seed_data), then
+    - times each report (by course, by department, by year) read from
+      the summaries vs. the same GROUP BY over enrollments,
+    - times a bulk insert of --writes enrollments with and without the
+      triggers (dropped and re-created around the second run),
+    - applies random updates / deletes and checks the summaries still
+      match a fresh count.
+
+Run from the project folder:
+    python -m benchmarks.bench_enrollment_summary                 # 40k students
+    python -m benchmarks.bench_enrollment_summary --students 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Enrollment summary tables benchmark.")
+    parser.add_argument("--students", type=int, default=40_000)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--enrollments-per-student", type=int, default=6)
+    parser.add_argument("--writes", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+fd, db_path = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.remove(db_path)
+
+# must be set before the app modules create their engine
+os.environ["MIS_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from migrations import upgrade
+from seed_data import create_initial_data, generate_bulk_data
+import enrollment_summary
+
+
+ACADEMIC_YEAR = "2025/2026"
+TRIGGERS = ["enrollment_counts_ai", "enrollment_counts_ad", "enrollment_counts_au"]
+
+# the same reports, counted from enrollments
+AD_HOC_SQL = {
+    "course": text("""
+        SELECT c.code, c.name, e.status, COUNT(*) FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        GROUP BY c.id, e.status ORDER BY c.code
+    """),
+    "department": text("""
+        SELECT d.name, f.name, e.status, COUNT(*) FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        LEFT JOIN departments d ON d.id = c.department_id
+        LEFT JOIN faculties f ON f.id = d.faculty_id
+        GROUP BY c.department_id, e.status ORDER BY f.name, d.name
+    """),
+    "year": text("""
+        SELECT e.academic_year, e.status, COUNT(*) FROM enrollments e
+        GROUP BY e.academic_year, e.status ORDER BY e.academic_year DESC
+    """),
+}
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def bench_reports(db):
+    print(f"\n  {'report':<14}{'summaries ms':>14}{'GROUP BY ms':>13}")
+    for by in enrollment_summary.GROUPINGS:
+        summary = best_of(lambda: enrollment_summary.report(db, by), args.repeat)
+        ad_hoc = best_of(lambda: db.execute(AD_HOC_SQL[by]).all(), args.repeat)
+        print(f"  {by:<14}{summary * 1000:>14.1f}{ad_hoc * 1000:>13.1f}   ({ad_hoc / summary:.0f}x)")
+
+
+def insert_enrollments(conn, rows):
+    started = time.perf_counter()
+    conn.execute(text("""
+        INSERT INTO enrollments (student_id, course_id, academic_year, semester, status)
+        VALUES (:student_id, :course_id, :academic_year, :semester, 'Enrolled')
+    """), rows)
+    return time.perf_counter() - started
+
+
+def bench_writes():
+    rnd = random.Random(3)
+    with engine.connect() as conn:
+        students = [r[0] for r in conn.execute(text("SELECT id FROM students"))]
+        courses = [r[0] for r in conn.execute(text("SELECT id FROM courses"))]
+    # a year of its own, so the unique (student, course, term) index never trips
+    rows = [{"student_id": s, "course_id": rnd.choice(courses), "semester": 1}
+            for s in rnd.sample(students, min(args.writes, len(students)))]
+
+    with engine.begin() as conn:
+        with_triggers = insert_enrollments(conn, [dict(r, academic_year="2090/2091") for r in rows])
+    with engine.begin() as conn:
+        for trigger in TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER {trigger}"))
+        without = insert_enrollments(conn, [dict(r, academic_year="2091/2092") for r in rows])
+        conn.execute(text("DELETE FROM enrollments WHERE academic_year = '2091/2092'"))
+        enrollment_summary.create_enrollment_summary(conn)
+
+    print(f"\n  insert {len(rows):,} enrollments: {with_triggers:.3f}s with triggers, "
+          f"{without:.3f}s without ({with_triggers / without:.1f}x, "
+          f"{(with_triggers - without) / len(rows) * 1e6:.0f} µs per row)")
+
+
+def bench_consistency():
+    rnd = random.Random(5)
+    with engine.begin() as conn:
+        ids = [r[0] for r in conn.execute(text("SELECT id FROM enrollments"))]
+        courses = [r[0] for r in conn.execute(text("SELECT id FROM courses"))]
+        departments = [r[0] for r in conn.execute(text("SELECT id FROM departments"))]
+        for enrollment_id in rnd.sample(ids, 2_000):
+            conn.execute(text("UPDATE enrollments SET status = :status WHERE id = :id"),
+                         {"status": rnd.choice(["Completed", "Withdrawn", "Failed", None]),
+                          "id": enrollment_id})
+        conn.execute(text("DELETE FROM enrollments WHERE id IN ({})".format(
+            ", ".join(map(str, rnd.sample(ids, 1_000))))))
+        for course_id in rnd.sample(courses, 20):
+            conn.execute(text("UPDATE courses SET department_id = :d WHERE id = :id"),
+                         {"d": rnd.choice(departments), "id": course_id})
+
+    started = time.perf_counter()
+    problems = enrollment_summary.check()
+    seconds = time.perf_counter() - started
+    assert not problems, problems[:5]
+    print(f"\n  after 2,000 updates, 1,000 deletes, 20 department moves: consistent "
+          f"(check {seconds:.2f}s, full rebuild {enrollment_summary.rebuild():.2f}s)")
+
+
+def main():
+    try:
+        upgrade()
+        print(f"Generating {args.students:,} students, {args.courses:,} courses ...")
+        create_initial_data()
+        generate_bulk_data(
+            students=args.students,
+            courses=args.courses,
+            enrollments_per_student=args.enrollments_per_student,
+            academic_year=ACADEMIC_YEAR,
+        )
+        with SessionLocal() as db:
+            bench_reports(db)
+        bench_writes()
+        bench_consistency()
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
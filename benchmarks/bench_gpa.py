@@ -0,0 +1,181 @@
+# benchmarks/bench_gpa.py
+"""
+GPA recomputation for a whole university: NumPy engine vs. a Python loop.
+
+Synthetic graded enrollments (TERMS terms x COURSES_PER_TERM courses per
+student) are generated in memory; both implementations compute the term,
+cumulative-per-term and overall GPA of every student, and the results are
+compared. With --db the same rows are also written to a temp SQLite
+database to time the full recompute (query + arrays) that runs after a
+grade changes, and a cached read.
+
+Run from the project folder:
+    python -m benchmarks.bench_gpa                    # 100k students
+    python -m benchmarks.bench_gpa 10000 100000 --db
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Faculty, Department, Student, Course, Enrollment
+import gpa
+
+
+TERMS = 8                   # four years, two semesters
+COURSES_PER_TERM = 5
+COURSES = 400
+UNGRADED_SHARE = 0.1        # enrollments still in progress (no grade)
+
+
+def generate(students: int, seed: int = 42):
+    """(student_ids, terms, grade_points, credits, course_ids) as arrays, NaN = no grade."""
+    rng = np.random.default_rng(seed)
+    n = students * TERMS * COURSES_PER_TERM
+    student_ids = np.repeat(np.arange(1, students + 1), TERMS * COURSES_PER_TERM)
+    term_index = np.tile(np.repeat(np.arange(TERMS), COURSES_PER_TERM), students)
+    terms = (2022 + term_index // 2) * 10 + term_index % 2 + 1
+    points = np.array(list(gpa.GRADE_POINTS.values()))
+    grade_points = rng.choice(points, n)
+    grade_points[rng.random(n) < UNGRADED_SHARE] = np.nan
+    # distinct courses within a student's term (unique per student, course
+    # and term): increasing steps from a random start, wrapped around
+    student_terms = students * TERMS
+    steps = rng.integers(1, COURSES // COURSES_PER_TERM + 1, (student_terms, COURSES_PER_TERM))
+    starts = rng.integers(0, COURSES, (student_terms, 1))
+    course_ids = ((starts + np.cumsum(steps, axis=1)) % COURSES + 1).ravel()
+    course_credits = rng.choice([2.0, 3.0, 4.0], COURSES + 1, p=[0.2, 0.65, 0.15])
+    return student_ids, terms, grade_points, course_credits[course_ids], course_ids
+
+
+def compute_python(student_ids, terms, grade_points, credits):
+    """The straightforward loop: dicts per (student, term), then per student."""
+    by_term = defaultdict(lambda: [0.0, 0.0])
+    for student_id, term, points, cr in zip(student_ids, terms, grade_points, credits):
+        if points != points or cr <= 0:      # NaN: no grade
+            continue
+        sums = by_term[(student_id, term)]
+        sums[0] += points * cr
+        sums[1] += cr
+
+    results = {}
+    for (student_id, term) in sorted(by_term):
+        quality, cr = by_term[(student_id, term)]
+        record = results.setdefault(student_id, {"quality": 0.0, "credits": 0.0, "terms": []})
+        record["quality"] += quality
+        record["credits"] += cr
+        record["terms"].append((term, quality / cr, record["quality"] / record["credits"]))
+    for record in results.values():
+        record["gpa"] = record["quality"] / record["credits"]
+    return results
+
+
+def check(engine_results, python_results):
+    assert len(engine_results) == len(python_results)
+    for student_id in list(python_results)[:: max(1, len(python_results) // 1000)]:
+        expected = python_results[student_id]
+        assert abs(engine_results.gpa_of(student_id) - expected["gpa"]) < 1e-9
+        terms = engine_results.for_student(student_id)["terms"]
+        assert [t["term"] for t in terms] == [t for t, _, _ in expected["terms"]]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def fill_database(engine, students, arrays):
+    student_ids, terms, grade_points, _, course_ids = arrays
+    with engine.begin() as conn:
+        conn.execute(insert(Faculty), [{"id": 1, "name": "Faculty"}])
+        conn.execute(insert(Department), [{"id": 1, "name": "Department", "faculty_id": 1}])
+        # credits as generated: rebuilt from the first enrollment of each course
+        credits_of = dict(zip(course_ids.tolist(), arrays[3].tolist()))
+        conn.execute(insert(Course), [
+            {"id": c, "code": f"C{c:04d}", "name": f"Course {c}", "department_id": 1,
+             "credits": int(credits_of.get(c, 3))}
+            for c in range(1, COURSES + 1)
+        ])
+        conn.execute(insert(Student), [
+            {"id": i, "university_id": f"2022-{i:07d}", "full_name": f"Student {i}",
+             "department_id": 1, "level": 1}
+            for i in range(1, students + 1)
+        ])
+        batch = []
+        for student_id, term, points, course_id in zip(
+            student_ids.tolist(), terms.tolist(), grade_points.tolist(), course_ids.tolist()
+        ):
+            year, semester = divmod(term, 10)
+            batch.append({
+                "student_id": student_id, "course_id": course_id,
+                "academic_year": f"{year}/{year + 1}", "semester": semester,
+                "status": "In Progress" if points != points else "Completed",
+                "grade_points": None if points != points else points,
+            })
+            if len(batch) == 50_000:
+                conn.execute(insert(Enrollment), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Enrollment), batch)
+
+
+def run_database(students, arrays):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    try:
+        Base.metadata.create_all(engine)
+        _, seconds = timed(fill_database, engine, students, arrays)
+        print(f"  {'(database filled)':<28}{seconds:>10.2f}")
+
+        with Session(engine) as db:
+            loaded, load_seconds = timed(gpa.load_arrays, db)
+            _, compute_seconds = timed(gpa.compute, *loaded)
+            gpa.invalidate()
+            _, first_seconds = timed(gpa.get, db)
+            _, cached_seconds = timed(gpa.get, db)
+        print(f"  {'query -> arrays':<28}{load_seconds:>10.3f}")
+        print(f"  {'compute (from the query)':<28}{compute_seconds:>10.3f}")
+        print(f"  {'gpa.get() after a change':<28}{first_seconds:>10.3f}")
+        print(f"  {'gpa.get() cached':<28}{cached_seconds * 1e6:>9.1f}µs")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def run(students, with_database):
+    arrays = generate(students)
+    print(f"\n{students:,} students, {len(arrays[0]):,} enrollments "
+          f"({TERMS} terms x {COURSES_PER_TERM} courses)")
+    print(f"  {'':<28}{'seconds':>10}")
+
+    engine_results, numpy_seconds = timed(gpa.compute, *arrays[:4])
+    as_lists = [a.tolist() for a in arrays[:4]]
+    python_results, python_seconds = timed(compute_python, *as_lists)
+    check(engine_results, python_results)
+    print(f"  {'NumPy engine':<28}{numpy_seconds:>10.3f}")
+    print(f"  {'Python loop':<28}{python_seconds:>10.3f}   ({python_seconds / numpy_seconds:.0f}x)")
+
+    if with_database:
+        run_database(students, arrays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark whole-university GPA recomputation.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[100_000], help="student counts")
+    parser.add_argument("--db", action="store_true",
+                        help="also time query + compute on a temp SQLite database")
+    args = parser.parse_args(argv)
+    for n in args.sizes:
+        run(n, args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/bench_pages.py
+"""
+Headless benchmark of each page's hot paths.
+
+Builds (or reuses) a synthetic database, then runs the pages under the Qt
+"offscreen" platform and reports wall time and SQL statement count for:
+StudentsPage.load_students, CoursesPage.load_courses,
+InstructorsPage.load_instructors, DashboardPage.load_stats and
+EnrollmentsPage.load_enrollments_for_student.
+
+Run from the project folder:
+    python -m benchmarks.bench_pages                       # 40k students
+    python -m benchmarks.bench_pages --students 200000
+    python -m benchmarks.bench_pages --db bench.db --reuse # keep/reuse a DB file
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless page benchmark.")
+    parser.add_argument("--db", help="database file (default: temporary file)")
+    parser.add_argument("--reuse", action="store_true", help="do not regenerate an existing --db")
+    parser.add_argument("--students", type=int, default=40_000)
+    parser.add_argument("--instructors", type=int, default=800)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--enrollments-per-student", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+db_path = args.db
+if not db_path:
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.remove(db_path)
+
+reuse = args.reuse and os.path.exists(db_path)
+if not reuse and os.path.exists(db_path):
+    os.remove(db_path)
+
+# must be set before the app modules create their engine
+os.environ["MIS_DATABASE_URL"] = f"sqlite:///{db_path}"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from sqlalchemy import event
+
+from database import engine
+from migrations import upgrade
+from pages.query_executor import executor
+from seed_data import create_initial_data, generate_bulk_data
+
+
+class QueryCounter:
+    def __init__(self, bind):
+        self.count = 0
+        event.listen(bind, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_):
+        self.count += 1
+
+
+def measure(name, fn, counter, repeat):
+    timings = []
+    queries = None
+    for _ in range(repeat):
+        before = counter.count
+        start = time.perf_counter()
+        fn()
+        # reads run on the query executor: time until the rows are delivered
+        executor().wait_for_done()
+        timings.append((time.perf_counter() - start) * 1000)
+        queries = counter.count - before
+    return {
+        "name": name,
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "queries": queries,
+    }
+
+
+def main():
+    upgrade()
+
+    if not reuse:
+        print(f"Generating database at {db_path} ...")
+        create_initial_data()
+        generate_bulk_data(
+            students=args.students,
+            instructors=args.instructors,
+            courses=args.courses,
+            enrollments_per_student=args.enrollments_per_student,
+        )
+
+    app = QApplication(sys.argv)
+
+    from pages.students_page import StudentsPage
+    from pages.courses_page import CoursesPage
+    from pages.instructors_page import InstructorsPage
+    from pages.dashboard_page import DashboardPage
+    from pages.enrollments_page import EnrollmentsPage
+
+    counter = QueryCounter(engine)
+    results = []
+
+    start = time.perf_counter()
+    pages = {
+        "students": StudentsPage(),
+        "courses": CoursesPage(),
+        "instructors": InstructorsPage(),
+        "dashboard": DashboardPage(),
+        "enrollments": EnrollmentsPage(),
+    }
+    executor().wait_for_done()
+    print(f"Constructed all pages in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    with engine.connect() as conn:
+        # the student with the most enrollments is the worst case for that page
+        busiest_student = conn.exec_driver_sql(
+            "SELECT student_id FROM enrollments GROUP BY student_id "
+            "ORDER BY COUNT(*) DESC LIMIT 1"
+        ).scalar()
+
+    cases = [
+        ("StudentsPage.load_students", lambda: pages["students"].load_students()),
+        ("StudentsPage.load_students('Ahmed')", lambda: pages["students"].load_students("Ahmed")),
+        ("CoursesPage.load_courses", lambda: pages["courses"].load_courses()),
+        ("InstructorsPage.load_instructors", lambda: pages["instructors"].load_instructors()),
+        ("DashboardPage.load_stats", lambda: pages["dashboard"].load_stats()),
+    ]
+    if busiest_student is not None:
+        cases.append((
+            "EnrollmentsPage.load_enrollments_for_student",
+            lambda: pages["enrollments"].load_enrollments_for_student(busiest_student),
+        ))
+
+    for name, fn in cases:
+        results.append(measure(name, fn, counter, args.repeat))
+        app.processEvents()
+
+    print(f"\n{'hot path':<48}{'best ms':>10}{'median ms':>11}{'queries':>9}")
+    for r in results:
+        print(f"{r['name']:<48}{r['best']:>10.1f}{r['median']:>11.1f}{r['queries']:>9}")
+
+    if not args.db:
+        engine.dispose()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
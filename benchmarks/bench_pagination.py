@@ -0,0 +1,81 @@
+# benchmarks/bench_pagination.py
+"""
+Deep paging: OFFSET windows vs. keyset pages over the students list.
+
+For each depth, times reading one 200-row page of the (joined) students
+list query with OFFSET, and with KeysetPager continuing from the page
+before it.
+
+Run from the project folder:
+    python -m benchmarks.bench_pagination             # 100k and 1M students
+    python -m benchmarks.bench_pagination 250000      # custom sizes
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Student
+from pagination import KeysetPager, Page
+import repository
+from benchmarks.bench_student_search import fill_students
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+PAGE_SIZE = 200
+DEPTHS = [1, 50, 500, 2_500]     # page numbers
+REPEAT = 5
+
+
+def best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(size: int):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    try:
+        Base.metadata.create_all(engine)
+        fill_students(engine, size)
+
+        print(f"\n{size:,} students, {PAGE_SIZE} rows per page")
+        print(f"  {'page':>6}{'OFFSET ms':>12}{'keyset ms':>12}")
+
+        with Session(engine) as db:
+            pager = KeysetPager(lambda s: repository.student_list_query(s), Student.id, PAGE_SIZE)
+            for depth in DEPTHS:
+                offset = (depth - 1) * PAGE_SIZE
+                if offset >= size:
+                    break
+
+                query = repository.student_list_query(db)
+                offset_ms = best_ms(lambda: query.offset(offset).limit(PAGE_SIZE).all())
+
+                # the page before this one, as the UI would hold it
+                previous_key = query.offset(offset - 1).limit(1).scalar() if offset else None
+                if previous_key is None:
+                    keyset_ms = best_ms(lambda: pager.first(db))
+                else:
+                    before = Page([(previous_key,)], PAGE_SIZE, has_next=True, has_previous=True)
+                    keyset_ms = best_ms(lambda: pager.next(db, before))
+
+                print(f"  {depth:>6}{offset_ms:>12.2f}{keyset_ms:>12.2f}")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    for n in sizes:
+        run(n)
@@ -0,0 +1,70 @@
+# benchmarks/bench_search_index.py
+"""
+Search-as-you-type latency of the in-memory prefix index.
+
+Builds the students index from synthetic rows (no database) and replays
+typing each search term one keystroke at a time; every keystroke is one
+PrefixIndex.search() call. The target is under 10 ms per keystroke.
+
+Run from the project folder:
+    python -m benchmarks.bench_search_index            # 10k and 100k students
+    python -m benchmarks.bench_search_index 1000000    # custom sizes
+"""
+import random
+import sys
+import time
+
+from search_index import PrefixIndex
+from seed_data import random_student
+
+
+DEFAULT_SIZES = [10_000, 100_000]
+SEARCH_TERMS = ["Mona Saleh", "2023-00", "ahmed.hassan", "0101", "Karim Ali Nabil"]
+REPEAT = 5
+TARGET_MS = 10
+
+
+def student_rows(count: int):
+    """(id, university_id, full_name, email, phone), like the students index."""
+    rnd = random.Random(42)
+    for i in range(1, count + 1):
+        student = random_student(rnd, i, year=2020 + i % 6)
+        yield (i, student["university_id"], student["full_name"],
+               student["email"], student["phone"])
+
+
+def best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+
+    for size in sizes:
+        start = time.perf_counter()
+        index = PrefixIndex.build(student_rows(size))
+        print(f"\n{size:,} students: index built in {time.perf_counter() - start:.2f} s")
+
+        print(f"{'term':<20}{'matches':>9}{'worst keystroke ms':>20}{'mean ms':>9}")
+        for term in SEARCH_TERMS:
+            keystrokes = [term[:n] for n in range(1, len(term) + 1)]
+            timings = [best_ms(lambda text=text: index.search(text)) for text in keystrokes]
+            worst = max(timings)
+            flag = "" if worst < TARGET_MS else "  over target"
+            print(f"{term:<20}{len(index.search(term)):>9}{worst:>20.2f}"
+                  f"{sum(timings) / len(timings):>9.2f}{flag}")
+
+        start = time.perf_counter()
+        index.add(size + 1, "2026-0000001", "New Student", "new.student@example.edu", "01000000000")
+        index.update(size + 1, "2026-0000001", "Renamed Student", "", "")
+        index.remove(size + 1)
+        print(f"add + update + remove of one record: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_student_import.py
+"""
+Bulk student import throughput.
+
+Writes a synthetic CSV (with a sprinkling of invalid and duplicate rows),
+imports it into a throw-away database and prints the report.
+
+Run from the project folder:
+    python -m benchmarks.bench_student_import            # 100k rows
+    python -m benchmarks.bench_student_import 250000
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, insert
+
+from models import Faculty, Department
+from seed_data import FACULTY_STRUCTURE, random_student
+from migrations import upgrade
+from student_import import import_students_csv
+
+
+DEFAULT_ROWS = 100_000
+
+
+def seed_structure(engine):
+    with engine.begin() as conn:
+        for faculty_name, dept_list in FACULTY_STRUCTURE.items():
+            fac_id = conn.execute(insert(Faculty).values(name=faculty_name)).inserted_primary_key[0]
+            conn.execute(insert(Department), [
+                {"name": dept_name, "faculty_id": fac_id} for dept_name in dept_list
+            ])
+
+
+def write_csv(path, rows: int):
+    rnd = random.Random(7)
+    pairs = [(fac, dep) for fac, deps in FACULTY_STRUCTURE.items() for dep in deps]
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["university_id", "full_name", "faculty", "department",
+                         "level", "gender", "date_of_birth", "email", "phone"])
+        for i in range(rows):
+            fac, dep = rnd.choice(pairs)
+            univid = f"2025-{i:06d}"
+            level = str(rnd.randint(1, 4))
+
+            roll = rnd.random()
+            if roll < 0.005:
+                univid = f"2025-{rnd.randrange(max(i, 1)):06d}"   # duplicate
+            elif roll < 0.01:
+                level = "7"                                       # invalid
+
+            writer.writerow([
+                univid,
+                random_student(rnd, i)["full_name"],
+                fac,
+                dep,
+                level,
+                rnd.choice(["Male", "Female"]),
+                f"{rnd.randint(1998, 2007)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+                f"student{i}@example.edu",
+                f"010{rnd.randint(10_000_000, 99_999_999)}",
+            ])
+
+
+def run(rows: int):
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+
+    engine = create_engine(f"sqlite:///{db_path}", future=True)
+    try:
+        upgrade(engine)              # real schema: indexes + FTS triggers
+        seed_structure(engine)
+        write_csv(csv_path, rows)
+
+        report = import_students_csv(csv_path, bind=engine)
+        print(f"{rows:,} rows: {report.summary()}")
+        print(f"  throughput: {report.inserted / max(report.seconds, 1e-9):,.0f} rows/s")
+    finally:
+        engine.dispose()
+        os.remove(db_path)
+        os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
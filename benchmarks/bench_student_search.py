@@ -0,0 +1,81 @@
+# benchmarks/bench_student_search.py
+"""
+Student search latency: LIKE scan vs. the FTS5 index.
+
+Run from the project folder:
+    python -m benchmarks.bench_student_search            # 10k, 100k, 1M students
+    python -m benchmarks.bench_student_search 10000      # custom sizes
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Student
+from seed_data import random_student
+import student_search
+from student_search import ensure_student_fts, apply_student_search
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+SEARCH_TERMS = ["Hassan", "2025-10", "mona", "@example", "0100"]
+REPEAT = 5
+
+
+def fill_students(engine, count: int):
+    rnd = random.Random(42)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(count):
+            batch.append(dict(random_student(rnd, i, year=2020 + i % 6), level=rnd.randint(1, 4)))
+            if len(batch) == 10_000:
+                conn.execute(insert(Student), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Student), batch)
+
+
+def time_search(engine, term: str, use_fts: bool) -> float:
+    """Best-of-N time to fetch the first 200 matching ids (one table window)."""
+    student_search._fts_ready = use_fts
+    best = float("inf")
+    with Session(engine) as db:
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            apply_student_search(db.query(Student.id), term).limit(200).all()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(size: int):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    try:
+        Base.metadata.create_all(engine)
+        fill_students(engine, size)
+
+        start = time.perf_counter()
+        ensure_student_fts(engine)
+        build_s = time.perf_counter() - start
+
+        print(f"\n{size:,} students (index build {build_s:.2f}s)")
+        print(f"  {'term':<12}{'LIKE ms':>10}{'FTS5 ms':>10}")
+        for term in SEARCH_TERMS:
+            like_ms = time_search(engine, term, use_fts=False)
+            fts_ms = time_search(engine, term, use_fts=True)
+            print(f"  {term:<12}{like_ms:>10.2f}{fts_ms:>10.2f}")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    for n in sizes:
+        run(n)
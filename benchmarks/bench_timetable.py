@@ -0,0 +1,156 @@
+# benchmarks/bench_timetable.py
+"""
+Timetable clash detection: the slot index vs. plain SQL.
+
+Builds a synthetic database (seed_data: every course meets twice a week
+on a grid of 90-minute blocks), then times
+    - the semester clash report: timetable.clash_report (one pass over
+      the term's registrations with the week masks) vs. one SQL self-join
+      of enrollments x course slots,
+    - single registration checks: timetable.find_clashes (week masks)
+      vs. an overlap query per check, over random student/course pairs.
+Both sides must find the same clashes.
+
+Run from the project folder:
+    python -m benchmarks.bench_timetable                  # 40k students
+    python -m benchmarks.bench_timetable --students 200000 --checks 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Timetable clash detection benchmark.")
+    parser.add_argument("--students", type=int, default=40_000)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--enrollments-per-student", type=int, default=6)
+    parser.add_argument("--checks", type=int, default=1_000)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+fd, db_path = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.remove(db_path)
+
+# must be set before the app modules create their engine
+os.environ["MIS_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from migrations import upgrade
+from seed_data import create_initial_data, generate_bulk_data
+import timetable
+
+
+ACADEMIC_YEAR = "2025/2026"
+
+# the same rules as timetable.py: same term, both hold a seat, a slot overlaps
+REPORT_SQL = text("""
+    SELECT e1.student_id, e1.course_id, e2.course_id, s1.day, s1.start_minute, s2.start_minute
+    FROM enrollments e1
+    JOIN enrollments e2
+      ON e2.student_id = e1.student_id AND e2.course_id > e1.course_id
+     AND COALESCE(e2.academic_year, '') = COALESCE(e1.academic_year, '')
+     AND COALESCE(e2.semester, 0) = COALESCE(e1.semester, 0)
+    JOIN course_slots s1 ON s1.course_id = e1.course_id
+    JOIN course_slots s2 ON s2.course_id = e2.course_id AND s2.day = s1.day
+     AND s1.start_minute < s2.end_minute AND s2.start_minute < s1.end_minute
+    WHERE COALESCE(e1.academic_year, '') = :year AND COALESCE(e1.semester, 0) = :semester
+      AND (e1.status IS NULL OR e1.status NOT IN ('Waitlisted', 'Withdrawn'))
+      AND (e2.status IS NULL OR e2.status NOT IN ('Waitlisted', 'Withdrawn'))
+""")
+
+CHECK_SQL = text("""
+    SELECT DISTINCT e.course_id
+    FROM enrollments e
+    JOIN course_slots theirs ON theirs.course_id = e.course_id
+    JOIN course_slots mine ON mine.course_id = :course_id AND mine.day = theirs.day
+     AND mine.start_minute < theirs.end_minute AND theirs.start_minute < mine.end_minute
+    WHERE e.student_id = :student_id AND e.course_id != :course_id
+      AND COALESCE(e.academic_year, '') = :year AND COALESCE(e.semester, 0) = :semester
+      AND (e.status IS NULL OR e.status NOT IN ('Waitlisted', 'Withdrawn'))
+""")
+
+
+def timed(fn, *a, **kw):
+    started = time.perf_counter()
+    result = fn(*a, **kw)
+    return result, time.perf_counter() - started
+
+
+def bench_report(db, semester):
+    timetable.invalidate()
+    report, index_seconds = timed(timetable.clash_report, db, ACADEMIC_YEAR, semester)
+    rows, sql_seconds = timed(
+        lambda: db.execute(REPORT_SQL, {"year": ACADEMIC_YEAR, "semester": semester}).all()
+    )
+    assert len(rows) == len(report.clashes), (len(rows), len(report.clashes))
+    print(f"\n  semester {semester}: {report.enrollments:,} registrations, "
+          f"{report.students_with_clashes:,} students with {len(report.clashes):,} clashes")
+    print(f"    {'clash_report (cold index)':<30}{index_seconds:>9.3f}s")
+    print(f"    {'SQL self-join':<30}{sql_seconds:>9.3f}s   "
+          f"({sql_seconds / index_seconds:.1f}x)")
+
+
+def bench_checks(db, checks):
+    rnd = random.Random(7)
+    registrations = db.execute(text(
+        "SELECT student_id, semester FROM enrollments WHERE academic_year = :year"
+    ), {"year": ACADEMIC_YEAR}).all()
+    course_ids = [r[0] for r in db.execute(text("SELECT id FROM courses"))]
+    pairs = [(*rnd.choice(registrations), rnd.choice(course_ids)) for _ in range(checks)]
+
+    timetable.get(db)       # a warm index, as in a running app
+    index_ms, sql_ms, clashing = [], [], 0
+    for student_id, semester, course_id in pairs:
+        found, seconds = timed(timetable.find_clashes, db, student_id, course_id,
+                               ACADEMIC_YEAR, semester)
+        index_ms.append(seconds * 1000)
+        rows, seconds = timed(lambda: db.execute(CHECK_SQL, {
+            "student_id": student_id, "course_id": course_id,
+            "year": ACADEMIC_YEAR, "semester": semester,
+        }).all())
+        sql_ms.append(seconds * 1000)
+        assert {c["course_id"] for c in found} == {r[0] for r in rows}
+        clashing += bool(found)
+
+    print(f"\n  {checks:,} registration checks ({clashing:,} would clash)")
+    print(f"    {'':<30}{'median ms':>10}{'max ms':>9}")
+    for label, values in (("find_clashes (week masks)", index_ms), ("SQL overlap query", sql_ms)):
+        print(f"    {label:<30}{statistics.median(values):>10.3f}{max(values):>9.3f}")
+
+
+def main():
+    try:
+        upgrade()
+        print(f"Generating {args.students:,} students, {args.courses:,} courses ...")
+        create_initial_data()
+        generate_bulk_data(
+            students=args.students,
+            courses=args.courses,
+            enrollments_per_student=args.enrollments_per_student,
+            academic_year=ACADEMIC_YEAR,
+        )
+        with SessionLocal() as db:
+            index, seconds = timed(timetable.load, db)
+            print(f"\n  slot index: {sum(map(len, index.slots.values())):,} slots of "
+                  f"{len(index.masks):,} courses ({seconds * 1000:.0f} ms)")
+            for semester in (1, 2):
+                bench_report(db, semester)
+            bench_checks(db, args.checks)
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
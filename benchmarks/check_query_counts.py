@@ -0,0 +1,140 @@
+# benchmarks/check_query_counts.py
+"""
+Assert that every list view issues a constant number of SQL statements,
+whatever the number of rows it shows (no lazy-load storms / N+1).
+
+Each page action is run against a small and a large synthetic database
+and the statement counts must match. Exits with status 1 on failure.
+
+Run from the project folder:
+    python -m benchmarks.check_query_counts
+"""
+import os
+import sys
+import tempfile
+
+fd, db_path = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.remove(db_path)
+
+# must be set before the app modules create their engine
+os.environ["MIS_DATABASE_URL"] = f"sqlite:///{db_path}"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from sqlalchemy import event, text
+
+from database import engine
+from migrations import upgrade
+from student_search import ensure_student_fts
+from seed_data import create_initial_data, generate_bulk_data
+from pages.query_executor import executor
+import gpa
+import pagination
+import reference_cache
+import search_index
+
+
+SMALL = dict(students=20, instructors=5, courses=10, enrollments_per_student=2)
+# more students/enrollments than fit in one table window would still be
+# fine: a window is one SELECT, so compare inside a single window (< 200)
+LARGE = dict(students=190, instructors=150, courses=180, enrollments_per_student=8)
+
+
+class StatementCounter:
+    def __init__(self, bind):
+        self.count = 0
+        event.listen(bind, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_):
+        self.count += 1
+
+    def run(self, fn):
+        before = self.count
+        fn()
+        executor().wait_for_done()
+        return self.count - before
+
+
+def busiest_student():
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT student_id FROM enrollments GROUP BY student_id "
+            "ORDER BY COUNT(*) DESC LIMIT 1"
+        )).scalar()
+
+
+def measure(counter):
+    from pages.students_page import StudentsPage
+    from pages.courses_page import CoursesPage
+    from pages.instructors_page import InstructorsPage
+    from pages.dashboard_page import DashboardPage
+    from pages.enrollments_page import EnrollmentsPage
+
+    students = StudentsPage()
+    courses = CoursesPage()
+    instructors = InstructorsPage()
+    dashboard = DashboardPage()
+    enrollments = EnrollmentsPage()
+    executor().wait_for_done()
+    student_id = busiest_student()
+    # the GPA engine reads every grade once per change, not per list view
+    gpa.get()
+
+    return {
+        "StudentsPage.load_students": counter.run(students.load_students),
+        "StudentsPage.load_students(search)": counter.run(lambda: students.load_students("Ahmed")),
+        "CoursesPage.load_courses": counter.run(courses.load_courses),
+        "CoursesPage.load_departments": counter.run(courses.load_departments),
+        "InstructorsPage.load_instructors": counter.run(instructors.load_instructors),
+        "InstructorsPage.load_departments": counter.run(instructors.load_departments),
+        "DashboardPage.load_stats": counter.run(dashboard.load_stats),
+        "EnrollmentsPage.load_enrollments_for_student":
+            counter.run(lambda: enrollments.load_enrollments_for_student(student_id)),
+    }
+
+
+_app = None     # the QApplication, alive as long as the pages
+
+
+def main():
+    global _app
+    _app = QApplication(sys.argv)
+
+    upgrade()
+    create_initial_data()
+    # decides FTS vs LIKE up front, so the first search runs no extra query
+    ensure_student_fts()
+    counter = StatementCounter(engine)
+
+    generate_bulk_data(**SMALL)
+    small = measure(counter)
+
+    generate_bulk_data(seed=7, **LARGE)
+    # rows were bulk-inserted behind the in-memory caches' back
+    search_index.invalidate()
+    reference_cache.invalidate()
+    gpa.invalidate()
+    pagination.invalidate_counts()
+    large = measure(counter)
+
+    failures = 0
+    print(f"\n{'list view':<48}{'small':>7}{'large':>7}")
+    for name in small:
+        ok = small[name] == large[name]
+        failures += not ok
+        print(f"{name:<48}{small[name]:>7}{large[name]:>7}  {'ok' if ok else 'FAIL'}")
+
+    engine.dispose()
+    os.remove(db_path)
+
+    assert failures == 0, f"{failures} list view(s) issue more statements as rows grow"
+    print("\nAll list views issue a constant number of statements.")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except AssertionError as e:
+        print(f"\nFAILED: {e}")
+        sys.exit(1)
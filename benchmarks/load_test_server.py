@@ -0,0 +1,314 @@
+# benchmarks/load_test_server.py
+"""
+Load test for server.py: simulated registrar clerks hammering one server.
+
+Each clerk is a thread with its own keep-alive connection, looping over a
+weighted mix of what a desk does all day:
+    browse     first students page (with total) + the next two pages
+    search     type a name prefix one letter at a time (search + rows)
+    open       a student and their enrollments, in one /batch request
+    enroll     enroll a student in a course and withdraw it again (writes)
+    edit       change a student's phone number (write)
+    dashboard  the dashboard counters
+Latency is recorded per HTTP request; the report shows percentiles per
+operation, throughput and errors. The clerks share one login token
+(--username / --password, the seeded admin by default).
+
+By default a fresh database is seeded in a temp folder and a server is
+started on it (localhost). Run from the project folder:
+    python -m benchmarks.load_test_server
+    python -m benchmarks.load_test_server --clerks 50 --workers 8 --seconds 60
+    python -m benchmarks.load_test_server --url http://127.0.0.1:8765   # running server
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIONS = [         # (name, weight)
+    ("browse", 25),
+    ("search", 30),
+    ("open", 25),
+    ("enroll", 8),
+    ("edit", 7),
+    ("dashboard", 5),
+]
+
+SEARCH_WORDS = ["mohamed", "ahmed", "mariam", "mahmoud", "sara", "omar", "nour", "ibrahim"]
+
+samples_lock = threading.Lock()
+
+
+def json_headers(token=None):
+    headers = {"Content-Type": "application/json"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+class Clerk(threading.Thread):
+    def __init__(self, number, url, token, deadline, samples, student_ids, course_ids, think_ms):
+        super().__init__(name=f"clerk-{number}", daemon=True)
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.headers = json_headers(token)
+        self.deadline = deadline
+        self.samples = samples          # shared: op -> [ms]; guarded by samples_lock
+        self.errors = defaultdict(int)
+        self.conflicts = 0
+        self.actions = 0
+        self.student_ids = student_ids
+        self.course_ids = course_ids
+        self.think = think_ms / 1000
+        self.rnd = random.Random(number)
+        self.conn = None
+        self._local_samples = defaultdict(list)
+
+    # ---------- HTTP ----------
+
+    def post(self, label, path, payload):
+        body = json.dumps(payload).encode("utf-8")
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request("POST", path, body, self.headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.errors[f"{label}: {type(e).__name__}"] += 1
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+            return None
+        self._local_samples[label].append((time.perf_counter() - started) * 1000)
+
+        if response.status == 409:
+            self.conflicts += 1
+            return None
+        if response.status != 200:
+            self.errors[f"{label}: HTTP {response.status}"] += 1
+            return None
+        return json.loads(data)
+
+    def op(self, name, **params):
+        return self.post(name, f"/api/{name}", params)
+
+    # ---------- Actions ----------
+
+    def browse(self):
+        page = self.op("students.page", with_total=True)
+        for _ in range(2):
+            if not page or not page["has_next"]:
+                return
+            page = self.op("students.page", after=page["rows"][-1][0])
+
+    def search(self):
+        word = self.rnd.choice(SEARCH_WORDS)
+        ids = None
+        for length in range(1, min(len(word), 4) + 1):
+            ids = self.op("students.search", text=word[:length])
+        if ids:
+            self.op("students.rows", ids=ids[:200])
+
+    def open(self):
+        student_id = self.rnd.choice(self.student_ids)
+        self.post("batch(students.get+enrollments.list)", "/batch", [
+            {"op": "students.get", "params": {"id": student_id}},
+            {"op": "enrollments.list", "params": {"student_id": student_id}},
+        ])
+
+    def enroll(self):
+        created = self.op(
+            "enrollments.create",
+            student_id=self.rnd.choice(self.student_ids),
+            fields={"course_id": self.rnd.choice(self.course_ids),
+                    "academic_year": "2030/2031", "status": "In Progress"},
+        )
+        if created:
+            self.op("enrollments.delete", id=created["id"])
+
+    def edit(self):
+        phone = f"01{self.rnd.randint(0, 2)}{self.rnd.randint(10_000_000, 99_999_999)}"
+        self.op("students.update", id=self.rnd.choice(self.student_ids), fields={"phone": phone})
+
+    def dashboard(self):
+        self.op("stats.dashboard")
+
+    def run(self):
+        names = [name for name, _ in ACTIONS]
+        weights = [weight for _, weight in ACTIONS]
+        while time.monotonic() < self.deadline:
+            getattr(self, self.rnd.choices(names, weights)[0])()
+            self.actions += 1
+            if self.think:
+                time.sleep(self.rnd.uniform(0, 2 * self.think))
+
+        with samples_lock:
+            for label, values in self._local_samples.items():
+                self.samples[label].extend(values)
+
+
+# ---------- Server set-up ----------
+
+def request_json(url, method, path, payload=None, token=None):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+    try:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        conn.request(method, path, body, json_headers(token))
+        response = conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path}: HTTP {response.status} {data[:200]!r}")
+        return json.loads(data)
+    finally:
+        conn.close()
+
+
+def wait_for_server(url, process=None, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Server exited during start-up")
+        try:
+            return request_json(url, "GET", "/health")
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not answer within {timeout}s")
+
+
+def seed_database(env, students):
+    subprocess.run(
+        [sys.executable, "seed_data.py",
+         "--students", str(students),
+         "--instructors", str(max(students // 50, 10)),
+         "--courses", str(max(students // 20, 50)),
+         "--enrollments-per-student", "4"],
+        cwd=PROJECT_DIR, env=env, check=True,
+    )
+
+
+def start_server(env, port, workers):
+    return subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port), "--workers", str(workers),
+         "--log-level", "WARNING"],
+        cwd=PROJECT_DIR, env=env,
+    )
+
+
+def login(url, username, password):
+    user = request_json(url, "POST", "/api/auth.login", {"username": username, "password": password})
+    if not user:
+        raise RuntimeError(f"Login as {username} failed")
+    return user["token"]
+
+
+def sample_ids(url, token):
+    page = request_json(url, "POST", "/api/students.page", {"limit": 1000}, token)
+    reference = request_json(url, "POST", "/api/reference.data", {}, token)
+    student_ids = [row[0] for row in page["rows"]]
+    course_ids = [course[0] for course in reference[2]]
+    if not student_ids or not course_ids:
+        raise RuntimeError("The database needs students and courses for the load test")
+    return student_ids, course_ids
+
+
+# ---------- Report ----------
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def report(samples, clerks, seconds):
+    total = sum(len(v) for v in samples.values())
+    actions = sum(c.actions for c in clerks)
+    errors = defaultdict(int)
+    for clerk in clerks:
+        for key, n in clerk.errors.items():
+            errors[key] += n
+    conflicts = sum(c.conflicts for c in clerks)
+
+    print(f"\n{len(clerks)} clerks for {seconds:.0f}s: {actions:,} actions, "
+          f"{total:,} requests ({total / seconds:,.0f} req/s)")
+    print(f"\n  {'operation':<40}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for label in sorted(samples):
+        values = sorted(samples[label])
+        print(f"  {label:<40}{len(values):>8,}"
+              f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}"
+              f"{percentile(values, 99):>9.1f}{values[-1]:>9.1f}")
+
+    print(f"\n  conflicts (409, expected for duplicate enrollments): {conflicts:,}")
+    print(f"  errors: {sum(errors.values()):,}")
+    for key, n in sorted(errors.items()):
+        print(f"    {key}: {n:,}")
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test server.py with simulated clerks.")
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--clerks", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="mean pause between a clerk's actions (0 = flat out)")
+    parser.add_argument("--students", type=int, default=20_000, help="size of the seeded database")
+    parser.add_argument("--workers", type=int, default=8, help="server worker threads")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    args = parser.parse_args(argv)
+
+    server = None
+    tmpdir = None
+    url = args.url
+    try:
+        if url is None:
+            tmpdir = tempfile.TemporaryDirectory()
+            env = dict(os.environ, MIS_DATABASE_URL=f"sqlite:///{os.path.join(tmpdir.name, 'load.db')}")
+            seed_database(env, args.students)
+            url = f"http://127.0.0.1:{args.port}"
+            server = start_server(env, args.port, args.workers)
+            wait_for_server(url, server)
+        else:
+            wait_for_server(url)
+
+        token = login(url, args.username, args.password)
+        student_ids, course_ids = sample_ids(url, token)
+        samples = defaultdict(list)
+        deadline = time.monotonic() + args.seconds
+        clerks = [
+            Clerk(i, url, token, deadline, samples, student_ids, course_ids, args.think_ms)
+            for i in range(args.clerks)
+        ]
+        started = time.monotonic()
+        for clerk in clerks:
+            clerk.start()
+        for clerk in clerks:
+            clerk.join()
+
+        return report(samples, clerks, time.monotonic() - started)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# benchmarks/stress_seat_allocation.py
+"""
+Stress test for seat allocation: many processes enrolling into a few
+small courses at once.
+
+Each worker process opens its own engine on a shared temp database and
+loops, each action its own unit of work:
+    enroll     a random student into a random course (seated or waitlisted)
+    withdraw   one of its earlier registrations (status -> Withdrawn)
+    drop       one of its earlier registrations (deleted)
+Withdrawals and drops promote from the waitlist. Afterwards the database
+is checked: no course over capacity, nobody waitlisted while a seat is
+free, no two students at the same waitlist position.
+
+Reported: actions per second, latency per action, and the time spent
+waiting for the write lock (BEGIN IMMEDIATE) per action.
+
+Run from the project folder:
+    python -m benchmarks.stress_seat_allocation
+    python -m benchmarks.stress_seat_allocation --processes 16 --seconds 20 --capacity 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, make_engine
+from models import Faculty, Department, Student, Course
+import seat_allocation
+
+
+ACADEMIC_YEAR = "2025/2026"
+SEMESTER = 1
+ACTIONS = [("enroll", 70), ("withdraw", 20), ("drop", 10)]
+
+
+def prepare(url, students, courses, capacity):
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Faculty), [{"id": 1, "name": "Faculty"}])
+        conn.execute(insert(Department), [{"id": 1, "name": "Department", "faculty_id": 1}])
+        conn.execute(insert(Course), [
+            {"id": i, "code": f"S{i:03d}", "name": f"Seminar {i}", "department_id": 1,
+             "credits": 3, "capacity": capacity}
+            for i in range(1, courses + 1)
+        ])
+        conn.execute(insert(Student), [
+            {"id": i, "university_id": f"2025-{i:06d}", "full_name": f"Student {i}",
+             "department_id": 1, "level": 1}
+            for i in range(1, students + 1)
+        ])
+    engine.dispose()
+
+
+def worker(number, url, deadline, students, courses, results):
+    engine = make_engine(url)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    rnd = random.Random(number)
+    names = [name for name, _ in ACTIONS]
+    weights = [weight for _, weight in ACTIONS]
+
+    latency = defaultdict(list)     # action -> [ms]
+    lock_wait = []                  # ms per action
+    counts = defaultdict(int)
+    mine = []                       # enrollment ids this worker created
+
+    while time.time() < deadline:
+        action = rnd.choices(names, weights)[0]
+        if action != "enroll" and not mine:
+            action = "enroll"
+
+        started = time.perf_counter()
+        db = Session()
+        try:
+            if action == "enroll":
+                enr = seat_allocation.enroll(
+                    db, rnd.randint(1, students), rnd.randint(1, courses),
+                    academic_year=ACADEMIC_YEAR, semester=SEMESTER,
+                )
+                outcome = "waitlisted" if enr.status == seat_allocation.WAITLISTED else "seated"
+                db.commit()
+                mine.append(enr.id)
+            else:
+                enrollment_id = mine.pop(rnd.randrange(len(mine)))
+                if action == "withdraw":
+                    enr, promoted = seat_allocation.update(
+                        db, enrollment_id, {"status": seat_allocation.WITHDRAWN})
+                else:
+                    _, promoted = seat_allocation.delete(db, enrollment_id)
+                db.commit()
+                outcome = action
+                counts["promoted"] += len(promoted)
+        except IntegrityError:
+            db.rollback()
+            outcome = "duplicate"       # the student already has that course this term
+        except OperationalError:
+            db.rollback()
+            outcome = "busy"            # gave up waiting for the lock (driver timeout)
+        finally:
+            waited = db.info.get("lock_wait_seconds", 0.0)
+            db.close()
+
+        latency[action].append((time.perf_counter() - started) * 1000)
+        lock_wait.append(waited * 1000)
+        counts[outcome] += 1
+
+    engine.dispose()
+    results.put((dict(latency), lock_wait, dict(counts)))
+
+
+def check(url):
+    """Invariant violations found in the final state (empty list = none)."""
+    engine = make_engine(url)
+    problems = []
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT c.code, c.capacity,
+                   SUM(CASE WHEN e.status NOT IN ('Waitlisted', 'Withdrawn') THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN e.status = 'Waitlisted' THEN 1 ELSE 0 END),
+                   COUNT(DISTINCT CASE WHEN e.status = 'Waitlisted' THEN e.waitlist_position END)
+            FROM courses c LEFT JOIN enrollments e ON e.course_id = c.id
+            GROUP BY c.id ORDER BY c.id
+        """)).all()
+        seated = waiting = 0
+        for code, capacity, taken, waitlisted, positions in rows:
+            taken, waitlisted = taken or 0, waitlisted or 0
+            seated += taken
+            waiting += waitlisted
+            if taken > capacity:
+                problems.append(f"{code}: {taken} seats taken, capacity {capacity}")
+            if waitlisted and taken < capacity:
+                problems.append(f"{code}: {waitlisted} waitlisted with {capacity - taken} free seat(s)")
+            if positions != waitlisted:
+                problems.append(f"{code}: {waitlisted} waitlisted on {positions} distinct positions")
+        total = conn.execute(text("SELECT COUNT(*) FROM enrollments")).scalar()
+    engine.dispose()
+    return problems, seated, waiting, total
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def report(results, processes, seconds):
+    latency = defaultdict(list)
+    lock_wait = []
+    counts = defaultdict(int)
+    for worker_latency, worker_waits, worker_counts in results:
+        for action, values in worker_latency.items():
+            latency[action].extend(values)
+        lock_wait.extend(worker_waits)
+        for key, n in worker_counts.items():
+            counts[key] += n
+
+    actions = sum(len(v) for v in latency.values())
+    print(f"\n{processes} processes for {seconds:.0f}s: {actions:,} actions "
+          f"({actions / seconds:,.0f}/s)")
+    print(f"\n  {'':<22}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    rows = [(action, sorted(values)) for action, values in sorted(latency.items())]
+    rows.append(("lock wait (any)", sorted(lock_wait)))
+    for label, values in rows:
+        print(f"  {label:<22}{len(values):>8,}"
+              f"{percentile(values, 50):>9.2f}{percentile(values, 95):>9.2f}"
+              f"{percentile(values, 99):>9.2f}{(values[-1] if values else 0):>9.2f}")
+
+    print("\n  " + ", ".join(f"{key} {counts[key]:,}" for key in
+                             ("seated", "waitlisted", "withdraw", "drop", "promoted",
+                              "duplicate", "busy")))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent seat allocation stress test.")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=25)
+    parser.add_argument("--students", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    try:
+        prepare(url, args.students, args.courses, args.capacity)
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + args.seconds
+        workers = [
+            multiprocessing.Process(
+                target=worker,
+                args=(i, url, deadline, args.students, args.courses, results),
+            )
+            for i in range(args.processes)
+        ]
+        started = time.monotonic()
+        for process in workers:
+            process.start()
+        collected = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+
+        report(collected, args.processes, time.monotonic() - started)
+
+        problems, seated, waiting, total = check(url)
+        print(f"\n  final state: {seated:,} seated, {waiting:,} waitlisted, "
+              f"{total:,} registrations in {args.courses} courses x {args.capacity} seats")
+        if problems:
+            print(f"  {len(problems)} INVARIANT VIOLATION(S):")
+            for problem in problems[:20]:
+                print(f"    {problem}")
+            return 1
+        print("  invariants hold: no course over capacity, no one waiting for a free seat")
+        return 0
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
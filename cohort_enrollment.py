@@ -0,0 +1,269 @@
+# cohort_enrollment.py
+"""
+Cohort enrollment: enroll every student of a department and level into
+the same courses for one term, in one transaction.
+
+The missing (student, course) pairs are computed by the database, not in
+Python: a single INSERT ... SELECT over students × courses with a NOT
+EXISTS probe on the one-registration-per-term index inserts exactly the
+pairs that are not enrolled yet. A few grouped SELECTs before it produce
+the conflict report (who is already enrolled, per course). Running the
+same cohort twice inserts nothing the second time.
+
+Only active students are enrolled; graduated/suspended ones are counted
+in the report. Courses with a capacity seat the cohort in student order
+until they are full and waitlist the rest (see seat_allocation.py); the
+whole run holds the write lock, like any other seat allocation.
+
+Headless usage:
+    python cohort_enrollment.py --department 3 --level 1 \
+        --year 2025/2026 --semester 1 --courses 12 15 17 [--dry-run]
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+
+from sqlalchemy import and_, bindparam, case, exists, func, insert, literal, select, true, update
+
+from database import begin_immediate, session_scope
+from models import Student, Course, Enrollment
+from seat_allocation import WAITLISTED, NO_SEAT_STATUSES, next_position, same_term
+
+
+DEFAULT_STATUS = "In Progress"
+MAX_CONFLICTS_LISTED = 100      # sample of already-enrolled pairs kept in the report
+
+
+@dataclass
+class CohortReport:
+    department_id: int
+    level: int
+    academic_year: str
+    semester: int
+    students: int = 0               # active students in the cohort
+    inactive_skipped: int = 0       # graduated / suspended
+    inserted: int = 0
+    already_enrolled: int = 0
+    waitlisted: int = 0             # of the inserted, on a course waitlist (course full)
+    unknown_courses: list = field(default_factory=list)     # ids that do not exist
+    courses: list = field(default_factory=list)     # {id, code, name, already_enrolled, inserted, waitlisted}
+    conflicts: list = field(default_factory=list)   # (university_id, course code), capped
+    dry_run: bool = False
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        verb = "would be inserted" if self.dry_run else "inserted"
+        return (
+            f"{self.students:,} students x {len(self.courses):,} courses: "
+            f"{self.inserted:,} enrollments {verb} ({self.waitlisted:,} waitlisted), "
+            f"{self.already_enrolled:,} already enrolled, "
+            f"{self.inactive_skipped:,} inactive students skipped in {self.seconds:.2f}s"
+        )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _seats_taken(db, course_ids, academic_year, semester) -> dict:
+    return dict(db.execute(
+        select(Enrollment.course_id, func.count())
+        .where(
+            Enrollment.course_id.in_(course_ids),
+            same_term(academic_year, semester),
+            func.coalesce(Enrollment.status, "").notin_(NO_SEAT_STATUSES),
+        )
+        .group_by(Enrollment.course_id)
+    ).all())
+
+
+def _overflow(capacity, taken: int, adding: int) -> int:
+    """How many of `adding` new registrations will not find a seat."""
+    if capacity is None:
+        return 0
+    return min(adding, max(0, taken + adding - capacity))
+
+
+def _waitlist_overflow(db, courses, academic_year, semester, last_id) -> dict:
+    """Move the newest registrations (ids > last_id) of full courses to the waitlist."""
+    limited = [c for c in courses if c.capacity is not None]
+    taken = _seats_taken(db, [c.id for c in limited], academic_year, semester)
+    waitlisted = {}
+    for c in limited:
+        excess = taken.get(c.id, 0) - c.capacity
+        if excess <= 0:
+            continue
+        newest = db.execute(
+            select(Enrollment.id)
+            .where(
+                Enrollment.course_id == c.id,
+                same_term(academic_year, semester),
+                Enrollment.id > last_id,
+            )
+            .order_by(Enrollment.id.desc())
+            .limit(excess)
+        ).scalars().all()
+        if not newest:
+            continue
+        first = next_position(db, c.id, academic_year, semester)
+        # plain executemany (table, not entity: no ORM bulk-update rules)
+        table = Enrollment.__table__
+        db.connection().execute(
+            update(table)
+            .where(table.c.id == bindparam("enrollment_id"))
+            .values(status=WAITLISTED, waitlist_position=bindparam("position")),
+            [{"enrollment_id": enrollment_id, "position": first + i}
+             for i, enrollment_id in enumerate(sorted(newest))],
+        )
+        waitlisted[c.id] = len(newest)
+    return waitlisted
+
+
+def enroll_cohort(db, department_id: int, level: int, academic_year: str, semester: int,
+                  course_ids, status: str = DEFAULT_STATUS, dry_run: bool = False) -> CohortReport:
+    """Enroll the cohort in `course_ids` inside `db`'s transaction (the caller commits)."""
+    started = time.perf_counter()
+    report = CohortReport(department_id, level, academic_year, semester, dry_run=dry_run)
+    if not dry_run:
+        # seat counts below must still hold when the rows go in
+        begin_immediate(db)
+    course_ids = sorted(set(course_ids))
+
+    in_cohort = and_(Student.department_id == department_id, Student.level == level)
+    active = func.coalesce(Student.status, "active") == "active"
+    cohort_ids = select(Student.id).where(in_cohort, active)
+
+    counts = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((active, 1), else_=0)), 0),
+        ).select_from(Student).where(in_cohort)
+    ).one()
+    report.students = counts[1]
+    report.inactive_skipped = counts[0] - counts[1]
+
+    courses = db.execute(
+        select(Course.id, Course.code, Course.name, Course.capacity)
+        .where(Course.id.in_(course_ids))
+        .order_by(Course.code)
+    ).all()
+    found = [c.id for c in courses]
+    report.unknown_courses = sorted(set(course_ids) - set(found))
+
+    already = dict(db.execute(
+        select(Enrollment.course_id, func.count())
+        .where(
+            Enrollment.student_id.in_(cohort_ids),
+            Enrollment.course_id.in_(found),
+            same_term(academic_year, semester),
+        )
+        .group_by(Enrollment.course_id)
+    ).all())
+    seats_taken = _seats_taken(db, found, academic_year, semester)
+
+    report.conflicts = [
+        tuple(r) for r in db.execute(
+            select(Student.university_id, Course.code)
+            .join(Enrollment, Enrollment.student_id == Student.id)
+            .join(Course, Course.id == Enrollment.course_id)
+            .where(
+                in_cohort, active,
+                Enrollment.course_id.in_(found),
+                same_term(academic_year, semester),
+            )
+            .order_by(Course.code, Student.university_id)
+            .limit(MAX_CONFLICTS_LISTED)
+        )
+    ]
+
+    for c in courses:
+        n = already.get(c.id, 0)
+        report.courses.append({
+            "id": c.id, "code": c.code, "name": c.name,
+            "already_enrolled": n, "inserted": report.students - n,
+            "waitlisted": _overflow(c.capacity, seats_taken.get(c.id, 0), report.students - n),
+        })
+    report.already_enrolled = sum(already.values())
+    report.inserted = report.students * len(found) - report.already_enrolled
+    report.waitlisted = sum(c["waitlisted"] for c in report.courses)
+
+    if not dry_run and found and report.inserted:
+        last_id = db.execute(select(func.coalesce(func.max(Enrollment.id), 0))).scalar()
+        missing_pairs = (
+            select(
+                Student.id, Course.id,
+                literal(academic_year), literal(semester), literal(status),
+            )
+            .select_from(Student)
+            .join(Course, true())       # every cohort student x every course
+            .where(
+                in_cohort, active,
+                Course.id.in_(found),
+                ~exists().where(
+                    Enrollment.student_id == Student.id,
+                    Enrollment.course_id == Course.id,
+                    same_term(academic_year, semester),
+                ),
+            )
+            # ids follow student order per course: the last ones get waitlisted
+            .order_by(Course.id, Student.id)
+        )
+        # OR IGNORE: a duplicate pair is skipped instead of failing the whole
+        # cohort (the write lock already keeps other desks' enrollments out)
+        db.execute(
+            insert(Enrollment)
+            .from_select(
+                ["student_id", "course_id", "academic_year", "semester", "status"],
+                missing_pairs,
+            )
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+        # counted after the insert: the pairs it skipped were not inserted
+        inserted = dict(db.execute(
+            select(Enrollment.course_id, func.count())
+            .where(Enrollment.id > last_id)
+            .group_by(Enrollment.course_id)
+        ).all())
+        for course in report.courses:
+            course["inserted"] = inserted.get(course["id"], 0)
+            course["already_enrolled"] = report.students - course["inserted"]
+        report.inserted = sum(inserted.values())
+        report.already_enrolled = report.students * len(found) - report.inserted
+
+        waitlisted = _waitlist_overflow(db, courses, academic_year, semester, last_id)
+        for course in report.courses:
+            course["waitlisted"] = waitlisted.get(course["id"], 0)
+        report.waitlisted = sum(waitlisted.values())
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enroll a department level into courses.")
+    parser.add_argument("--department", type=int, required=True)
+    parser.add_argument("--level", type=int, required=True)
+    parser.add_argument("--year", required=True, help="academic year, e.g. 2025/2026")
+    parser.add_argument("--semester", type=int, required=True)
+    parser.add_argument("--courses", type=int, nargs="+", required=True, help="course ids")
+    parser.add_argument("--status", default=DEFAULT_STATUS)
+    parser.add_argument("--dry-run", action="store_true", help="report only, insert nothing")
+    args = parser.parse_args(argv)
+
+    with session_scope() as db:
+        report = enroll_cohort(
+            db, args.department, args.level, args.year, args.semester,
+            args.courses, status=args.status, dry_run=args.dry_run,
+        )
+
+    for course in report.courses:
+        print(f"{course['code']:<12}{course['inserted']:>8,} new{course['already_enrolled']:>8,} already"
+              f"{course['waitlisted']:>8,} waitlisted")
+    for course_id in report.unknown_courses:
+        print(f"course {course_id}: not found")
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,71 @@
 # database.py
-from sqlalchemy import create_engine
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-# SQLite database file (will be created in the project folder)
-DATABASE_URL = "sqlite:///university_mis.db"
+# SQLite database file (will be created in the project folder).
+# MIS_DATABASE_URL points the app/benchmarks at another database.
+DATABASE_URL = os.environ.get("MIS_DATABASE_URL", "sqlite:///university_mis.db")
+
+# Engine profile: "tuned" (default) or "default" (plain SQLite settings).
+ENGINE_PROFILE = os.environ.get("MIS_DB_PROFILE", "tuned")
+
+# SQL logging: MIS_LOG_LEVEL=INFO prints every statement (what echo=True
+# used to do), DEBUG also prints result rows. Quiet by default.
+LOG_LEVEL = os.environ.get("MIS_LOG_LEVEL", "WARNING").upper()
+
+# PRAGMAs applied to every new SQLite connection, per profile
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",          # readers don't block the writer
+        "synchronous": "NORMAL",        # safe with WAL, far fewer fsyncs
+        "cache_size": -65536,           # 64 MB page cache (negative = KiB)
+        "mmap_size": 268435456,         # 256 MB memory-mapped reads
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+}
+
+
+def make_engine(url: str = DATABASE_URL, profile: str = ENGINE_PROFILE, **engine_options):
+    """Create an engine and apply the profile's PRAGMAs on each connection.
+
+    `engine_options` go to create_engine (e.g. the server's pool sizing).
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown engine profile '{profile}'")
+
+    connect_args = {}
+    if url.startswith("sqlite"):
+        # pooled connections are checked out by query executor threads too
+        connect_args["check_same_thread"] = False
+
+    new_engine = create_engine(url, future=True, connect_args=connect_args, **engine_options)
+    pragmas = SQLITE_PROFILES[profile]
+
+    if new_engine.dialect.name == "sqlite" and pragmas:
+        @event.listens_for(new_engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return new_engine
+
+
+sql_logger = logging.getLogger("sqlalchemy.engine")
+sql_logger.setLevel(LOG_LEVEL)
+if sql_logger.isEnabledFor(logging.INFO) and not logging.getLogger().handlers:
+    logging.basicConfig(format="%(asctime)s %(name)s: %(message)s")
 
 # The engine is the connection to the database
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,        # prints SQL queries in the terminal (useful for learning)
-    future=True
-)
+engine = make_engine()
 
 # Session factory: we will use this to talk to the DB from our code
 SessionLocal = sessionmaker(
@@ -20,5 +75,46 @@ SessionLocal = sessionmaker(
     future=True
 )
 
+
+@contextmanager
+def session_scope():
+    """One unit of work: a fresh session, committed on success, rolled back
+    on error and always closed, so no identity map outlives the action."""
+    session = SessionLocal()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def begin_immediate(session) -> float:
+    """Take SQLite's write lock for the session's transaction now.
+
+    For read-then-write units of work (e.g. counting free seats, then
+    taking one) that must not interleave with another connection's write,
+    in this process or another. Plain reads keep going (WAL); other
+    writers wait until the session commits or rolls back. Must come before
+    the reads it protects. Returns the seconds spent waiting for the lock,
+    also summed in session.info["lock_wait_seconds"].
+    """
+    conn = session.connection()
+    if conn.dialect.name != "sqlite":
+        return 0.0
+    dbapi_connection = conn.connection.dbapi_connection
+    if dbapi_connection.in_transaction:
+        # the driver only opens a transaction for a write, so the lock is held
+        return 0.0
+
+    started = time.perf_counter()
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+    waited = time.perf_counter() - started
+    session.info["lock_wait_seconds"] = session.info.get("lock_wait_seconds", 0.0) + waited
+    return waited
+
+
 # Base class for all our models (tables)
 Base = declarative_base()
@@ -0,0 +1,318 @@
+# enrollment_summary.py
+"""
+Enrollment counts by status, kept up to date by SQLite triggers.
+
+Two summary tables hold the number of enrollments per key and status:
+    enrollment_course_counts       (course_id, academic_year, semester, status) -> n
+    enrollment_department_counts   (department_id, academic_year, semester, status) -> n
+The department is the course's. Keys are never NULL: a missing year is
+'', a missing semester 0, a course without a department 0 and a missing
+status '' (the COALESCE defaults of the enrollment indexes).
+
+Triggers on `enrollments` (insert, delete, and updates of course, term or
+status) and on `courses` (a department change moves its counts) keep the
+tables in step inside the writing transaction, whoever writes: the ORM,
+Core bulk inserts (cohort enrollment, seed data) or plain SQL. Reports
+read the summaries only: per course and per department directly, per
+academic year by adding up the department rows (a few hundred at most).
+
+Usage (existing databases):
+    python enrollment_summary.py                      # create the tables + triggers if missing
+    python enrollment_summary.py rebuild              # recount everything from enrollments
+    python enrollment_summary.py check                # compare with a fresh count
+    python enrollment_summary.py report [--by course|department|year] [--year 2025/2026]
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import column, func, inspect, select, table, text
+
+from database import engine, session_scope
+from models import Course, Department, Faculty
+
+
+COURSE_COUNTS = "enrollment_course_counts"
+DEPARTMENT_COUNTS = "enrollment_department_counts"
+
+# the key of an enrollment row, as stored in the summaries
+_KEY = {
+    "academic_year": "COALESCE({row}.academic_year, '')",
+    "semester": "COALESCE({row}.semester, 0)",
+    "status": "COALESCE({row}.status, '')",
+}
+
+
+def _key(row: str) -> str:
+    return ", ".join(expr.format(row=row) for expr in _KEY.values())
+
+
+def _department_of(course_id: str) -> str:
+    return f"COALESCE((SELECT department_id FROM courses WHERE id = {course_id}), 0)"
+
+
+def _add(row: str, sign: str) -> str:
+    """Statements adding `sign`1 to the counts of enrollment `row` (new / old)."""
+    statements = []
+    for summary, owner_column, owner in (
+        (COURSE_COUNTS, "course_id", f"{row}.course_id"),
+        (DEPARTMENT_COUNTS, "department_id", _department_of(f"{row}.course_id")),
+    ):
+        if sign == "+":
+            statements.append(f"""
+        INSERT INTO {summary} ({owner_column}, academic_year, semester, status, n)
+        VALUES ({owner}, {_key(row)}, 1)
+        ON CONFLICT ({owner_column}, academic_year, semester, status) DO UPDATE SET n = n + 1;""")
+        else:
+            match = (f"{owner_column} = {owner} AND academic_year = {_KEY['academic_year'].format(row=row)}"
+                     f" AND semester = {_KEY['semester'].format(row=row)}"
+                     f" AND status = {_KEY['status'].format(row=row)}")
+            statements.append(f"""
+        UPDATE {summary} SET n = n - 1 WHERE {match};
+        DELETE FROM {summary} WHERE {match} AND n <= 0;""")
+    return "".join(statements)
+
+
+CREATE_STATEMENTS = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {COURSE_COUNTS} (
+        course_id INTEGER NOT NULL,
+        academic_year VARCHAR NOT NULL,
+        semester INTEGER NOT NULL,
+        status VARCHAR NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (course_id, academic_year, semester, status)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {DEPARTMENT_COUNTS} (
+        department_id INTEGER NOT NULL,
+        academic_year VARCHAR NOT NULL,
+        semester INTEGER NOT NULL,
+        status VARCHAR NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (department_id, academic_year, semester, status)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS enrollment_counts_ai AFTER INSERT ON enrollments BEGIN
+        {_add("new", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS enrollment_counts_ad AFTER DELETE ON enrollments BEGIN
+        {_add("old", "-")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS enrollment_counts_au
+    AFTER UPDATE OF course_id, academic_year, semester, status ON enrollments
+    WHEN old.course_id IS NOT new.course_id OR old.academic_year IS NOT new.academic_year
+      OR old.semester IS NOT new.semester OR old.status IS NOT new.status
+    BEGIN
+        {_add("old", "-")}
+        {_add("new", "+")}
+    END
+    """,
+    # a course moved to another department takes its counts along
+    f"""
+    CREATE TRIGGER IF NOT EXISTS enrollment_counts_course_department
+    AFTER UPDATE OF department_id ON courses
+    WHEN old.department_id IS NOT new.department_id
+    BEGIN
+        UPDATE {DEPARTMENT_COUNTS} SET n = n - (
+            SELECT c.n FROM {COURSE_COUNTS} c
+            WHERE c.course_id = new.id AND c.academic_year = {DEPARTMENT_COUNTS}.academic_year
+              AND c.semester = {DEPARTMENT_COUNTS}.semester AND c.status = {DEPARTMENT_COUNTS}.status
+        )
+        WHERE department_id = COALESCE(old.department_id, 0) AND EXISTS (
+            SELECT 1 FROM {COURSE_COUNTS} c
+            WHERE c.course_id = new.id AND c.academic_year = {DEPARTMENT_COUNTS}.academic_year
+              AND c.semester = {DEPARTMENT_COUNTS}.semester AND c.status = {DEPARTMENT_COUNTS}.status
+        );
+        DELETE FROM {DEPARTMENT_COUNTS} WHERE department_id = COALESCE(old.department_id, 0) AND n <= 0;
+        INSERT INTO {DEPARTMENT_COUNTS} (department_id, academic_year, semester, status, n)
+        SELECT COALESCE(new.department_id, 0), academic_year, semester, status, n
+        FROM {COURSE_COUNTS} WHERE course_id = new.id
+        ON CONFLICT (department_id, academic_year, semester, status) DO UPDATE SET n = n + excluded.n;
+    END
+    """,
+]
+
+# what the summaries should hold, counted from scratch
+FRESH_COUNTS = {
+    COURSE_COUNTS: f"""
+        SELECT course_id, {_key("e")}, COUNT(*) FROM enrollments e
+        GROUP BY 1, 2, 3, 4
+    """,
+    DEPARTMENT_COUNTS: f"""
+        SELECT COALESCE(c.department_id, 0), {_key("e")}, COUNT(*)
+        FROM enrollments e JOIN courses c ON c.id = e.course_id
+        GROUP BY 1, 2, 3, 4
+    """,
+}
+
+course_counts = table(
+    COURSE_COUNTS, column("course_id"), column("academic_year"), column("semester"),
+    column("status"), column("n"),
+)
+department_counts = table(
+    DEPARTMENT_COUNTS, column("department_id"), column("academic_year"), column("semester"),
+    column("status"), column("n"),
+)
+
+
+# ---------- Setup and repair ----------
+
+def create_enrollment_summary(conn):
+    """Create the summary tables and triggers on an open connection (idempotent)."""
+    is_new = not inspect(conn).has_table(COURSE_COUNTS)
+    for stmt in CREATE_STATEMENTS:
+        conn.execute(text(stmt))
+    if is_new:
+        # count the enrollments that existed before the triggers
+        _recount(conn)
+
+
+def _recount(conn):
+    for summary, fresh in FRESH_COUNTS.items():
+        conn.execute(text(f"DELETE FROM {summary}"))
+        conn.execute(text(f"INSERT INTO {summary} {fresh}"))
+
+
+def rebuild(bind=engine) -> float:
+    """Recount both summaries from the enrollments table; the seconds it took."""
+    started = time.perf_counter()
+    with bind.begin() as conn:
+        create_enrollment_summary(conn)
+        _recount(conn)
+    return time.perf_counter() - started
+
+
+def check(bind=engine) -> list:
+    """Differences between the summaries and a fresh count (empty list = consistent).
+
+    Each is (summary table, key tuple, expected n, stored n); a missing row
+    counts as 0.
+    """
+    problems = []
+    with bind.connect() as conn:
+        for summary, fresh in FRESH_COUNTS.items():
+            stored_rows = conn.execute(text(
+                f"SELECT * FROM {summary} WHERE n != 0"
+            )).all()
+            stored = {tuple(row[:4]): row[4] for row in stored_rows}
+            expected = {tuple(row[:4]): row[4] for row in conn.execute(text(fresh))}
+            for key in expected.keys() | stored.keys():
+                if expected.get(key, 0) != stored.get(key, 0):
+                    problems.append((summary, key, expected.get(key, 0), stored.get(key, 0)))
+    return sorted(problems, key=lambda p: (p[0], tuple(str(k) for k in p[1])))
+
+
+# ---------- Reports (summaries only) ----------
+
+GROUPINGS = ("course", "department", "year")
+
+
+def report(db, by: str = "course", academic_year: str = None) -> dict:
+    """{"statuses": [...], "rows": [{"label", "detail", "counts": {status: n}, "total"}]}.
+
+    by "course" or "department" (optionally for one academic year) or
+    "year" (one row per academic year).
+    """
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{by}' ({', '.join(GROUPINGS)})")
+
+    if by == "course":
+        query = (
+            select(Course.code, Course.name, course_counts.c.status, func.sum(course_counts.c.n))
+            .join(Course, Course.id == course_counts.c.course_id)
+            .group_by(Course.id, course_counts.c.status)
+            .order_by(Course.code)
+        )
+        year_column = course_counts.c.academic_year
+    elif by == "department":
+        query = (
+            select(
+                func.coalesce(Department.name, "No department"), Faculty.name,
+                department_counts.c.status, func.sum(department_counts.c.n),
+            )
+            .outerjoin(Department, Department.id == department_counts.c.department_id)
+            .outerjoin(Faculty, Faculty.id == Department.faculty_id)
+            .group_by(department_counts.c.department_id, department_counts.c.status)
+            .order_by(Faculty.name, Department.name)
+        )
+        year_column = department_counts.c.academic_year
+    else:
+        query = (
+            select(
+                department_counts.c.academic_year, None,
+                department_counts.c.status, func.sum(department_counts.c.n),
+            )
+            .group_by(department_counts.c.academic_year, department_counts.c.status)
+            .order_by(department_counts.c.academic_year.desc())
+        )
+        year_column = department_counts.c.academic_year
+
+    if academic_year is not None and by != "year":
+        query = query.where(year_column == academic_year)
+
+    rows, statuses = {}, set()
+    for label, detail, status, n in db.execute(query):
+        row = rows.get((label, detail))
+        if row is None:
+            row = rows[(label, detail)] = {"label": label or "(no year)", "detail": detail,
+                                           "counts": {}, "total": 0}
+        status = status or "(none)"
+        statuses.add(status)
+        row["counts"][status] = row["counts"].get(status, 0) + n
+        row["total"] += n
+    return {"statuses": sorted(statuses), "rows": list(rows.values())}
+
+
+def academic_years(db) -> list:
+    """The academic years with enrollments, newest first."""
+    return list(db.execute(
+        select(department_counts.c.academic_year).distinct()
+        .where(department_counts.c.academic_year != "")
+        .order_by(department_counts.c.academic_year.desc())
+    ).scalars())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enrollment summary tables.")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("create", help="create the tables and triggers if missing (default)")
+    sub.add_parser("rebuild", help="recount the summaries from the enrollments table")
+    sub.add_parser("check", help="compare the summaries with a fresh count")
+    report_parser = sub.add_parser("report", help="print a report from the summaries")
+    report_parser.add_argument("--by", choices=GROUPINGS, default="department")
+    report_parser.add_argument("--year", help="academic year, e.g. 2025/2026")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        print(f"Summaries rebuilt in {rebuild():.2f}s.")
+    elif args.command == "check":
+        problems = check()
+        for summary, key, expected, stored in problems[:50]:
+            print(f"{summary} {key}: expected {expected}, stored {stored}")
+        print(f"{len(problems)} difference(s)." if problems else "Summaries are consistent.")
+        return 1 if problems else 0
+    elif args.command == "report":
+        with session_scope() as db:
+            result = report(db, args.by, args.year)
+        statuses = result["statuses"]
+        print(f"{'':<40}" + "".join(f"{s[:12]:>13}" for s in statuses) + f"{'Total':>10}")
+        for row in result["rows"]:
+            print(f"{row['label'][:39]:<40}"
+                  + "".join(f"{row['counts'].get(s, 0):>13,}" for s in statuses)
+                  + f"{row['total']:>10,}")
+    else:
+        with engine.begin() as conn:
+            create_enrollment_summary(conn)
+        print("Enrollment summary tables are in place.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# gpa.py
+"""
+Grade point averages for every student at once.
+
+A GPA is the credit-weighted mean of the grade points of a student's
+graded enrollments:
+
+    GPA = sum(grade_points * credits) / sum(credits)
+
+The term GPA uses one term's enrollments, the cumulative GPA all of them
+up to and including that term. Instead of a loop per student, all graded
+enrollments are read with one query into NumPy arrays, sorted by
+(student, term) and reduced group-wise (np.add.reduceat / np.cumsum), so
+recomputing a whole university is a few vectorized passes.
+
+The result is cached process-wide and dropped when a session commits a
+change to enrollments or courses (grades, credits), like reference_cache.
+Enrollments without a grade, and courses without credits, do not count.
+
+Headless usage:
+    python gpa.py                   # summary of the whole database
+    python gpa.py 2025-0000123      # one student's terms
+"""
+import sys
+import threading
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import Integer, cast, event, func, select
+
+from database import SessionLocal
+from models import Student, Course, Enrollment
+
+
+# letter grade -> grade points (4.0 scale)
+GRADE_POINTS = {
+    "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0,
+    "F": 0.0,
+}
+GRADES = list(GRADE_POINTS)
+
+TERM_KEY_SPAN = 100_000     # term codes (year * 10 + semester) are below this
+
+_lock = threading.Lock()
+_results = None
+_version = 0        # bumped by invalidate(), so a computation that raced it is not kept
+
+
+def points_for(grade):
+    """Grade points of a letter grade; None for no grade."""
+    if grade is None or grade == "":
+        return None
+    try:
+        return GRADE_POINTS[grade.strip().upper()]
+    except (KeyError, AttributeError):
+        raise ValueError(f"Unknown grade: {grade!r} (expected one of {', '.join(GRADES)})")
+
+
+def term_label(code: int) -> str:
+    """20242 (see load_arrays) -> "2024/2025 S2"."""
+    year, semester = divmod(int(code), 10)
+    if not year:
+        return f"Semester {semester}" if semester else "No term"
+    return f"{year}/{year + 1} S{semester}" if semester else f"{year}/{year + 1}"
+
+
+class GpaResults:
+    """Read-only GPA tables; per student rows are found with a binary search."""
+
+    def __init__(self, student_ids, credits, gpa,
+                 term_student_ids, terms, term_credits, term_gpa, cumulative_gpa):
+        # one row per student, sorted by id
+        self.student_ids = student_ids
+        self.credits = credits
+        self.gpa = gpa
+        # one row per (student, term), sorted by student then term
+        self.term_student_ids = term_student_ids
+        self.terms = terms
+        self.term_credits = term_credits
+        self.term_gpa = term_gpa
+        self.cumulative_gpa = cumulative_gpa
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def gpa_of(self, student_id):
+        i = np.searchsorted(self.student_ids, student_id)
+        if i < len(self.student_ids) and self.student_ids[i] == student_id:
+            return float(self.gpa[i])
+        return None
+
+    def for_student(self, student_id):
+        """{"gpa", "credits", "terms": [{term, label, credits, gpa, cumulative_gpa}]} or None."""
+        i = np.searchsorted(self.student_ids, student_id)
+        if i == len(self.student_ids) or self.student_ids[i] != student_id:
+            return None
+        lo = np.searchsorted(self.term_student_ids, student_id, side="left")
+        hi = np.searchsorted(self.term_student_ids, student_id, side="right")
+        return {
+            "gpa": round(float(self.gpa[i]), 2),
+            "credits": float(self.credits[i]),
+            "terms": [
+                {
+                    "term": int(self.terms[k]),
+                    "label": term_label(self.terms[k]),
+                    "credits": float(self.term_credits[k]),
+                    "gpa": round(float(self.term_gpa[k]), 2),
+                    "cumulative_gpa": round(float(self.cumulative_gpa[k]), 2),
+                }
+                for k in range(lo, hi)
+            ],
+        }
+
+    def summary(self) -> dict:
+        if not len(self):
+            return {"students": 0, "mean_gpa": None, "median_gpa": None}
+        return {
+            "students": len(self),
+            "mean_gpa": round(float(self.gpa.mean()), 2),
+            "median_gpa": round(float(np.median(self.gpa)), 2),
+        }
+
+
+# ---------- Computation ----------
+
+def compute(student_ids, terms, grade_points, credits) -> GpaResults:
+    """Term and cumulative GPAs from one row per graded enrollment (any order)."""
+    student_ids = np.asarray(student_ids, dtype=np.int64)
+    terms = np.asarray(terms, dtype=np.int64)
+    grade_points = np.asarray(grade_points, dtype=np.float64)
+    credits = np.asarray(credits, dtype=np.float64)
+
+    counted = ~np.isnan(grade_points) & (credits > 0)
+    if not counted.all():
+        student_ids, terms = student_ids[counted], terms[counted]
+        grade_points, credits = grade_points[counted], credits[counted]
+
+    if not len(student_ids):
+        empty_ids, empty = np.empty(0, np.int64), np.empty(0, np.float64)
+        return GpaResults(empty_ids, empty, empty, empty_ids, empty_ids, empty, empty, empty)
+
+    # one int64 key (terms are < 100000); a stable sort is near-linear on rows
+    # that already come grouped by student, as they do from the database
+    order = np.argsort(student_ids * TERM_KEY_SPAN + terms, kind="stable")
+    student_ids, terms = student_ids[order], terms[order]
+    quality_points = grade_points[order] * credits[order]
+    credits = credits[order]
+
+    # (student, term) groups
+    new_term = np.empty(len(student_ids), dtype=bool)
+    new_term[0] = True
+    new_term[1:] = (student_ids[1:] != student_ids[:-1]) | (terms[1:] != terms[:-1])
+    term_starts = np.flatnonzero(new_term)
+    term_student_ids = student_ids[term_starts]
+    term_terms = terms[term_starts]
+    term_quality = np.add.reduceat(quality_points, term_starts)
+    term_credits = np.add.reduceat(credits, term_starts)
+
+    # students: runs of term rows
+    new_student = np.empty(len(term_starts), dtype=bool)
+    new_student[0] = True
+    new_student[1:] = term_student_ids[1:] != term_student_ids[:-1]
+    student_starts = np.flatnonzero(new_student)
+    terms_per_student = np.diff(np.append(student_starts, len(term_starts)))
+
+    # cumulative to each term: one running sum over everything, minus what
+    # came before the student's first term
+    running_quality = np.cumsum(term_quality)
+    running_credits = np.cumsum(term_credits)
+    before_quality = np.repeat((running_quality - term_quality)[student_starts], terms_per_student)
+    before_credits = np.repeat((running_credits - term_credits)[student_starts], terms_per_student)
+    cumulative_gpa = (running_quality - before_quality) / (running_credits - before_credits)
+
+    student_quality = np.add.reduceat(term_quality, student_starts)
+    student_credits = np.add.reduceat(term_credits, student_starts)
+
+    return GpaResults(
+        term_student_ids[student_starts], student_credits, student_quality / student_credits,
+        term_student_ids, term_terms, term_credits, term_quality / term_credits, cumulative_gpa,
+    )
+
+
+def load_arrays(db):
+    """(student_ids, terms, grade_points, credits) of every graded enrollment."""
+    year = cast(func.coalesce(func.substr(Enrollment.academic_year, 1, 4), "0"), Integer)
+    term = year * 10 + func.coalesce(Enrollment.semester, 0)
+    result = db.execute(
+        select(Enrollment.student_id, term, Enrollment.grade_points, Course.credits)
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.grade_points.isnot(None), Course.credits > 0)
+    )
+    # streamed straight into one flat array, no list of rows in between
+    table = np.fromiter(chain.from_iterable(result), dtype=np.float64).reshape(-1, 4)
+    return table[:, 0].astype(np.int64), table[:, 1].astype(np.int64), table[:, 2], table[:, 3]
+
+
+def load(db) -> GpaResults:
+    return compute(*load_arrays(db))
+
+
+def get(db=None) -> GpaResults:
+    """The cached results, computed first if needed (safe from worker threads)."""
+    global _results
+
+    results = _results
+    if results is not None:
+        return results
+
+    version = _version
+    if db is not None:
+        results = load(db)
+    else:
+        with SessionLocal() as session:
+            results = load(session)
+
+    with _lock:
+        if _version == version:
+            _results = results
+    return results
+
+
+def invalidate():
+    global _results, _version
+    with _lock:
+        _results = None
+        _version += 1
+
+
+# ---------- Automatic invalidation ----------
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_grade_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Enrollment, Course)):
+            session.info["grades_changed"] = True
+            return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("grades_changed", False):
+        invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("grades_changed", None)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    with SessionLocal() as db:
+        results = load(db)
+        if not argv:
+            summary = results.summary()
+            print(f"{summary['students']:,} students with grades, "
+                  f"mean GPA {summary['mean_gpa']}, median {summary['median_gpa']}")
+            return 0
+
+        student = db.query(Student).filter(Student.university_id == argv[0]).first()
+        if student is None:
+            print(f"No student with university ID {argv[0]}")
+            return 1
+        record = results.for_student(student.id)
+        if record is None:
+            print(f"{student.full_name}: no graded courses")
+            return 0
+        print(f"{student.full_name}: GPA {record['gpa']:.2f} over {record['credits']:g} credits")
+        for t in record["terms"]:
+            print(f"  {t['label']:<16}{t['credits']:>6g} cr  term {t['gpa']:.2f}"
+                  f"  cumulative {t['cumulative_gpa']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
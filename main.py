@@ -1,5 +1,9 @@
+from startup_timing import timer     # first: reference point for import time
+
 import sys
 import os
+import importlib
+import time
 
 from PyQt5.QtWidgets import (
     QApplication,
@@ -16,15 +20,30 @@ from PyQt5.QtWidgets import (
     QStackedWidget,
 )
 from PyQt5.QtGui import QPixmap, QIcon
-from PyQt5.QtCore import Qt
-
-from database import SessionLocal
-from models import User
-from pages.students_page import StudentsPage
-from pages.courses_page import CoursesPage
-from pages.instructors_page import InstructorsPage
-from pages.dashboard_page import DashboardPage
-from pages.enrollments_page import EnrollmentsPage
+from PyQt5.QtCore import Qt, QTimer
+
+from migrations import upgrade
+import action_profiler
+import api_client
+import session_monitor
+import sql_trace
+
+timer.mark("imports")
+
+# Pages in sidebar order: (title, module, class). Page modules are only
+# imported when the page is first built.
+PAGES = [
+    ("Dashboard", "pages.dashboard_page", "DashboardPage"),        # 0
+    ("Students", "pages.students_page", "StudentsPage"),           # 1
+    ("Courses", "pages.courses_page", "CoursesPage"),              # 2
+    ("Enrollments", "pages.enrollments_page", "EnrollmentsPage"),  # 3
+    ("Instructors", "pages.instructors_page", "InstructorsPage"),  # 4
+    ("Reports", "pages.reports_page", "ReportsPage"),              # 5
+]
+
+# Build the other pages in the background once the window is painted
+# (MIS_WARM_PAGES=0 builds each page only on its first visit).
+WARM_PAGES = os.environ.get("MIS_WARM_PAGES", "1") != "0"
 
 # --------------------------------------------------------------------
 #  Absolute path to the logo 
@@ -101,7 +120,7 @@ QPushButton:disabled {
     color: #777777;
 }
 
-QTableWidget {
+QTableWidget, QTableView {
     background-color: #ffffff;
     gridline-color: #d0d4df;
     border: 1px solid #d0d4df;
@@ -113,7 +132,7 @@ QHeaderView::section {
     padding: 4px;
 }
 
-QTableWidget::item:selected {
+QTableWidget::item:selected, QTableView::item:selected {
     background-color: #e1e6f5;
     color: #0b1b3b;
 }
@@ -190,14 +209,14 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Error", "Please enter username and password.")
             return
 
-        db = SessionLocal()
         try:
-            user = db.query(User).filter_by(username=username, password_hash=password).first()
-        finally:
-            db.close()
+            user = api_client.call("auth.login", username=username, password=password)
+        except api_client.OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
         if user:
-            self.logged_in_username = user.username
+            self.logged_in_username = user["username"]
             self.accept()
         else:
             QMessageBox.warning(self, "Error", "Invalid username or password.")
@@ -260,6 +279,7 @@ class MainWindow(QMainWindow):
     def __init__(self, username):
         super().__init__()
 
+        self.init_started = time.perf_counter()
         self.username = username
 
         self.setWindowTitle("Sadat Academy for Management Science - MIS System")
@@ -317,6 +337,7 @@ class MainWindow(QMainWindow):
         self.btn_courses = make_btn("Courses")
         self.btn_enrollments = make_btn("Enrollments")
         self.btn_instructors = make_btn("Instructors")
+        self.btn_reports = make_btn("Reports")
         self.btn_about = make_btn("About")
         self.btn_about.setCheckable(False)
         self.btn_exit = make_btn("Exit")
@@ -327,6 +348,7 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(self.btn_courses)
         sidebar_layout.addWidget(self.btn_enrollments)
         sidebar_layout.addWidget(self.btn_instructors)
+        sidebar_layout.addWidget(self.btn_reports)
         sidebar_layout.addSpacing(20)
 
         sidebar_layout.addWidget(self.btn_about)
@@ -334,12 +356,13 @@ class MainWindow(QMainWindow):
         sidebar_layout.addStretch()
 
         # ---------------- CONTENT PAGES ----------------
+        # Empty placeholders; each page is built on its first visit
         self.pages = QStackedWidget()
-        self.pages.addWidget(DashboardPage())     # 0
-        self.pages.addWidget(StudentsPage())      # 1
-        self.pages.addWidget(CoursesPage())       # 2
-        self.pages.addWidget(EnrollmentsPage())   # 3
-        self.pages.addWidget(InstructorsPage())   # 4
+        self.built_pages = {}
+        for _ in PAGES:
+            self.pages.addWidget(QWidget())
+
+        self.ensure_page(0)     # dashboard is shown immediately
 
         # Page switching
         self.btn_dashboard.clicked.connect(lambda: self.switch_page(0, self.btn_dashboard))
@@ -347,6 +370,7 @@ class MainWindow(QMainWindow):
         self.btn_courses.clicked.connect(lambda: self.switch_page(2, self.btn_courses))
         self.btn_enrollments.clicked.connect(lambda: self.switch_page(3, self.btn_enrollments))
         self.btn_instructors.clicked.connect(lambda: self.switch_page(4, self.btn_instructors))
+        self.btn_reports.clicked.connect(lambda: self.switch_page(5, self.btn_reports))
 
         self.btn_about.clicked.connect(self.show_about_dialog)
         self.btn_exit.clicked.connect(self.close)
@@ -362,10 +386,74 @@ class MainWindow(QMainWindow):
         # ---------- STATUS BAR ----------
         self.statusBar().showMessage(f"Logged in as: {self.username}")
 
+        # ---------- SQL COST PER ACTION (MIS_SQL_TRACE) ----------
+        if sql_trace.ENABLED:
+            self.sql_label = QLabel()
+            self.statusBar().addPermanentWidget(self.sql_label)
+            sql_trace.install_event_loop(
+                lambda fn: QTimer.singleShot(0, fn),
+                scope=lambda: PAGES[self.pages.currentIndex()][0],
+            )
+            sql_trace.add_listener(self.show_sql_cost)
+
+        # ---------- SESSION MEMORY REPORT (MIS_SESSION_REPORT) ----------
+        if session_monitor.REPORT_TARGET:
+            self.session_report_timer = QTimer(self)
+            self.session_report_timer.timeout.connect(session_monitor.report)
+            self.session_report_timer.start(session_monitor.SAMPLE_SECONDS * 1000)
+
+        timer.mark("main window init", since=self.init_started)
+
+    def ensure_page(self, index):
+        """Build page `index` (replacing its placeholder) if not built yet."""
+        page = self.built_pages.get(index)
+        if page is not None:
+            return page
+
+        title, module_name, class_name = PAGES[index]
+        with timer.measure(f"page: {title}"), sql_trace.action(f"{title}: build"):
+            page_class = getattr(importlib.import_module(module_name), class_name)
+            action_profiler.instrument(page_class)      # MIS_PROFILE only
+            page = page_class()
+
+        placeholder = self.pages.widget(index)
+        current = self.pages.currentIndex()
+        self.pages.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.pages.insertWidget(index, page)
+        self.pages.setCurrentIndex(current)
+
+        self.built_pages[index] = page
+        return page
+
+    def on_first_paint(self):
+        timer.mark("first paint (since window init)", since=self.init_started)
+        if WARM_PAGES:
+            QTimer.singleShot(0, self.warm_next_page)
+        else:
+            timer.report()
+
+    def warm_next_page(self):
+        """Build one not-yet-visited page per event-loop turn."""
+        for index in range(len(PAGES)):
+            if index not in self.built_pages:
+                self.ensure_page(index)
+                QTimer.singleShot(0, self.warm_next_page)
+                return
+        timer.report()
+
     def switch_page(self, index, button):
-        self.pages.setCurrentIndex(index)
+        with sql_trace.action(f"{PAGES[index][0]}: open"):
+            self.ensure_page(index)
+            self.pages.setCurrentIndex(index)
         button.setChecked(True)
 
+    def show_sql_cost(self, action):
+        self.sql_label.setText(action.summary())
+        self.sql_label.setToolTip("\n".join(
+            f"{count}x {' '.join(sql.split())[:120]}" for sql, count, _ in action.n_plus_one()
+        ) or "No repeated statements")
+
     def show_about_dialog(self):
         dlg = AboutDialog(self)
         dlg.exec_()
@@ -378,11 +466,19 @@ if __name__ == "__main__":
     app.setStyleSheet(APP_STYLESHEET)
     app.setWindowIcon(QIcon(LOGO_PATH))
 
+    # create / upgrade the schema in place (no-op when up to date);
+    # a client of server.py has no database of its own
+    if not api_client.REMOTE:
+        with timer.measure("schema upgrade"):
+            upgrade()
+
     login = LoginDialog()
     if login.exec_() == QDialog.Accepted:
         username = login.logged_in_username or "admin"
         window = MainWindow(username)
         window.showMaximized()
+        # runs once the event loop has processed the first paint
+        QTimer.singleShot(0, window.on_first_paint)
         sys.exit(app.exec_())
     else:
         sys.exit(0)
@@ -0,0 +1,188 @@
+# migrations.py
+"""
+Versioned schema migrations for the SQLite database.
+
+The schema version lives in SQLite's `PRAGMA user_version`. `upgrade()`
+runs every migration newer than the stored version, each in its own
+transaction (an explicit BEGIN, so DDL is rolled back too), and bumps
+the version after it. Existing university_mis.db files are upgraded in
+place; a new database goes through the same steps.
+
+Every step must be safe on a database that `create_all` already brought
+up to date (use IF NOT EXISTS / add_column_if_missing).
+
+Usage:
+    python migrations.py            # upgrade to the latest version
+    python migrations.py status     # show current and latest version
+"""
+import logging
+import sys
+
+from sqlalchemy.exc import OperationalError
+
+from database import Base, engine
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from enrollment_summary import create_enrollment_summary
+from student_search import create_student_fts
+
+
+logger = logging.getLogger(__name__)
+
+# where m003 keeps the duplicate enrollments it takes out of enrollments
+DUPLICATE_ENROLLMENTS_TABLE = "enrollments_duplicates"
+
+
+# ---------- helpers ----------
+
+def get_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def set_version(conn, version: int):
+    # PRAGMA does not take bound parameters
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def column_names(conn, table: str):
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def add_column_if_missing(conn, table: str, column: str, ddl: str):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there."""
+    if column not in column_names(conn, table):
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# ---------- migrations ----------
+
+def m001_baseline(conn):
+    """Create any missing tables (the original create_all schema)."""
+    Base.metadata.create_all(bind=conn)
+
+
+def m002_foreign_key_indexes(conn):
+    for name, table, column in [
+        ("ix_departments_faculty_id", "departments", "faculty_id"),
+        ("ix_students_department_id", "students", "department_id"),
+        ("ix_instructors_department_id", "instructors", "department_id"),
+        ("ix_courses_department_id", "courses", "department_id"),
+        ("ix_courses_instructor_id", "courses", "instructor_id"),
+        ("ix_enrollments_course_id", "enrollments", "course_id"),
+    ]:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
+
+def m003_unique_enrollment_per_term(conn):
+    """One enrollment per (student, course, academic year, semester).
+
+    Older databases may already contain duplicates (nothing prevented
+    them). The oldest row of each group is kept; the others are moved to
+    DUPLICATE_ENROLLMENTS_TABLE for the registrar to review, not dropped.
+    """
+    duplicates = """
+        FROM enrollments
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM enrollments
+            GROUP BY student_id, course_id,
+                     COALESCE(academic_year, ''), COALESCE(semester, 0)
+        )
+    """
+    count = conn.exec_driver_sql(f"SELECT COUNT(*) {duplicates}").scalar()
+    if count:
+        conn.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {DUPLICATE_ENROLLMENTS_TABLE} "
+            "AS SELECT * FROM enrollments WHERE 0"
+        )
+        conn.exec_driver_sql(f"INSERT INTO {DUPLICATE_ENROLLMENTS_TABLE} SELECT * {duplicates}")
+        conn.exec_driver_sql(f"DELETE {duplicates}")
+        logger.warning("Moved %d duplicate enrollment(s) to table %s before adding "
+                       "the unique index.", count, DUPLICATE_ENROLLMENTS_TABLE)
+
+    conn.exec_driver_sql("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollments_student_course_term
+        ON enrollments (student_id, course_id,
+                        COALESCE(academic_year, ''), COALESCE(semester, 0))
+    """)
+
+
+def m004_students_fts(conn):
+    """Full-text index for student search (skipped if SQLite lacks FTS5)."""
+    try:
+        # fails on the first statement (CREATE VIRTUAL TABLE) if FTS5 is missing
+        create_student_fts(conn)
+    except OperationalError:
+        logger.warning("SQLite has no FTS5 support, student search will use LIKE.")
+
+
+def m005_enrollment_grades(conn):
+    add_column_if_missing(conn, "enrollments", "grade", "VARCHAR")
+    add_column_if_missing(conn, "enrollments", "grade_points", "FLOAT")
+
+
+def m006_capacity_and_waitlist(conn):
+    add_column_if_missing(conn, "courses", "capacity", "INTEGER")
+    add_column_if_missing(conn, "enrollments", "waitlist_position", "INTEGER")
+    # seat counts per course and term (same expressions as the queries)
+    conn.exec_driver_sql("""
+        CREATE INDEX IF NOT EXISTS ix_enrollments_course_term_status
+        ON enrollments (course_id, COALESCE(academic_year, ''), COALESCE(semester, 0), status)
+    """)
+
+
+def m007_course_slots(conn):
+    # the table with its course_id index
+    models.CourseSlot.__table__.create(bind=conn, checkfirst=True)
+
+
+def m008_enrollment_summary(conn):
+    """Enrollment counts per course / department and term, kept by triggers."""
+    create_enrollment_summary(conn)
+
+
+MIGRATIONS = [
+    (1, "baseline schema", m001_baseline),
+    (2, "foreign-key indexes", m002_foreign_key_indexes),
+    (3, "unique enrollment per term", m003_unique_enrollment_per_term),
+    (4, "students full-text index", m004_students_fts),
+    (5, "enrollment grades", m005_enrollment_grades),
+    (6, "course capacity and waitlist", m006_capacity_and_waitlist),
+    (7, "course meeting slots", m007_course_slots),
+    (8, "enrollment summary tables", m008_enrollment_summary),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def upgrade(bind=engine) -> int:
+    """Apply pending migrations. Returns the resulting schema version."""
+    with bind.connect() as conn:
+        version = get_version(conn)
+
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        logger.info("Applying migration %03d: %s", number, description)
+        with bind.connect() as conn, conn.begin():
+            # pysqlite opens no transaction for DDL, so without an explicit
+            # BEGIN every statement of a migration would commit on its own
+            if conn.dialect.name == "sqlite":
+                conn.exec_driver_sql("BEGIN")
+            migrate(conn)
+            set_version(conn, number)
+        version = number
+
+    return version
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+
+    if command == "status":
+        with engine.connect() as conn:
+            print(f"Schema version {get_version(conn)} (latest {LATEST_VERSION}).")
+    elif command == "upgrade":
+        print(f"Database is at schema version {upgrade()}.")
+    else:
+        print("Usage: python migrations.py [upgrade|status]")
+        sys.exit(1)
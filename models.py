@@ -5,12 +5,15 @@ from sqlalchemy import (
     Column,
     Integer,
     String,
+    Float,
     Date,
-    ForeignKey
+    ForeignKey,
+    Index,
+    func,
 )
 from sqlalchemy.orm import relationship
 
-from database import Base, engine
+from database import Base
 
 
 # ---------- USER (for login) ----------
@@ -44,7 +47,7 @@ class Department(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
 
-    faculty_id = Column(Integer, ForeignKey("faculties.id"), nullable=False)
+    faculty_id = Column(Integer, ForeignKey("faculties.id"), nullable=False, index=True)
     faculty = relationship("Faculty", back_populates="departments")
 
     # relationships
@@ -68,7 +71,7 @@ class Student(Base):
     level = Column(Integer, nullable=True)      # 1, 2, 3, 4
     status = Column(String, default="active")   # active / graduated / suspended
 
-    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
 
     # relationships
     department = relationship("Department", back_populates="students")
@@ -86,7 +89,7 @@ class Instructor(Base):
     phone = Column(String, nullable=True)
     rank = Column(String, nullable=True)        # Assistant, Lecturer, etc.
 
-    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
     department = relationship("Department", back_populates="instructors")
 
 
@@ -100,36 +103,82 @@ class Course(Base):
     name = Column(String, nullable=False)
     credits = Column(Integer, nullable=True)
     semester = Column(Integer, nullable=True)            # 1 or 2
+    capacity = Column(Integer, nullable=True)            # seats per term; None = unlimited
 
-    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
-    instructor_id = Column(Integer, ForeignKey("instructors.id"), nullable=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
+    instructor_id = Column(Integer, ForeignKey("instructors.id"), nullable=True, index=True)
 
     # relationships
     department = relationship("Department", back_populates="courses")
     enrollments = relationship("Enrollment", back_populates="course")
+    slots = relationship(
+        "CourseSlot", back_populates="course", cascade="all, delete-orphan",
+        order_by="(CourseSlot.day, CourseSlot.start_minute)",
+    )
     # instructor simple link (no back_populates for now)
 
 
+# ---------- COURSE SLOT (weekly meeting time) ----------
+
+class CourseSlot(Base):
+    __tablename__ = "course_slots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
+    day = Column(Integer, nullable=False)               # 0 = Monday ... 6 = Sunday
+    start_minute = Column(Integer, nullable=False)      # minutes after midnight
+    end_minute = Column(Integer, nullable=False)        # exclusive: 09:00-10:30 = 540-630
+    room = Column(String, nullable=True)
+
+    course = relationship("Course", back_populates="slots")
+
+
 # ---------- ENROLLMENT (Student-Course registration) ----------
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
 
     id = Column(Integer, primary_key=True, index=True)
+    # student_id lookups use the unique index below (it leads with student_id)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     academic_year = Column(String, nullable=True)   # e.g. "2024/2025"
     semester = Column(Integer, nullable=True)       # 1 or 2
     status = Column(String, default="Enrolled")     # Enrolled / Withdrawn / Completed
+    grade = Column(String, nullable=True)           # letter grade, e.g. "B+" (see gpa.py)
+    grade_points = Column(Float, nullable=True)     # 0.0 - 4.0, set together with grade
+    waitlist_position = Column(Integer, nullable=True)  # order on the waitlist (see seat_allocation.py)
 
     # relationships
     student = relationship("Student", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
 
 
-# ---------- CREATE TABLES IN DB WHEN RUN DIRECTLY ----------
+# One registration per student, course and term. Empty academic year /
+# semester count as a value, so NULLs cannot slip duplicates past it.
+Index(
+    "uq_enrollments_student_course_term",
+    Enrollment.student_id,
+    Enrollment.course_id,
+    func.coalesce(Enrollment.academic_year, ""),
+    func.coalesce(Enrollment.semester, 0),
+    unique=True,
+)
+
+# Seats taken per course and term (seat_allocation.py counts these under a lock).
+Index(
+    "ix_enrollments_course_term_status",
+    Enrollment.course_id,
+    func.coalesce(Enrollment.academic_year, ""),
+    func.coalesce(Enrollment.semester, 0),
+    Enrollment.status,
+)
+
+
+# ---------- CREATE / UPGRADE TABLES IN DB WHEN RUN DIRECTLY ----------
 
 if __name__ == "__main__":
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    print("Creating / upgrading database tables...")
+    from migrations import upgrade
+    upgrade()
     print("Done.")
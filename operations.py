@@ -0,0 +1,558 @@
+# operations.py
+"""
+The record operations the pages perform, by name.
+
+Each operation is `fn(db, **params)`: it takes JSON-friendly parameters
+and returns JSON-friendly data (dicts, lists, numbers, strings), never
+ORM entities. The same functions back both ways the desk app can run:
+    - locally, against the SQLite file (api_client.call runs them directly)
+    - through server.py, which runs them for many desks over HTTP
+Operations never commit; the caller's unit of work does (see run_in_scope).
+
+Writes keep the process-wide search indexes and row-count cache of the
+process that ran them up to date, so on a server every desk searches
+the same, current index.
+"""
+import inspect
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, begin_immediate, session_scope
+from models import User, Student, Course, CourseSlot, Instructor, Enrollment
+from pagination import KeysetPager, DEFAULT_PAGE_SIZE, invalidate_counts
+import cohort_enrollment
+import enrollment_summary
+import gpa
+import reference_cache
+import repository
+import search_index
+import seat_allocation
+import stats
+import timetable
+
+
+MAX_PAGE_SIZE = 1000
+
+_operations = {}    # name -> fn(db, **params)
+
+
+class OperationError(Exception):
+    """A request the operation cannot carry out (bad input)."""
+    status = 400
+
+
+class NotFound(OperationError):
+    status = 404
+
+
+class Conflict(OperationError):
+    """Violates a unique/foreign key constraint (duplicate, still referenced)."""
+    status = 409
+
+
+def operation(name: str):
+    def register(fn):
+        _operations[name] = fn
+        return fn
+    return register
+
+
+def names() -> list:
+    return sorted(_operations)
+
+
+def run(db, name: str, params: dict = None):
+    fn = _operations.get(name)
+    if fn is None:
+        raise NotFound(f"Unknown operation '{name}'")
+    params = params or {}
+    try:
+        inspect.signature(fn).bind(db, **params)
+    except TypeError as e:
+        # wrong/missing parameter names from a client
+        raise OperationError(f"{name}: {e}") from None
+    return fn(db, **params)
+
+
+def run_in_scope(name: str, params: dict = None):
+    """Run one operation as its own unit of work (committed on success)."""
+    try:
+        with session_scope() as db:
+            return run(db, name, params)
+    except IntegrityError as e:
+        raise Conflict(str(e.orig)) from None
+
+
+def run_batch_in_scope(calls) -> list:
+    """Run (name, params) pairs as one unit of work; their results in order."""
+    try:
+        with session_scope() as db:
+            return [run(db, name, params) for name, params in calls]
+    except IntegrityError as e:
+        raise Conflict(str(e.orig)) from None
+
+
+# ---------- Process-wide state, updated on commit ----------
+
+def _on_commit(db, fn, *args):
+    """Call fn(*args) once db's unit of work commits; forgotten on rollback.
+
+    For the in-memory search indexes and row-count cache: a later
+    operation of the same batch, or the commit itself, may still fail.
+    """
+    db.info.setdefault("on_commit", []).append((fn, args))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_on_commit(session):
+    for fn, args in session.info.pop("on_commit", ()):
+        fn(*args)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("on_commit", None)
+
+
+# ---------- Records with a list page (students, courses, instructors) ----------
+
+# name -> (model, list query, fields a client may set)
+RECORDS = {
+    "students": (
+        Student, repository.student_list_query,
+        ("university_id", "full_name", "gender", "date_of_birth", "email",
+         "phone", "level", "status", "department_id"),
+    ),
+    "courses": (
+        Course, repository.course_list_query,
+        ("code", "name", "credits", "semester", "capacity", "department_id", "instructor_id"),
+    ),
+    "instructors": (
+        Instructor, repository.instructor_list_query,
+        ("full_name", "email", "phone", "rank", "department_id"),
+    ),
+}
+
+# what a conflicting write means, per record type
+CONFLICT_MESSAGES = {
+    "students": ("University ID already exists.", "Student has enrollments, remove them first."),
+    "courses": ("Course code already exists.", "Course has enrollments, remove them first."),
+    "instructors": ("Could not save instructor (integrity error).",
+                    "Instructor still teaches courses, reassign them first."),
+}
+
+
+def _int_param(param: str, value):
+    """A client's integer parameter; OperationError (400) if it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise OperationError(f"{param} must be an integer, not {value!r}") from None
+
+
+def _clean_fields(name: str, fields: dict) -> dict:
+    model, _, allowed = RECORDS[name]
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise OperationError(f"Unknown {name} fields: {', '.join(sorted(unknown))}")
+
+    values = dict(fields)
+    if values.get("date_of_birth"):
+        try:
+            values["date_of_birth"] = date.fromisoformat(values["date_of_birth"])
+        except (TypeError, ValueError):
+            raise OperationError(
+                f"invalid date of birth '{values['date_of_birth']}' (expected YYYY-MM-DD)"
+            ) from None
+    return values
+
+
+def _flush(db, name: str, deleting=False):
+    try:
+        db.flush()
+    except IntegrityError:
+        raise Conflict(CONFLICT_MESSAGES[name][1 if deleting else 0]) from None
+
+
+def _register_record_operations(name: str):
+    model, list_query, _ = RECORDS[name]
+
+    @operation(f"{name}.page")
+    def page(db, search: str = "", after: int = None, limit: int = DEFAULT_PAGE_SIZE,
+             with_total: bool = False):
+        """One keyset page of list rows: {"rows", "has_next", "total"}."""
+        limit = max(1, min(_int_param("limit", limit), MAX_PAGE_SIZE))
+        after = None if after is None else _int_param("after", after)
+        pager = KeysetPager(
+            lambda session: list_query(session, search),
+            model.id, limit, cache_key=(name, search),
+        )
+        result = pager.after(db, after)
+        return {
+            "rows": [list(r) for r in result.rows],
+            "has_next": result.has_next,
+            "total": pager.estimate_total(db) if with_total else None,
+        }
+
+    @operation(f"{name}.rows")
+    def rows(db, ids: list, search: str = ""):
+        """List rows for `ids`, in that order (ids no longer there are skipped).
+
+        With `search`, only the records that search still finds: the
+        search index decides, or the SQL list search while it is not built.
+        """
+        if not isinstance(ids, list):
+            raise OperationError(f"ids must be a list, not {ids!r}")
+        ids = [_int_param("ids", i) for i in ids]
+        if search and search_index.get_index(name) is None:
+            query = list_query(db, search).filter(model.id.in_(ids))
+        elif search:
+            query = list_query(db, ids=[i for i in ids if search_index.matches(name, i, search)])
+        else:
+            query = list_query(db, ids=ids)
+        found = {r[0]: list(r) for r in query}
+        return [found[i] for i in ids if i in found]
+
+    @operation(f"{name}.search")
+    def search(db, text: str):
+        """Ids matching `text` from the search index; None while it is being built."""
+        return search_index.search(name, text)
+
+    @operation(f"{name}.create")
+    def create(db, fields: dict):
+        obj = model(**_clean_fields(name, fields))
+        db.add(obj)
+        _flush(db, name)
+        _on_commit(db, search_index.record_saved, model, obj.id, search_index.indexed_fields(obj))
+        _on_commit(db, invalidate_counts, name)
+        return {"id": obj.id}
+
+    @operation(f"{name}.update")
+    def update(db, id: int, fields: dict):
+        obj = db.query(model).get(id)
+        if obj is None:
+            raise NotFound(f"{model.__name__} {id} not found.")
+        for field, value in _clean_fields(name, fields).items():
+            setattr(obj, field, value)
+        _flush(db, name)
+        _on_commit(db, search_index.record_saved, model, obj.id, search_index.indexed_fields(obj))
+        result = {"id": obj.id}
+        if name in AFTER_UPDATE:
+            result.update(AFTER_UPDATE[name](db, obj, fields))
+        return result
+
+    @operation(f"{name}.delete")
+    def delete(db, id: int):
+        obj = db.query(model).get(id)
+        if obj is None:
+            raise NotFound(f"{model.__name__} {id} not found.")
+        db.delete(obj)
+        _flush(db, name, deleting=True)
+        _on_commit(db, search_index.record_deleted, model, id)
+        _on_commit(db, invalidate_counts, name)
+        return {"id": id}
+
+
+def _course_updated(db, course, fields):
+    # a larger capacity seats waitlisted students right away
+    if "capacity" not in fields:
+        return {}
+    return {"promoted": seat_allocation.fill_all_terms(db, course.id)}
+
+
+# name -> fn(db, obj, fields) -> extra result keys, run after an update
+AFTER_UPDATE = {
+    "courses": _course_updated,
+}
+
+for _name in RECORDS:
+    _register_record_operations(_name)
+
+
+# ---------- Single-record reads (the fields each form shows) ----------
+
+def _student_form(student):
+    dept = student.department
+    return {
+        "id": student.id,
+        "university_id": student.university_id,
+        "full_name": student.full_name,
+        "phone": student.phone,
+        "email": student.email,
+        "level": student.level,
+        "faculty_id": dept.faculty.id if dept and dept.faculty else None,
+        "department_id": dept.id if dept and dept.faculty else None,
+    }
+
+
+@operation("students.get")
+def get_student(db, id: int):
+    # department + faculty come in the same SELECT
+    student = repository.get_student(db, id)
+    return _student_form(student) if student else None
+
+
+@operation("students.by_university_id")
+def get_student_by_university_id(db, university_id: str):
+    student = repository.get_student_by_university_id(db, university_id)
+    return _student_form(student) if student else None
+
+
+@operation("courses.get")
+def get_course(db, id: int):
+    course = db.query(Course).get(id)
+    if not course:
+        return None
+    return {
+        "id": course.id,
+        "code": course.code,
+        "name": course.name,
+        "credits": course.credits,
+        "department_id": course.department_id,
+        "semester": course.semester,
+        "capacity": course.capacity,
+        "slots": [
+            {"day": s.day, "start": s.start_minute, "end": s.end_minute, "room": s.room}
+            for s in course.slots
+        ],
+    }
+
+
+@operation("courses.set_slots")
+def set_course_slots(db, id: int, slots: list):
+    """Replace the course's weekly slots ([{day, start, end, room}], minutes after midnight)."""
+    course = db.query(Course).get(id)
+    if course is None:
+        raise NotFound(f"Course {id} not found.")
+    try:
+        slots = [timetable.validate_slot(slot) for slot in slots]
+    except ValueError as e:
+        raise OperationError(str(e)) from None
+    course.slots = [
+        CourseSlot(day=s["day"], start_minute=s["start"], end_minute=s["end"], room=s["room"])
+        for s in slots
+    ]
+    db.flush()
+    return {"id": id, "slots": len(slots)}
+
+
+@operation("courses.create_with_slots")
+def create_course_with_slots(db, fields: dict, slots: list):
+    """courses.create then courses.set_slots, as one unit of work."""
+    course = run(db, "courses.create", {"fields": fields})
+    set_course_slots(db, course["id"], slots)
+    return course
+
+
+@operation("instructors.get")
+def get_instructor(db, id: int):
+    ins = db.query(Instructor).get(id)
+    if not ins:
+        return None
+    return {
+        "id": ins.id,
+        "full_name": ins.full_name,
+        "rank": ins.rank,
+        "email": ins.email,
+        "phone": ins.phone,
+        "department_id": ins.department_id,
+    }
+
+
+# ---------- Enrollments ----------
+
+ENROLLMENT_FIELDS = ("course_id", "academic_year", "semester", "status", "grade")
+
+
+def _enrollment_fields(fields: dict) -> dict:
+    unknown = set(fields) - set(ENROLLMENT_FIELDS)
+    if unknown:
+        raise OperationError(f"Unknown enrollment fields: {', '.join(sorted(unknown))}")
+    if "grade" in fields:
+        # the points are what GPAs are computed from; they always follow the letter
+        try:
+            points = gpa.points_for(fields["grade"])
+        except ValueError as e:
+            raise OperationError(str(e)) from None
+        fields = dict(fields, grade=fields["grade"].strip().upper() if points is not None else None,
+                      grade_points=points)
+    return fields
+
+
+@operation("enrollments.list")
+def list_enrollments(db, student_id: int):
+    return [list(r) for r in repository.enrollment_list_query(db, student_id)]
+
+
+@operation("enrollments.get")
+def get_enrollment(db, id: int):
+    enr = repository.get_enrollment(db, id)
+    if not enr:
+        return None
+
+    course = enr.course
+    dep = course.department if course else None
+    fac = dep.faculty if dep else None
+    return {
+        "id": enr.id,
+        "student_id": enr.student_id,
+        "course_id": course.id if course else None,
+        "department_id": dep.id if dep else None,
+        "faculty_id": fac.id if fac else None,
+        "academic_year": enr.academic_year,
+        "semester": enr.semester,
+        "status": enr.status,
+        "grade": enr.grade,
+        "waitlist_rank": seat_allocation.waitlist_rank(db, enr),
+    }
+
+
+def _seat_result(db, enr, promoted=(), requested_status=None):
+    """{"id", "status", "requested_status", "waitlist_rank", "promoted", "clashes"}:
+    where a write left the seat.
+
+    `status` is the one applied: a full course waitlists the registration
+    and a free seat takes it off the waitlist, whatever was requested.
+    """
+    return {
+        "id": enr.id,
+        "status": enr.status,
+        "requested_status": requested_status,
+        "waitlist_rank": seat_allocation.waitlist_rank(db, enr),
+        "promoted": list(promoted),
+        "clashes": [],
+    }
+
+
+def _timetable_clashes(db, student_id, fields, current=None):
+    """Clashes of the registration `fields` describe (over `current`, if updating).
+
+    An update that keeps a seat-holding registration in its course and term
+    was checked (or confirmed) before, so it is not checked again.
+    """
+    def value(name):
+        return fields[name] if name in fields else getattr(current, name, None)
+
+    if not seat_allocation.holds_seat(value("status")):
+        return []
+    if (current is not None and seat_allocation.holds_seat(current.status)
+            and all(value(name) == getattr(current, name)
+                    for name in ("course_id", "academic_year", "semester"))):
+        return []
+
+    return timetable.find_clashes(
+        db, student_id, value("course_id"), value("academic_year"), value("semester"),
+        exclude_enrollment_id=current.id if current is not None else None,
+    )
+
+
+# Seats are counted and taken under the database write lock (see seat_allocation.py);
+# with check_clashes, a registration that clashes with the student's timetable is not
+# saved: {"clashes": [...]} comes back instead, to confirm and send again without it.
+
+@operation("enrollments.create")
+def create_enrollment(db, student_id: int, fields: dict, check_clashes: bool = True):
+    fields = _enrollment_fields(fields)
+    if not fields.get("course_id"):
+        raise OperationError("course_id is required.")
+    begin_immediate(db)
+    if check_clashes:
+        clashes = _timetable_clashes(db, student_id, fields)
+        if clashes:
+            return {"id": None, "clashes": clashes}
+    try:
+        enr = seat_allocation.enroll(db, student_id, **fields)
+    except IntegrityError:
+        raise Conflict("This enrollment already exists.") from None
+    return _seat_result(db, enr, requested_status=fields.get("status"))
+
+
+@operation("enrollments.update")
+def update_enrollment(db, id: int, fields: dict, check_clashes: bool = True):
+    fields = _enrollment_fields(fields)
+    begin_immediate(db)
+    if check_clashes:
+        current = db.query(Enrollment).get(id)
+        if current is None:
+            raise NotFound("Enrollment not found.")
+        clashes = _timetable_clashes(db, current.student_id, fields, current)
+        if clashes:
+            return {"id": id, "clashes": clashes}
+    try:
+        enr, promoted = seat_allocation.update(db, id, fields)
+    except IntegrityError:
+        raise Conflict("This enrollment already exists.") from None
+    if enr is None:
+        raise NotFound("Enrollment not found.")
+    return _seat_result(db, enr, promoted, requested_status=fields.get("status"))
+
+
+@operation("enrollments.delete")
+def delete_enrollment(db, id: int):
+    found, promoted = seat_allocation.delete(db, id)
+    if not found:
+        raise NotFound("Enrollment not found.")
+    return {"id": id, "promoted": promoted}
+
+
+@operation("enrollments.enroll_cohort")
+def enroll_cohort(db, department_id: int, level: int, academic_year: str, semester: int,
+                  course_ids: list, status: str = cohort_enrollment.DEFAULT_STATUS,
+                  dry_run: bool = False):
+    """Enroll a department level into `course_ids` (set-based, one transaction)."""
+    return cohort_enrollment.enroll_cohort(
+        db, department_id, level, academic_year, semester, course_ids,
+        status=status, dry_run=dry_run,
+    ).as_dict()
+
+
+@operation("students.gpa")
+def student_gpa(db, id: int):
+    """Cumulative and per-term GPA (None without graded courses)."""
+    return gpa.get(db).for_student(id)
+
+
+@operation("timetable.clash_report")
+def clash_report(db, academic_year: str, semester: int):
+    """Every timetable clash among a term's registrations."""
+    report = timetable.clash_report(db, academic_year, semester)
+    return {
+        "summary": report.summary(),
+        "students_with_clashes": report.students_with_clashes,
+        "clashes": [list(row) for row in report.clashes],
+    }
+
+
+# ---------- Reference data, statistics, login ----------
+
+@operation("reference.data")
+def reference_data(db):
+    """The Faculty → Department → Course lists behind the combos."""
+    return reference_cache.get(db).as_lists()
+
+
+@operation("reports.enrollment_summary")
+def enrollment_summary_report(db, by: str = "department", academic_year: str = None):
+    """Enrollment counts by status, read from the summary tables."""
+    if by not in enrollment_summary.GROUPINGS:
+        raise OperationError(f"Unknown grouping '{by}'.")
+    report = enrollment_summary.report(db, by, academic_year)
+    report["academic_years"] = enrollment_summary.academic_years(db)
+    return report
+
+
+@operation("stats.dashboard")
+def dashboard(db):
+    totals = stats.totals(db)
+    return {
+        "totals": dict(totals._mapping),
+        "faculties": [dict(r._mapping) for r in stats.faculty_summary(db)],
+    }
+
+
+@operation("auth.login")
+def login(db, username: str, password: str):
+    user = db.query(User).filter_by(username=username, password_hash=password).first()
+    return {"username": user.username, "role": user.role} if user else None
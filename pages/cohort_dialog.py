@@ -0,0 +1,188 @@
+# pages/cohort_dialog.py
+"""Dialog for cohort enrollment: a department level into a set of courses."""
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton,
+    QComboBox, QListWidget, QListWidgetItem, QPlainTextEdit, QMessageBox
+)
+
+from pages.query_executor import executor
+import api_client
+import reference_cache
+
+
+def format_report(report: dict) -> str:
+    verb = "Would enroll" if report["dry_run"] else "Enrolled"
+    lines = [
+        f"{report['students']:,} active students in the cohort "
+        f"({report['inactive_skipped']:,} graduated/suspended skipped).",
+        f"{verb} {report['inserted']:,} ({report['waitlisted']:,} on waitlists, course full); "
+        f"{report['already_enrolled']:,} already enrolled ({report['seconds']:.2f}s).",
+        "",
+    ]
+    for course in report["courses"]:
+        lines.append(
+            f"{course['code']:<10} {course['name'][:40]:<40} "
+            f"{course['inserted']:>7,} new {course['already_enrolled']:>7,} already"
+            + (f" {course['waitlisted']:>7,} waitlisted" if course["waitlisted"] else "")
+        )
+    for course_id in report["unknown_courses"]:
+        lines.append(f"Course {course_id} no longer exists.")
+
+    if report["conflicts"]:
+        lines += ["", "Already enrolled (first ones):"]
+        lines += [f"  {univid}  {code}" for univid, code in report["conflicts"]]
+    return "\n".join(lines)
+
+
+class CohortEnrollmentDialog(QDialog):
+    def __init__(self, parent=None, on_enrolled=None):
+        super().__init__(parent)
+        self.setWindowTitle("Enroll a Cohort")
+        self.resize(640, 560)
+
+        self.ref = None
+        self.on_enrolled = on_enrolled
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.input_faculty = QComboBox()
+        self.input_faculty.currentIndexChanged.connect(self.on_faculty_changed)
+        form.addRow("Faculty:", self.input_faculty)
+
+        self.input_department = QComboBox()
+        self.input_department.currentIndexChanged.connect(self.on_department_changed)
+        form.addRow("Department:", self.input_department)
+
+        self.input_level = QComboBox()
+        self.input_level.addItems(["1", "2", "3", "4"])
+        form.addRow("Level:", self.input_level)
+
+        self.input_academic_year = QLineEdit()
+        self.input_academic_year.setPlaceholderText("e.g. 2025/2026")
+        form.addRow("Academic Year:", self.input_academic_year)
+
+        self.input_semester = QComboBox()
+        self.input_semester.addItems(["1", "2"])
+        form.addRow("Semester:", self.input_semester)
+
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel("Courses:"))
+        self.list_courses = QListWidget()
+        layout.addWidget(self.list_courses, 1)
+
+        self.output = QPlainTextEdit()
+        self.output.setReadOnly(True)
+        self.output.setStyleSheet("font-family: monospace;")
+        layout.addWidget(self.output, 1)
+
+        buttons = QHBoxLayout()
+        self.btn_preview = QPushButton("Preview")
+        self.btn_preview.clicked.connect(lambda: self.run(dry_run=True))
+        buttons.addWidget(self.btn_preview)
+
+        self.btn_enroll = QPushButton("Enroll")
+        self.btn_enroll.clicked.connect(lambda: self.run(dry_run=False))
+        buttons.addWidget(self.btn_enroll)
+
+        buttons.addStretch()
+        btn_close = QPushButton("Close")
+        btn_close.clicked.connect(self.reject)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+
+        executor().submit((id(self), "reference"), reference_cache.get, self.fill_faculties)
+
+    # ---------- Combos ----------
+
+    def fill_faculties(self, ref):
+        self.ref = ref
+        self.input_faculty.clear()
+        self.input_faculty.addItem("-- Select Faculty --", None)
+        for fac_id, fac_name in ref.faculties:
+            self.input_faculty.addItem(fac_name, fac_id)
+
+    def on_faculty_changed(self, index: int):
+        faculty_id = self.input_faculty.itemData(index)
+        self.input_department.clear()
+        self.input_department.addItem("-- Select Department --", None)
+        if faculty_id and self.ref is not None:
+            for dep_id, dep_name in self.ref.departments_of(faculty_id):
+                self.input_department.addItem(dep_name, dep_id)
+
+    def on_department_changed(self, index: int):
+        dep_id = self.input_department.itemData(index)
+        self.list_courses.clear()
+        if not dep_id or self.ref is None:
+            return
+        for course_id, course_name in self.ref.courses_of(dep_id):
+            item = QListWidgetItem(course_name)
+            item.setData(Qt.UserRole, course_id)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.list_courses.addItem(item)
+
+    def checked_course_ids(self) -> list:
+        items = (self.list_courses.item(i) for i in range(self.list_courses.count()))
+        return [item.data(Qt.UserRole) for item in items if item.checkState() == Qt.Checked]
+
+    # ---------- Run ----------
+
+    def run(self, dry_run: bool):
+        department_id = self.input_department.currentData()
+        academic_year = self.input_academic_year.text().strip()
+        course_ids = self.checked_course_ids()
+
+        if not department_id:
+            QMessageBox.warning(self, "Error", "Please select a department.")
+            return
+        if not academic_year:
+            QMessageBox.warning(self, "Error", "Please enter the academic year.")
+            return
+        if not course_ids:
+            QMessageBox.warning(self, "Error", "Please tick at least one course.")
+            return
+
+        params = {
+            "department_id": department_id,
+            "level": int(self.input_level.currentText()),
+            "academic_year": academic_year,
+            "semester": int(self.input_semester.currentText()),
+            "course_ids": course_ids,
+            "dry_run": dry_run,
+        }
+
+        # a preview only reads (the worker's session); enrolling commits its own
+        # unit of work, so it is never interrupted half-way
+        if dry_run:
+            job = lambda db: api_client.call("enrollments.enroll_cohort", db, **params)
+        else:
+            job = lambda db: api_client.call("enrollments.enroll_cohort", **params)
+
+        self.set_busy(True)
+        self.output.setPlainText("Working...")
+        executor().submit((id(self), "cohort"), job, self.show_report, self.on_failed)
+
+    def done(self, result):
+        # closed mid-way: drop the pending replies (an enrollment already sent
+        # still commits on its own)
+        executor().cancel((id(self), "reference"))
+        executor().cancel((id(self), "cohort"))
+        super().done(result)
+
+    def set_busy(self, busy: bool):
+        self.btn_preview.setEnabled(not busy)
+        self.btn_enroll.setEnabled(not busy)
+
+    def show_report(self, report):
+        self.set_busy(False)
+        self.output.setPlainText(format_report(report))
+        if not report["dry_run"] and report["inserted"] and self.on_enrolled:
+            self.on_enrolled(report)
+
+    def on_failed(self, error):
+        self.set_busy(False)
+        self.output.clear()
+        QMessageBox.critical(self, "Error", f"Cohort enrollment failed:\n{error}")
@@ -1,23 +1,26 @@
 # pages/courses_page.py
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QComboBox, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
-    QFileDialog
+    QComboBox, QTableView, QMessageBox, QHeaderView
 )
 
-from sqlalchemy.exc import IntegrityError
-import csv
-
-from database import SessionLocal
-from models import Course, Department
+from pages.table_model import LazyTableModel
+from pages.query_executor import executor
+from pages.live_search import debounce, ensure_index, export_query, show_search, rows_reader
+from pages.csv_export import start_csv_export
+from api_client import OperationError, NotFound, Conflict
+import api_client
+import repository
+import reference_cache
+import timetable
 
 
 class CoursesPage(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.db = SessionLocal()
         self.selected_course_id = None
+        self.ref = None    # reference_cache snapshot behind the department combo
 
         main_layout = QHBoxLayout(self)
 
@@ -48,11 +51,21 @@ class CoursesPage(QWidget):
         self.input_credits.setPlaceholderText("Credits / Hours (e.g. 3)")
         form_layout.addWidget(self.input_credits)
 
+        # Capacity (seats per term; empty = unlimited)
+        self.input_capacity = QLineEdit()
+        self.input_capacity.setPlaceholderText("Capacity / seats per term (empty = unlimited)")
+        form_layout.addWidget(self.input_capacity)
+
         # Semester
         self.input_semester = QComboBox()
         self.input_semester.addItems(["1", "2"])
         form_layout.addWidget(self.input_semester)
 
+        # Weekly meeting slots
+        self.input_slots = QLineEdit()
+        self.input_slots.setPlaceholderText("Slots, e.g. Mon 09:00-10:30 B12; Wed 09:00-10:30 B12")
+        form_layout.addWidget(self.input_slots)
+
         # Buttons row
         buttons_row = QHBoxLayout()
 
@@ -87,6 +100,8 @@ class CoursesPage(QWidget):
         btn_search.clicked.connect(self.on_search)
         btn_reset = QPushButton("Reset")
         btn_reset.clicked.connect(self.on_reset_search)
+        # search as you type, once typing pauses
+        self.search_timer = debounce(self.search_input, self.on_search)
 
         search_row.addWidget(self.search_input)
         search_row.addWidget(btn_search)
@@ -94,23 +109,27 @@ class CoursesPage(QWidget):
 
         right_layout.addLayout(search_row)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(
+        # Table (rows are fetched lazily from the DB as the view scrolls)
+        self.model = LazyTableModel(
             ["ID", "Code", "Name", "Dept", "Credits", "Semester"]
         )
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(
             2, QHeaderView.Stretch
         )  # stretch Name column
         self.table.setSelectionBehavior(self.table.SelectRows)
         self.table.setEditTriggers(self.table.NoEditTriggers)
-        self.table.cellClicked.connect(self.on_row_clicked)
+        self.table.clicked.connect(self.on_row_clicked)
 
         right_layout.addWidget(self.table)
 
         # Export row
         export_row = QHBoxLayout()
+        # row count (estimated until the list has been scrolled to the end)
+        self.lbl_count = QLabel()
+        self.model.loaded.connect(lambda: self.lbl_count.setText(self.model.count_text()))
+        export_row.addWidget(self.lbl_count)
         export_row.addStretch()
         btn_export = QPushButton("Export to CSV (Excel)")
         btn_export.clicked.connect(self.export_to_csv)
@@ -119,6 +138,7 @@ class CoursesPage(QWidget):
         right_layout.addLayout(export_row)
 
         # Load data
+        ensure_index("courses")
         self.load_courses()
 
         # Add to main layout
@@ -128,35 +148,29 @@ class CoursesPage(QWidget):
     # ---------- Helpers ----------
 
     def load_departments(self):
-        self.input_dept.clear()
-        departments = self.db.query(Department).all()
-        for dept in departments:
-            faculty_name = dept.faculty.name if dept.faculty else "Unknown Faculty"
-            display_name = f"{faculty_name} - {dept.name}"
-            self.input_dept.addItem(display_name, dept.id)
+        # from the shared reference cache: only its first load reads the DB
+        executor().submit((id(self), "reference"), reference_cache.get, self.fill_departments)
 
+    def fill_departments(self, ref):
+        if ref is self.ref:
+            return
+        self.ref = ref
 
-    def load_courses(self, search_text: str = ""):
-        query = self.db.query(Course)
-
-        if search_text:
-            like = f"%{search_text}%"
-            query = query.filter(
-                (Course.code.ilike(like)) |
-                (Course.name.ilike(like))
-            )
-
-        courses = query.all()
-        self.table.setRowCount(len(courses))
-
-        for row, c in enumerate(courses):
-            self.table.setItem(row, 0, QTableWidgetItem(str(c.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(c.code))
-            self.table.setItem(row, 2, QTableWidgetItem(c.name))
-            self.table.setItem(row, 3, QTableWidgetItem(c.department.name if c.department else ""))
-            self.table.setItem(row, 4, QTableWidgetItem(str(c.credits) if c.credits is not None else ""))
-            self.table.setItem(row, 5, QTableWidgetItem(str(c.semester) if c.semester is not None else ""))
+        selected = self.input_dept.currentData()
+        self.input_dept.clear()
+        for dept_id, display_name in ref.departments_with_faculty():
+            self.input_dept.addItem(display_name, dept_id)
+        if selected is not None and self.input_dept.findData(selected) >= 0:
+            self.input_dept.setCurrentIndex(self.input_dept.findData(selected))
+
+    def showEvent(self, event):
+        # pick up departments changed on other pages
+        super().showEvent(event)
+        self.load_departments()
 
+    def load_courses(self, search_text: str = ""):
+        self.current_search = search_text
+        show_search(self.model, "courses", search_text)
         self.selected_course_id = None
 
     # ---------- CRUD ----------
@@ -178,47 +192,67 @@ class CoursesPage(QWidget):
             QMessageBox.warning(self, "Error", "Credits must be a number.")
             return
 
-        new_course = Course(
-            code=code,
-            name=name,
-            department_id=dept_id,
-            credits=credits,
-            semester=semester
-        )
+        capacity = self.read_capacity()
+        if capacity is False:
+            return
+
+        fields = {
+            "code": code,
+            "name": name,
+            "department_id": dept_id,
+            "credits": credits,
+            "semester": semester,
+            "capacity": capacity,
+        }
+
+        slots = self.read_slots()
+        if slots is None:
+            return
 
         try:
-            self.db.add(new_course)
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Course added successfully.")
-            self.clear_form()
-            self.load_courses()
-        except IntegrityError:
-            self.db.rollback()
-            QMessageBox.warning(self, "Error", "Course code already exists.")
-
-    def on_row_clicked(self, row, column):
-        id_item = self.table.item(row, 0)
-        if not id_item:
+            # one unit of work: no course is saved without its meeting times
+            course = api_client.call("courses.create_with_slots", fields=fields, slots=slots)
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        QMessageBox.information(self, "Success", "Course added successfully.")
+        self.clear_form()
+        self.model.refresh_row(course["id"], rows_reader("courses", self.current_search))
+
+    def on_row_clicked(self, index):
+        course_id = self.model.row_id(index.row())
+        if course_id is None:
             return
 
-        course_id = int(id_item.text())
         self.selected_course_id = course_id
 
-        course = self.db.query(Course).get(course_id)
+        executor().submit(
+            (id(self), "selected"),
+            lambda db: api_client.call("courses.get", db, id=course_id),
+            self.fill_form,
+        )
+
+    def fill_form(self, course):
         if not course:
             return
 
-        self.input_code.setText(course.code)
-        self.input_name.setText(course.name)
-        self.input_credits.setText(str(course.credits) if course.credits is not None else "")
+        self.input_code.setText(course["code"])
+        self.input_name.setText(course["name"])
+        self.input_credits.setText(str(course["credits"]) if course["credits"] is not None else "")
+        self.input_capacity.setText(str(course["capacity"]) if course["capacity"] is not None else "")
+        self.input_slots.setText(timetable.format_slots(course["slots"]))
 
-        if course.department_id:
-            idx = self.input_dept.findData(course.department_id)
+        if course["department_id"]:
+            idx = self.input_dept.findData(course["department_id"])
             if idx >= 0:
                 self.input_dept.setCurrentIndex(idx)
 
-        if course.semester:
-            idx = self.input_semester.findText(str(course.semester))
+        if course["semester"]:
+            idx = self.input_semester.findText(str(course["semester"]))
             if idx >= 0:
                 self.input_semester.setCurrentIndex(idx)
 
@@ -227,11 +261,6 @@ class CoursesPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select a course to update.")
             return
 
-        course = self.db.query(Course).get(self.selected_course_id)
-        if not course:
-            QMessageBox.warning(self, "Error", "Course not found.")
-            return
-
         code = self.input_code.text().strip()
         name = self.input_name.text().strip()
         dept_id = self.input_dept.currentData()
@@ -248,19 +277,45 @@ class CoursesPage(QWidget):
             QMessageBox.warning(self, "Error", "Credits must be a number.")
             return
 
-        course.code = code
-        course.name = name
-        course.department_id = dept_id
-        course.credits = credits
-        course.semester = semester
+        capacity = self.read_capacity()
+        if capacity is False:
+            return
+
+        fields = {
+            "code": code,
+            "name": name,
+            "department_id": dept_id,
+            "credits": credits,
+            "semester": semester,
+            "capacity": capacity,
+        }
+
+        slots = self.read_slots()
+        if slots is None:
+            return
 
         try:
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Course updated successfully.")
-            self.load_courses()
-        except IntegrityError:
-            self.db.rollback()
-            QMessageBox.warning(self, "Error", "Course code already exists.")
+            # one unit of work: the course and its slots change together
+            result, _ = api_client.batch([
+                ("courses.update", {"id": self.selected_course_id, "fields": fields}),
+                ("courses.set_slots", {"id": self.selected_course_id, "slots": slots}),
+            ])
+        except NotFound:
+            QMessageBox.warning(self, "Error", "Course not found.")
+            return
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        message = "Course updated successfully."
+        if result.get("promoted"):
+            message += f"\n{len(result['promoted'])} student(s) moved from the waitlist into the new seats."
+        QMessageBox.information(self, "Success", message)
+        # patch the one row: the list keeps its scroll position and selection
+        self.model.refresh_row(self.selected_course_id, rows_reader("courses", self.current_search))
 
     def delete_course(self):
         if not self.selected_course_id:
@@ -277,22 +332,49 @@ class CoursesPage(QWidget):
         if reply == QMessageBox.No:
             return
 
-        course = self.db.query(Course).get(self.selected_course_id)
-        if not course:
+        try:
+            api_client.call("courses.delete", id=self.selected_course_id)
+        except NotFound:
             QMessageBox.warning(self, "Error", "Course not found.")
             return
-
-        self.db.delete(course)
-        self.db.commit()
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
         QMessageBox.information(self, "Success", "Course deleted.")
+        self.model.remove_row(self.selected_course_id)
         self.clear_form()
-        self.load_courses()
+
+    def read_capacity(self):
+        """The capacity box as int/None, or False (after a warning) if it is invalid."""
+        text = self.input_capacity.text().strip()
+        if not text:
+            return None
+        if not text.isdigit():
+            QMessageBox.warning(self, "Error", "Capacity must be a whole number of seats.")
+            return False
+        return int(text)
+
+    def read_slots(self):
+        """The slots box as slot dicts, or None (after a warning) if it cannot be read."""
+        try:
+            return timetable.parse_slots(self.input_slots.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return None
 
     def clear_form(self):
+        # a row click still being read must not refill the form
+        executor().cancel((id(self), "selected"))
+
         self.input_code.clear()
         self.input_name.clear()
         self.input_credits.clear()
+        self.input_capacity.clear()
+        self.input_slots.clear()
         self.selected_course_id = None
         if self.input_dept.count() > 0:
             self.input_dept.setCurrentIndex(0)
@@ -306,44 +388,18 @@ class CoursesPage(QWidget):
 
     def on_reset_search(self):
         self.search_input.clear()
+        self.search_timer.stop()
         self.load_courses()
 
     def export_to_csv(self):
-        path, _ = QFileDialog.getSaveFileName(
+        # streamed from the DB on a worker thread, the rows the list shows
+        query_factory = export_query(
+            "courses", repository.course_list_query, self.current_search)
+        start_csv_export(
             self,
             "Save Courses Data",
             "courses_export.csv",
-            "CSV Files (*.csv)"
+            self.model.headers,
+            query_factory,
+            "Courses exported successfully",
         )
-
-        if not path:
-            return
-
-        row_count = self.table.rowCount()
-        col_count = self.table.columnCount()
-
-        headers = [self.table.horizontalHeaderItem(c).text() for c in range(col_count)]
-
-        try:
-            with open(path, mode="w", newline="", encoding="utf-8-sig") as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-                for r in range(row_count):
-                    row_data = []
-                    for c in range(col_count):
-                        item = self.table.item(r, c)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
-
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Courses exported successfully to:\n{path}\n\nYou can open it with Excel."
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Export Failed",
-                f"An error occurred while exporting:\n{e}"
-            )
@@ -0,0 +1,154 @@
+# pages/csv_export.py
+"""
+Streaming CSV export.
+
+Rows are read straight from the database with `yield_per` and written to
+the CSV file as they arrive, on a worker thread with its own session, so
+the window stays responsive and memory stays flat whatever the table size.
+"""
+import csv
+import os
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from database import SessionLocal
+import action_profiler
+import api_client
+
+
+YIELD_PER = 1000
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def write_query_to_csv(query, headers, path, progress=None, is_cancelled=None,
+                       encoding="utf-8-sig") -> int:
+    """Stream the rows of a column query into `path`. Returns rows written.
+
+    `progress(done)` is called every YIELD_PER rows; `is_cancelled()` is
+    polled at the same points and aborts with ExportCancelled.
+    """
+    written = 0
+    with open(path, mode="w", newline="", encoding=encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+
+        for row in query.yield_per(YIELD_PER):
+            writer.writerow(["" if value is None else value for value in row])
+            written += 1
+
+            if written % YIELD_PER == 0:
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                if progress:
+                    progress(written)
+
+    if progress:
+        progress(written)
+    return written
+
+
+class CsvExportThread(QThread):
+    progress = pyqtSignal(int, int)     # rows written, total rows
+    succeeded = pyqtSignal(int)         # rows written
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, query_factory, headers, path, encoding="utf-8-sig", parent=None):
+        super().__init__(parent)
+        self.query_factory = query_factory
+        self.headers = headers
+        self.path = path
+        self.encoding = encoding
+        self.profile = action_profiler.hold()   # released by start_csv_export
+
+    def run(self):
+        with action_profiler.activate(self.profile):
+            self.export()
+
+    def export(self):
+        db = SessionLocal()
+        try:
+            query = self.query_factory(db)
+            total = query.order_by(None).count()
+            self.progress.emit(0, total)
+
+            written = write_query_to_csv(
+                query,
+                self.headers,
+                self.path,
+                progress=lambda done: self.progress.emit(done, total),
+                is_cancelled=self.isInterruptionRequested,
+                encoding=self.encoding,
+            )
+            self.succeeded.emit(written)
+        except ExportCancelled:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            db.close()
+
+
+def start_csv_export(parent, title, default_name, headers, query_factory,
+                     success_text, encoding="utf-8-sig"):
+    """Ask for a file name, then export in the background with a progress dialog.
+
+    `query_factory(db)` must build the query (display columns, current
+    filters applied) against the session it is given.
+    """
+    if api_client.REMOTE:
+        QMessageBox.information(
+            parent, title,
+            "CSV export reads the database directly, so it is only available\n"
+            "on the machine running the server (or a standalone desk).",
+        )
+        return
+
+    path, _ = QFileDialog.getSaveFileName(parent, title, default_name, "CSV Files (*.csv)")
+    if not path:
+        return
+
+    dialog = QProgressDialog("Exporting...", "Cancel", 0, 0, parent)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)
+
+    thread = CsvExportThread(query_factory, headers, path, encoding, parent)
+
+    def on_progress(done, total):
+        dialog.setMaximum(max(total, 1))
+        dialog.setValue(min(done, max(total, 1)))
+        dialog.setLabelText(f"Exported {done:,} of {total:,} rows...")
+
+    def on_succeeded(rows):
+        dialog.reset()
+        QMessageBox.information(
+            parent,
+            "Export Successful",
+            f"{success_text} ({rows:,} rows) to:\n{path}\n\nYou can open it with Excel."
+        )
+
+    def on_failed(message):
+        dialog.reset()
+        QMessageBox.critical(
+            parent,
+            "Export Failed",
+            f"An error occurred while exporting:\n{message}"
+        )
+
+    thread.progress.connect(on_progress)
+    thread.succeeded.connect(on_succeeded)
+    thread.failed.connect(on_failed)
+    thread.cancelled.connect(dialog.reset)
+    thread.finished.connect(lambda: action_profiler.release(thread.profile))
+    thread.finished.connect(thread.deleteLater)
+    dialog.canceled.connect(thread.requestInterruption)
+
+    thread.start()
+    return thread
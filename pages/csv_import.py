@@ -0,0 +1,107 @@
+# pages/csv_import.py
+"""GUI wrapper around student_import: runs the bulk import on a worker thread."""
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from student_import import import_students_csv
+import action_profiler
+import api_client
+
+
+# how many problem lines are listed in the result message box
+MAX_LINES_SHOWN = 15
+
+
+class StudentImportThread(QThread):
+    progress = pyqtSignal(int)          # rows read so far
+    succeeded = pyqtSignal(object)      # ImportReport
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.profile = action_profiler.hold()   # released by start_student_import
+
+    def run(self):
+        with action_profiler.activate(self.profile):
+            self.import_file()
+
+    def import_file(self):
+        try:
+            report = import_students_csv(
+                self.path,
+                progress=self.progress.emit,
+                is_cancelled=self.isInterruptionRequested,
+            )
+            self.succeeded.emit(report)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+def format_report(report) -> str:
+    lines = [report.summary()]
+
+    problems = [
+        f"line {line}: duplicate {univid} ({reason})"
+        for line, univid, reason in report.duplicates
+    ] + [
+        f"line {line}: {message}"
+        for line, message in report.errors
+    ]
+    if problems:
+        lines.append("")
+        lines.extend(problems[:MAX_LINES_SHOWN])
+        if len(problems) > MAX_LINES_SHOWN:
+            lines.append(f"... and {len(problems) - MAX_LINES_SHOWN:,} more")
+
+    return "\n".join(lines)
+
+
+def start_student_import(parent, on_finished=None):
+    """Ask for a CSV file and import it in the background with a progress dialog."""
+    if api_client.REMOTE:
+        QMessageBox.information(
+            parent, "Import Students",
+            "Bulk import writes to the database directly. Run it on the server\n"
+            "machine (python student_import.py file.csv), then restart the server.",
+        )
+        return
+
+    path, _ = QFileDialog.getOpenFileName(
+        parent, "Import Students", "", "CSV Files (*.csv)"
+    )
+    if not path:
+        return
+
+    dialog = QProgressDialog("Importing students...", "Cancel", 0, 0, parent)
+    dialog.setWindowTitle("Import Students")
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)
+
+    thread = StudentImportThread(path, parent)
+
+    def on_progress(rows):
+        dialog.setLabelText(f"Processed {rows:,} rows...")
+
+    def on_succeeded(report):
+        dialog.reset()
+        if report.errors or report.duplicates:
+            QMessageBox.warning(parent, "Import Finished", format_report(report))
+        else:
+            QMessageBox.information(parent, "Import Finished", format_report(report))
+        if on_finished:
+            on_finished(report)
+
+    def on_failed(message):
+        dialog.reset()
+        QMessageBox.critical(parent, "Import Failed", f"Could not import the file:\n{message}")
+
+    thread.progress.connect(on_progress)
+    thread.succeeded.connect(on_succeeded)
+    thread.failed.connect(on_failed)
+    thread.finished.connect(lambda: action_profiler.release(thread.profile))
+    thread.finished.connect(thread.deleteLater)
+    dialog.canceled.connect(thread.requestInterruption)
+
+    thread.start()
+    return thread
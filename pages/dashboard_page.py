@@ -4,16 +4,14 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QPushButton, QHeaderView
 )
 
-from database import SessionLocal
-from models import Student, Course, Instructor, Faculty
+from pages.query_executor import executor
+import api_client
 
 
 class DashboardPage(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.db = SessionLocal()
-
         main_layout = QVBoxLayout(self)
 
         # -------- Top summary counters --------
@@ -59,27 +57,27 @@ class DashboardPage(QWidget):
         self.load_stats()
 
     def load_stats(self):
-        # Top counters
-        total_students = self.db.query(Student).count()
-        total_courses = self.db.query(Course).count()
-        total_instructors = self.db.query(Instructor).count()
-
-        self.lbl_students.setText(f"👥 Students: {total_students}")
-        self.lbl_courses.setText(f"📚 Courses: {total_courses}")
-        self.lbl_instructors.setText(f"👨‍🏫 Instructors: {total_instructors}")
-
-        # Faculty table
-        faculties = self.db.query(Faculty).all()
-        self.table.setRowCount(len(faculties))
-
-        for row, fac in enumerate(faculties):
-            dept_count = len(fac.departments)
-            student_count = sum(len(d.students) for d in fac.departments)
-            course_count = sum(len(d.courses) for d in fac.departments)
-            instructor_count = sum(len(d.instructors) for d in fac.departments)
-
-            self.table.setItem(row, 0, QTableWidgetItem(fac.name))
-            self.table.setItem(row, 1, QTableWidgetItem(str(dept_count)))
-            self.table.setItem(row, 2, QTableWidgetItem(str(student_count)))
-            self.table.setItem(row, 3, QTableWidgetItem(str(course_count)))
-            self.table.setItem(row, 4, QTableWidgetItem(str(instructor_count)))
+        # counters + grouped faculty counts, read off the UI thread
+        executor().submit(
+            (id(self), "stats"),
+            lambda db: api_client.call("stats.dashboard", db),
+            self.show_stats,
+        )
+
+    def show_stats(self, result):
+        totals, summary = result["totals"], result["faculties"]
+
+        # Top counters (one query)
+        self.lbl_students.setText(f"👥 Students: {totals['students']}")
+        self.lbl_courses.setText(f"📚 Courses: {totals['courses']}")
+        self.lbl_instructors.setText(f"👨‍🏫 Instructors: {totals['instructors']}")
+
+        # Faculty table (grouped counts, no entities loaded)
+        self.table.setRowCount(len(summary))
+
+        for row, fac in enumerate(summary):
+            self.table.setItem(row, 0, QTableWidgetItem(fac["faculty"]))
+            self.table.setItem(row, 1, QTableWidgetItem(str(fac["departments"])))
+            self.table.setItem(row, 2, QTableWidgetItem(str(fac["students"])))
+            self.table.setItem(row, 3, QTableWidgetItem(str(fac["courses"])))
+            self.table.setItem(row, 4, QTableWidgetItem(str(fac["instructors"])))
@@ -2,24 +2,29 @@
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QComboBox, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
-    QFileDialog
+    QComboBox, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView
 )
 from PyQt5.QtCore import Qt
-from sqlalchemy.exc import IntegrityError
-import csv
 
-from database import SessionLocal
-from models import Enrollment, Student, Course, Faculty, Department
+from pages.cohort_dialog import CohortEnrollmentDialog
+from pages.csv_export import start_csv_export
+from pages.query_executor import executor
+from api_client import OperationError, NotFound, Conflict
+import api_client
+import gpa
+import repository
+import reference_cache
+import timetable
 
 
 class EnrollmentsPage(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.db = SessionLocal()
         self.selected_enrollment_id = None
         self.current_student_id = None
+        self.student_info_text = ""
+        self.ref = None     # reference_cache snapshot behind the combos
 
         main_layout = QHBoxLayout(self)
 
@@ -44,6 +49,11 @@ class EnrollmentsPage(QWidget):
 
         form_layout.addLayout(student_search_row)
 
+        # whole department level at once (doesn't need a student)
+        self.btn_cohort = QPushButton("Enroll a Cohort...")
+        self.btn_cohort.clicked.connect(self.open_cohort_dialog)
+        form_layout.addWidget(self.btn_cohort)
+
         self.label_student_info = QLabel("Student: (not selected)")
         self.label_student_info.setStyleSheet("color: #555;")
         form_layout.addWidget(self.label_student_info)
@@ -95,10 +105,19 @@ class EnrollmentsPage(QWidget):
         status_row = QHBoxLayout()
         status_row.addWidget(QLabel("Status:"))
         self.input_status = QComboBox()
-        self.input_status.addItems(["", "Completed", "In Progress", "Failed"])
+        # a full course turns a new registration into "Waitlisted" by itself
+        self.input_status.addItems(["", "Completed", "In Progress", "Failed", "Withdrawn", "Waitlisted"])
         status_row.addWidget(self.input_status)
         details_layout.addLayout(status_row)
 
+        # Grade (empty = not graded yet; only graded courses count in the GPA)
+        grade_row = QHBoxLayout()
+        grade_row.addWidget(QLabel("Grade:"))
+        self.input_grade = QComboBox()
+        self.input_grade.addItems([""] + gpa.GRADES)
+        grade_row.addWidget(self.input_grade)
+        details_layout.addLayout(grade_row)
+
         # Buttons: Add / Update / Delete
         buttons_row = QHBoxLayout()
         self.btn_add = QPushButton("Add")
@@ -141,10 +160,10 @@ class EnrollmentsPage(QWidget):
         right_layout.addWidget(table_title)
 
         self.table = QTableWidget()
-        self.table.setColumnCount(7)
+        self.table.setColumnCount(8)
         self.table.setHorizontalHeaderLabels([
             "ID", "Course", "Faculty", "Department",
-            "Academic Year", "Level", "Status"
+            "Academic Year", "Level", "Grade", "Status"
         ])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
@@ -170,11 +189,18 @@ class EnrollmentsPage(QWidget):
     # Load / cascade combos
     # ---------------------------------------------------------
     def load_faculties(self):
+        # the shared reference cache: only its first load reads the DB
+        executor().submit((id(self), "reference"), reference_cache.get, self.fill_faculties)
+
+    def fill_faculties(self, ref):
+        if ref is self.ref:
+            return
+        self.ref = ref
+
         self.input_faculty.clear()
         self.input_faculty.addItem("-- Select Faculty --", None)
-        faculties = self.db.query(Faculty).order_by(Faculty.name).all()
-        for fac in faculties:
-            self.input_faculty.addItem(fac.name, fac.id)
+        for fac_id, fac_name in ref.faculties:
+            self.input_faculty.addItem(fac_name, fac_id)
 
         self.input_department.clear()
         self.input_department.addItem("-- Select Department --", None)
@@ -188,34 +214,39 @@ class EnrollmentsPage(QWidget):
         self.input_course.clear()
         self.input_course.addItem("-- Select Course --", None)
 
-        if not faculty_id:
+        if not faculty_id or self.ref is None:
             return
 
-        departments = (
-            self.db.query(Department)
-            .filter(Department.faculty_id == faculty_id)
-            .order_by(Department.name)
-            .all()
-        )
-        for dep in departments:
-            self.input_department.addItem(dep.name, dep.id)
+        # from the cache, no query
+        for dep_id, dep_name in self.ref.departments_of(faculty_id):
+            self.input_department.addItem(dep_name, dep_id)
 
     def on_department_changed(self, index: int):
         dep_id = self.input_department.itemData(index)
         self.input_course.clear()
         self.input_course.addItem("-- Select Course --", None)
 
-        if not dep_id:
+        if not dep_id or self.ref is None:
             return
 
-        courses = (
-            self.db.query(Course)
-            .filter(Course.department_id == dep_id)
-            .order_by(Course.name)
-            .all()
-        )
-        for c in courses:
-            self.input_course.addItem(c.name, c.id)
+        for course_id, course_name in self.ref.courses_of(dep_id):
+            self.input_course.addItem(course_name, course_id)
+
+    def select_in_combos(self, fac_id, dep_id=None, course_id=None):
+        """Select faculty → department → course (each change refills the next combo)."""
+        for combo, value in (
+            (self.input_faculty, fac_id),
+            (self.input_department, dep_id),
+            (self.input_course, course_id),
+        ):
+            idx = 0 if value is None else combo.findData(value)   # None = "-- Select --"
+            if idx >= 0:
+                combo.setCurrentIndex(idx)
+
+    def showEvent(self, event):
+        # pick up faculties/departments/courses changed on other pages
+        super().showEvent(event)
+        self.load_faculties()
 
     # ---------------------------------------------------------
     # Student search
@@ -226,21 +257,21 @@ class EnrollmentsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please enter a student ID/code.")
             return
 
-        try:
-            # 🔧 Use correct field name: university_id (NOT Student.code)
-            student = (
-                self.db.query(Student)
-                .filter(Student.university_id == code)
-                .first()
-            )
-        except Exception as e:
-            # If something really weird happens, show it instead of crashing
-            QMessageBox.critical(self, "Error", f"Failed to search student:\n{e}")
-            self.current_student_id = None
-            self.set_details_enabled(False)
-            self.clear_table()
-            return
+        # department + faculty are eager-loaded with the student
+        executor().submit(
+            (id(self), "student"),
+            lambda db: api_client.call("students.by_university_id", db, university_id=code),
+            self.on_student_found, self.on_student_search_failed,
+        )
 
+    def on_student_search_failed(self, error):
+        # If something really weird happens, show it instead of crashing
+        QMessageBox.critical(self, "Error", f"Failed to search student:\n{error}")
+        self.current_student_id = None
+        self.set_details_enabled(False)
+        self.clear_table()
+
+    def on_student_found(self, student):
         if not student:
             self.current_student_id = None
             self.label_student_info.setText("Student: not found")
@@ -249,77 +280,66 @@ class EnrollmentsPage(QWidget):
             QMessageBox.warning(self, "Not found", "No student with this ID/code.")
             return
 
-        self.current_student_id = student.id
-        name = getattr(student, "full_name", None) or getattr(student, "name", "")
-        info_text = f"Student: {name} (ID: {student.id})"
+        self.current_student_id = student["id"]
+        info_text = f"Student: {student['full_name']} (ID: {student['id']})"
 
         # ------------------------------------------
         # Handle department / faculty if specified
         # ------------------------------------------
-        dept = getattr(student, "department", None)
-        fac = getattr(dept, "faculty", None) if dept else None
-
-        if dept and fac:
+        if student["department_id"] is not None:
             # Pre-select faculty and department
-            idx_fac = self.input_faculty.findData(fac.id)
-            if idx_fac >= 0:
-                self.input_faculty.setCurrentIndex(idx_fac)
-
-            idx_dep = self.input_department.findData(dept.id)
-            if idx_dep >= 0:
-                self.input_department.setCurrentIndex(idx_dep)
+            self.select_in_combos(student["faculty_id"], student["department_id"])
         else:
             # Student has no department ("Not specified yet" in StudentsPage logic)
             # Reset combos to default and add note in label
-            if self.input_faculty.count() > 0:
-                self.input_faculty.setCurrentIndex(0)
-            if self.input_department.count() > 0:
-                self.input_department.setCurrentIndex(0)
+            self.select_in_combos(None)
 
             info_text += " - Department not specified yet"
 
+        self.student_info_text = info_text
         self.label_student_info.setText(info_text)
 
         # ✅ Unlock rest of form & load his enrollments
         self.set_details_enabled(True)
-        self.load_enrollments_for_student(student.id)
+        self.load_enrollments_for_student(student["id"])
 
     # ---------------------------------------------------------
     # Table loading
     # ---------------------------------------------------------
     def clear_table(self):
+        executor().cancel((id(self), "enrollments"))
         self.table.setRowCount(0)
 
     def load_enrollments_for_student(self, student_id: int):
-        self.clear_table()
-        enrollments = (
-            self.db.query(Enrollment)
-            .filter(Enrollment.student_id == student_id)
-            .all()
+        # one SELECT with the course/department/faculty names joined in, and
+        # the GPA from the cached engine; one round trip in server mode
+        executor().submit(
+            (id(self), "enrollments"),
+            lambda db: api_client.batch([
+                ("enrollments.list", {"student_id": student_id}),
+                ("students.gpa", {"id": student_id}),
+            ], db),
+            self.on_enrollments_loaded,
         )
 
-        for row, enr in enumerate(enrollments):
-            self.table.insertRow(row)
-
-            course = getattr(enr, "course", None)
-            department = getattr(course, "department", None) if course else None
-            faculty = getattr(department, "faculty", None) if department else None
+    def on_enrollments_loaded(self, results):
+        rows, student_gpa = results
+        self.fill_table(rows)
 
-            course_name = getattr(course, "name", "") if course else ""
-            dep_name = getattr(department, "name", "") if department else ""
-            fac_name = getattr(faculty, "name", "") if faculty else ""
+        if student_gpa is None:
+            gpa_text = "GPA: no graded courses"
+        else:
+            last_term = student_gpa["terms"][-1]
+            gpa_text = (f"GPA: {student_gpa['gpa']:.2f} ({student_gpa['credits']:g} credits; "
+                        f"{last_term['label']}: {last_term['gpa']:.2f})")
+        self.label_student_info.setText(f"{self.student_info_text}\n{gpa_text}")
 
-            academic_year = getattr(enr, "academic_year", "")
-            level = getattr(enr, "level", "")
-            status = getattr(enr, "status", "")
+    def fill_table(self, rows):
+        self.table.setRowCount(len(rows))
 
-            self.table.setItem(row, 0, QTableWidgetItem(str(enr.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(course_name))
-            self.table.setItem(row, 2, QTableWidgetItem(fac_name))
-            self.table.setItem(row, 3, QTableWidgetItem(dep_name))
-            self.table.setItem(row, 4, QTableWidgetItem(str(academic_year)))
-            self.table.setItem(row, 5, QTableWidgetItem(str(level)))
-            self.table.setItem(row, 6, QTableWidgetItem(str(status)))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem("" if value is None else str(value)))
 
     # ---------------------------------------------------------
     # CRUD operations
@@ -334,35 +354,34 @@ class EnrollmentsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select a course.")
             return
 
-        academic_year = self.input_academic_year.text().strip()
-        level = self.input_level.text().strip()
-        status = self.input_status.currentText().strip()
+        fields = self.form_fields(course_id)
 
         try:
-            enr = Enrollment(
-                student_id=self.current_student_id,
-                course_id=course_id
-            )
-            if hasattr(Enrollment, "academic_year"):
-                enr.academic_year = academic_year
-            if hasattr(Enrollment, "level"):
-                enr.level = level
-            if hasattr(Enrollment, "status"):
-                enr.status = status
-
-            self.db.add(enr)
-            self.db.commit()
-        except IntegrityError:
-            self.db.rollback()
+            result = api_client.call("enrollments.create", student_id=self.current_student_id,
+                                     fields=fields)
+            if result["clashes"] and self.confirm_clashes(result["clashes"]):
+                result = api_client.call("enrollments.create", student_id=self.current_student_id,
+                                         fields=fields, check_clashes=False)
+        except Conflict:
             QMessageBox.warning(self, "Error", "This enrollment already exists.")
             return
-        except Exception as e:
-            self.db.rollback()
+        except OperationError as e:
             QMessageBox.critical(self, "Error", str(e))
             return
 
+        if result["id"] is None:
+            return      # clashes, not confirmed
         self.load_enrollments_for_student(self.current_student_id)
-        QMessageBox.information(self, "Done", "Enrollment added.")
+        if result["waitlist_rank"]:
+            note = self.status_note(result)
+            QMessageBox.information(
+                self, "Course full",
+                f"The course is full: the student is number {result['waitlist_rank']} "
+                "on its waitlist and gets a seat automatically when one frees up."
+                + (f"\n{note}" if note else ""),
+            )
+        else:
+            QMessageBox.information(self, "Done", "Enrollment added." + self.seat_note(result))
 
     def update_enrollment(self):
         if self.selected_enrollment_id is None:
@@ -374,40 +393,28 @@ class EnrollmentsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select a course.")
             return
 
-        academic_year = self.input_academic_year.text().strip()
-        level = self.input_level.text().strip()
-        status = self.input_status.currentText().strip()
+        fields = self.form_fields(course_id)
 
-        enr = (
-            self.db.query(Enrollment)
-            .filter(Enrollment.id == self.selected_enrollment_id)
-            .first()
-        )
-        if not enr:
+        try:
+            result = api_client.call("enrollments.update", id=self.selected_enrollment_id,
+                                     fields=fields)
+            if result["clashes"]:
+                if not self.confirm_clashes(result["clashes"]):
+                    return
+                result = api_client.call("enrollments.update", id=self.selected_enrollment_id,
+                                         fields=fields, check_clashes=False)
+        except NotFound:
             QMessageBox.warning(self, "Error", "Enrollment not found.")
             return
-
-        enr.course_id = course_id
-        if hasattr(enr, "academic_year"):
-            enr.academic_year = academic_year
-        if hasattr(enr, "level"):
-            enr.level = level
-        if hasattr(enr, "status"):
-            enr.status = status
-
-        try:
-            self.db.commit()
-        except IntegrityError:
-            self.db.rollback()
+        except Conflict:
             QMessageBox.warning(self, "Error", "Duplicate enrollment.")
             return
-        except Exception as e:
-            self.db.rollback()
+        except OperationError as e:
             QMessageBox.critical(self, "Error", str(e))
             return
 
         self.load_enrollments_for_student(self.current_student_id)
-        QMessageBox.information(self, "Done", "Enrollment updated.")
+        QMessageBox.information(self, "Done", "Enrollment updated." + self.seat_note(result))
 
     def delete_enrollment(self):
         if self.selected_enrollment_id is None:
@@ -421,22 +428,53 @@ class EnrollmentsPage(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        enr = (
-            self.db.query(Enrollment)
-            .filter(Enrollment.id == self.selected_enrollment_id)
-            .first()
-        )
-        if not enr:
+        try:
+            result = api_client.call("enrollments.delete", id=self.selected_enrollment_id)
+        except NotFound:
             QMessageBox.warning(self, "Error", "Enrollment not found.")
             return
-
-        self.db.delete(enr)
-        self.db.commit()
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
         self.selected_enrollment_id = None
         if self.current_student_id:
             self.load_enrollments_for_student(self.current_student_id)
-        QMessageBox.information(self, "Done", "Enrollment deleted.")
+        QMessageBox.information(self, "Done", "Enrollment deleted." + self.seat_note(result))
+
+    def confirm_clashes(self, clashes) -> bool:
+        answer = QMessageBox.question(
+            self, "Timetable clash",
+            f"This course clashes with the student's timetable:\n{timetable.describe(clashes)}\n\n"
+            "Enroll anyway?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No,
+        )
+        return answer == QMessageBox.Yes
+
+    @staticmethod
+    def status_note(result) -> str:
+        """Says so when the seat allocation replaced the chosen status ("" if not)."""
+        requested, applied = result.get("requested_status"), result.get("status")
+        if not requested or applied == requested:
+            return ""
+        return f'Saved as "{applied}" instead of "{requested}".'
+
+    @classmethod
+    def seat_note(cls, result) -> str:
+        notes = [cls.status_note(result)]
+        if result.get("waitlist_rank"):
+            notes.append(f"The course is full: number {result['waitlist_rank']} on the waitlist.")
+        if result.get("promoted"):
+            notes.append(f"{len(result['promoted'])} student(s) moved from the waitlist into the freed seat.")
+        return "".join("\n" + note for note in notes if note)
+
+    def open_cohort_dialog(self):
+        dialog = CohortEnrollmentDialog(self, on_enrolled=self.on_cohort_enrolled)
+        dialog.exec_()
+
+    def on_cohort_enrolled(self, report):
+        if self.current_student_id is not None:
+            self.load_enrollments_for_student(self.current_student_id)
 
     # ---------------------------------------------------------
     # Other helpers
@@ -448,71 +486,63 @@ class EnrollmentsPage(QWidget):
             return
 
         self.selected_enrollment_id = int(enr_id_item.text())
-        enr = (
-            self.db.query(Enrollment)
-            .filter(Enrollment.id == self.selected_enrollment_id)
-            .first()
+        enrollment_id = self.selected_enrollment_id
+
+        executor().submit(
+            (id(self), "selected"),
+            lambda db: api_client.call("enrollments.get", db, id=enrollment_id),
+            self.fill_form,
         )
+
+    def fill_form(self, enr):
         if not enr:
             return
 
         # Select course / faculty / department in combos
-        course = getattr(enr, "course", None)
-        dep = getattr(course, "department", None) if course else None
-        fac = getattr(dep, "faculty", None) if dep else None
-
-        if fac:
-            idx = self.input_faculty.findData(fac.id)
-            if idx >= 0:
-                self.input_faculty.setCurrentIndex(idx)
-        if dep:
-            idx = self.input_department.findData(dep.id)
-            if idx >= 0:
-                self.input_department.setCurrentIndex(idx)
-        if course:
-            idx = self.input_course.findData(course.id)
-            if idx >= 0:
-                self.input_course.setCurrentIndex(idx)
-
-        if hasattr(enr, "academic_year"):
-            self.input_academic_year.setText(str(getattr(enr, "academic_year", "")))
-        if hasattr(enr, "level"):
-            self.input_level.setText(str(getattr(enr, "level", "")))
-        if hasattr(enr, "status"):
-            status = getattr(enr, "status", "")
-            idx = self.input_status.findText(status)
-            if idx >= 0:
-                self.input_status.setCurrentIndex(idx)
+        if enr["faculty_id"]:
+            self.select_in_combos(enr["faculty_id"], enr["department_id"], enr["course_id"])
+
+        self.input_academic_year.setText(enr["academic_year"] or "")
+        idx = self.input_status.findText(enr["status"] or "")
+        if idx >= 0:
+            self.input_status.setCurrentIndex(idx)
+        idx = self.input_grade.findText(enr["grade"] or "")
+        if idx >= 0:
+            self.input_grade.setCurrentIndex(idx)
+
+    def form_fields(self, course_id) -> dict:
+        # the Level box has no column yet (Enrollment has no level)
+        return {
+            "course_id": course_id,
+            "academic_year": self.input_academic_year.text().strip(),
+            "status": self.input_status.currentText().strip(),
+            "grade": self.input_grade.currentText(),
+        }
 
     def clear_form(self):
+        executor().cancel((id(self), "selected"))
         self.selected_enrollment_id = None
         self.input_academic_year.clear()
         self.input_level.clear()
         self.input_status.setCurrentIndex(0)
+        self.input_grade.setCurrentIndex(0)
         # We don't clear student code so the form stays unlocked
 
     def export_csv(self):
-        if self.table.rowCount() == 0:
+        if self.current_student_id is None or self.table.rowCount() == 0:
             QMessageBox.information(self, "Info", "No enrollments to export.")
             return
 
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Save CSV", "enrollments.csv", "CSV Files (*.csv)"
+        # streamed from the DB on a worker thread for the selected student
+        student_id = self.current_student_id
+        headers = [self.table.horizontalHeaderItem(i).text()
+                   for i in range(self.table.columnCount())]
+        start_csv_export(
+            self,
+            "Save CSV",
+            "enrollments.csv",
+            headers,
+            lambda db: repository.enrollment_list_query(db, student_id),
+            "Enrollments exported successfully",
+            encoding="utf-8",
         )
-        if not path:
-            return
-
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            headers = [self.table.horizontalHeaderItem(i).text()
-                       for i in range(self.table.columnCount())]
-            writer.writerow(headers)
-
-            for row in range(self.table.rowCount()):
-                row_data = []
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                writer.writerow(row_data)
-
-        QMessageBox.information(self, "Done", "CSV exported successfully.")
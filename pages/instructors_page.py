@@ -1,23 +1,25 @@
 # pages/instructors_page.py
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QComboBox, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
-    QFileDialog
+    QComboBox, QTableView, QMessageBox, QHeaderView
 )
 
-from sqlalchemy.exc import IntegrityError
-import csv
-
-from database import SessionLocal
-from models import Instructor, Department
+from pages.table_model import LazyTableModel
+from pages.query_executor import executor
+from pages.live_search import debounce, ensure_index, export_query, show_search, rows_reader
+from pages.csv_export import start_csv_export
+from api_client import OperationError, NotFound, Conflict
+import api_client
+import repository
+import reference_cache
 
 
 class InstructorsPage(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.db = SessionLocal()
         self.selected_instructor_id = None
+        self.ref = None    # reference_cache snapshot behind the department combo
 
         main_layout = QHBoxLayout(self)
 
@@ -87,6 +89,8 @@ class InstructorsPage(QWidget):
         btn_search.clicked.connect(self.on_search)
         btn_reset = QPushButton("Reset")
         btn_reset.clicked.connect(self.on_reset_search)
+        # search as you type, once typing pauses
+        self.search_timer = debounce(self.search_input, self.on_search)
 
         search_row.addWidget(self.search_input)
         search_row.addWidget(btn_search)
@@ -94,23 +98,27 @@ class InstructorsPage(QWidget):
 
         right_layout.addLayout(search_row)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(
+        # Table (rows are fetched lazily from the DB as the view scrolls)
+        self.model = LazyTableModel(
             ["ID", "Name", "Dept", "Rank", "Email", "Phone"]
         )
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(
             1, QHeaderView.Stretch  # stretch Name column
         )
         self.table.setSelectionBehavior(self.table.SelectRows)
         self.table.setEditTriggers(self.table.NoEditTriggers)
-        self.table.cellClicked.connect(self.on_row_clicked)
+        self.table.clicked.connect(self.on_row_clicked)
 
         right_layout.addWidget(self.table)
 
         # Export row
         export_row = QHBoxLayout()
+        # row count (estimated until the list has been scrolled to the end)
+        self.lbl_count = QLabel()
+        self.model.loaded.connect(lambda: self.lbl_count.setText(self.model.count_text()))
+        export_row.addWidget(self.lbl_count)
         export_row.addStretch()
         btn_export = QPushButton("Export to CSV (Excel)")
         btn_export.clicked.connect(self.export_to_csv)
@@ -119,6 +127,7 @@ class InstructorsPage(QWidget):
         right_layout.addLayout(export_row)
 
         # Load data
+        ensure_index("instructors")
         self.load_instructors()
 
         # Add to main layout
@@ -128,35 +137,29 @@ class InstructorsPage(QWidget):
     # ---------- Helpers ----------
 
     def load_departments(self):
-        self.input_dept.clear()
-        departments = self.db.query(Department).all()
-        for dept in departments:
-            faculty_name = dept.faculty.name if dept.faculty else "Unknown Faculty"
-            display_name = f"{faculty_name} - {dept.name}"
-            self.input_dept.addItem(display_name, dept.id)
+        # from the shared reference cache: only its first load reads the DB
+        executor().submit((id(self), "reference"), reference_cache.get, self.fill_departments)
 
+    def fill_departments(self, ref):
+        if ref is self.ref:
+            return
+        self.ref = ref
 
-    def load_instructors(self, search_text: str = ""):
-        query = self.db.query(Instructor)
-
-        if search_text:
-            like = f"%{search_text}%"
-            query = query.filter(
-                (Instructor.full_name.ilike(like)) |
-                (Instructor.email.ilike(like))
-            )
-
-        instructors = query.all()
-        self.table.setRowCount(len(instructors))
-
-        for row, ins in enumerate(instructors):
-            self.table.setItem(row, 0, QTableWidgetItem(str(ins.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(ins.full_name))
-            self.table.setItem(row, 2, QTableWidgetItem(ins.department.name if ins.department else ""))
-            self.table.setItem(row, 3, QTableWidgetItem(ins.rank or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(ins.email or ""))
-            self.table.setItem(row, 5, QTableWidgetItem(ins.phone or ""))
+        selected = self.input_dept.currentData()
+        self.input_dept.clear()
+        for dept_id, display_name in ref.departments_with_faculty():
+            self.input_dept.addItem(display_name, dept_id)
+        if selected is not None and self.input_dept.findData(selected) >= 0:
+            self.input_dept.setCurrentIndex(self.input_dept.findData(selected))
+
+    def showEvent(self, event):
+        # pick up departments changed on other pages
+        super().showEvent(event)
+        self.load_departments()
 
+    def load_instructors(self, search_text: str = ""):
+        self.current_search = search_text
+        show_search(self.model, "instructors", search_text)
         self.selected_instructor_id = None
 
     # ---------- CRUD ----------
@@ -172,43 +175,51 @@ class InstructorsPage(QWidget):
             QMessageBox.warning(self, "Error", "Name is required.")
             return
 
-        new_ins = Instructor(
-            full_name=name,
-            department_id=dept_id,
-            rank=rank,
-            email=email,
-            phone=phone
-        )
+        fields = {
+            "full_name": name,
+            "department_id": dept_id,
+            "rank": rank,
+            "email": email,
+            "phone": phone,
+        }
 
         try:
-            self.db.add(new_ins)
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Instructor added successfully.")
-            self.clear_form()
-            self.load_instructors()
-        except IntegrityError:
-            self.db.rollback()
+            instructor = api_client.call("instructors.create", fields=fields)
+        except Conflict:
             QMessageBox.warning(self, "Error", "Could not add instructor (integrity error).")
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        QMessageBox.information(self, "Success", "Instructor added successfully.")
+        self.clear_form()
+        self.model.refresh_row(instructor["id"], rows_reader("instructors", self.current_search))
 
-    def on_row_clicked(self, row, column):
-        id_item = self.table.item(row, 0)
-        if not id_item:
+    def on_row_clicked(self, index):
+        ins_id = self.model.row_id(index.row())
+        if ins_id is None:
             return
 
-        ins_id = int(id_item.text())
         self.selected_instructor_id = ins_id
 
-        ins = self.db.query(Instructor).get(ins_id)
+        executor().submit(
+            (id(self), "selected"),
+            lambda db: api_client.call("instructors.get", db, id=ins_id),
+            self.fill_form,
+        )
+
+    def fill_form(self, ins):
         if not ins:
             return
 
-        self.input_name.setText(ins.full_name)
-        self.input_rank.setText(ins.rank or "")
-        self.input_email.setText(ins.email or "")
-        self.input_phone.setText(ins.phone or "")
+        self.input_name.setText(ins["full_name"])
+        self.input_rank.setText(ins["rank"] or "")
+        self.input_email.setText(ins["email"] or "")
+        self.input_phone.setText(ins["phone"] or "")
 
-        if ins.department_id:
-            idx = self.input_dept.findData(ins.department_id)
+        if ins["department_id"]:
+            idx = self.input_dept.findData(ins["department_id"])
             if idx >= 0:
                 self.input_dept.setCurrentIndex(idx)
 
@@ -217,11 +228,6 @@ class InstructorsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select an instructor to update.")
             return
 
-        ins = self.db.query(Instructor).get(self.selected_instructor_id)
-        if not ins:
-            QMessageBox.warning(self, "Error", "Instructor not found.")
-            return
-
         name = self.input_name.text().strip()
         dept_id = self.input_dept.currentData()
         rank = self.input_rank.text().strip()
@@ -232,19 +238,29 @@ class InstructorsPage(QWidget):
             QMessageBox.warning(self, "Error", "Name is required.")
             return
 
-        ins.full_name = name
-        ins.department_id = dept_id
-        ins.rank = rank
-        ins.email = email
-        ins.phone = phone
+        fields = {
+            "full_name": name,
+            "department_id": dept_id,
+            "rank": rank,
+            "email": email,
+            "phone": phone,
+        }
 
         try:
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Instructor updated successfully.")
-            self.load_instructors()
-        except IntegrityError:
-            self.db.rollback()
+            api_client.call("instructors.update", id=self.selected_instructor_id, fields=fields)
+        except NotFound:
+            QMessageBox.warning(self, "Error", "Instructor not found.")
+            return
+        except Conflict:
             QMessageBox.warning(self, "Error", "Could not update instructor (integrity error).")
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        QMessageBox.information(self, "Success", "Instructor updated successfully.")
+        # patch the one row: the list keeps its scroll position and selection
+        self.model.refresh_row(self.selected_instructor_id, rows_reader("instructors", self.current_search))
 
     def delete_instructor(self):
         if not self.selected_instructor_id:
@@ -260,19 +276,26 @@ class InstructorsPage(QWidget):
         if reply == QMessageBox.No:
             return
 
-        ins = self.db.query(Instructor).get(self.selected_instructor_id)
-        if not ins:
+        try:
+            api_client.call("instructors.delete", id=self.selected_instructor_id)
+        except NotFound:
             QMessageBox.warning(self, "Error", "Instructor not found.")
             return
-
-        self.db.delete(ins)
-        self.db.commit()
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
         QMessageBox.information(self, "Success", "Instructor deleted.")
+        self.model.remove_row(self.selected_instructor_id)
         self.clear_form()
-        self.load_instructors()
 
     def clear_form(self):
+        # a row click still being read must not refill the form
+        executor().cancel((id(self), "selected"))
+
         self.input_name.clear()
         self.input_rank.clear()
         self.input_email.clear()
@@ -289,43 +312,18 @@ class InstructorsPage(QWidget):
 
     def on_reset_search(self):
         self.search_input.clear()
+        self.search_timer.stop()
         self.load_instructors()
 
     def export_to_csv(self):
-        path, _ = QFileDialog.getSaveFileName(
+        # streamed from the DB on a worker thread, the rows the list shows
+        query_factory = export_query(
+            "instructors", repository.instructor_list_query, self.current_search)
+        start_csv_export(
             self,
             "Save Instructors Data",
             "instructors_export.csv",
-            "CSV Files (*.csv)"
+            self.model.headers,
+            query_factory,
+            "Instructors exported successfully",
         )
-
-        if not path:
-            return
-
-        row_count = self.table.rowCount()
-        col_count = self.table.columnCount()
-        headers = [self.table.horizontalHeaderItem(c).text() for c in range(col_count)]
-
-        try:
-            with open(path, mode="w", newline="", encoding="utf-8-sig") as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-                for r in range(row_count):
-                    row_data = []
-                    for c in range(col_count):
-                        item = self.table.item(r, c)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
-
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Instructors exported successfully to:\n{path}\n\nYou can open it with Excel."
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Export Failed",
-                f"An error occurred while exporting:\n{e}"
-            )
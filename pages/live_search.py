@@ -0,0 +1,118 @@
+# pages/live_search.py
+"""
+Search-as-you-type for the list pages.
+
+Keystrokes are debounced, then answered from the in-memory prefix index
+(search_index.py) without touching the database: only the rows of the
+visible window are selected, by id. Until the index has been built (on
+the query executor) searches fall back to the SQL list query, paged by
+key like the unfiltered list.
+
+In client mode the index lives on the server (shared by every desk):
+the matching ids are asked for with one `<name>.search` call.
+"""
+from PyQt5.QtCore import QTimer
+from sqlalchemy import bindparam
+
+from pages.query_executor import executor
+import api_client
+import search_index
+
+
+DEBOUNCE_MS = 250
+
+
+def debounce(line_edit, callback, msecs: int = DEBOUNCE_MS) -> QTimer:
+    """Call `callback()` once typing in `line_edit` pauses for `msecs`."""
+    timer = QTimer(line_edit)
+    timer.setSingleShot(True)
+    timer.setInterval(msecs)
+    timer.timeout.connect(callback)
+    line_edit.textChanged.connect(lambda _text: timer.start())
+    return timer
+
+
+def ensure_index(name: str):
+    """Build the named index in the background unless built or building."""
+    key = ("search_index", name)
+    if api_client.REMOTE:
+        return      # the server builds and maintains it
+    if search_index.get_index(name) is not None or executor().is_busy(key):
+        return
+
+    changes = search_index.change_count(name)
+
+    def ready(index):
+        if search_index.change_count(name) != changes:
+            # a record was saved while the snapshot was being read
+            ensure_index(name)
+            return
+        search_index.set_index(name, index)
+
+    executor().submit(key, lambda db: search_index.build_index(db, name), ready)
+
+
+def page_reader(name: str, search_text: str = ""):
+    """read_page for LazyTableModel.set_pages: the `<name>.page` operation."""
+    def read_page(db, after, limit, with_total):
+        return api_client.call(
+            f"{name}.page", db,
+            search=search_text, after=after, limit=limit, with_total=with_total,
+        )
+    return read_page
+
+
+def rows_reader(name: str, search_text: str = ""):
+    """read_rows for LazyTableModel: the `<name>.rows` operation, keeping
+    only the records `search_text` still finds."""
+    return lambda db, ids: api_client.call(f"{name}.rows", db, ids=ids, search=search_text)
+
+
+def export_query(name: str, list_query, search_text: str = ""):
+    """query_factory for start_csv_export: the rows the list shows.
+
+    A search exports the ids the index finds, so the file matches the
+    screen; while the index is not built the list falls back to the SQL
+    search, and so does the export.
+    """
+    ids = search_index.search(name, search_text) if search_text else None
+    if ids is None:
+        return lambda db: list_query(db, search_text)
+    model = search_index.INDEXED[name][0]
+    # inlined: a short search can match more ids than SQLite takes parameters
+    ids = bindparam(f"{name}_ids", ids, expanding=True, literal_execute=True)
+    return lambda db: list_query(db).filter(model.id.in_(ids))
+
+
+def show_search(model, name: str, search_text: str):
+    """Point a LazyTableModel at the `name` records matching `search_text`."""
+    if not search_text:
+        executor().cancel((id(model), "search"))
+        show_pages(model, name)
+        return
+
+    if not api_client.REMOTE:
+        ids = search_index.search(name, search_text)
+        if ids is None:
+            ensure_index(name)
+            show_pages(model, name, search_text)
+        else:
+            model.set_id_list(ids, rows_reader(name))
+        return
+
+    def show_ids(ids):
+        if ids is None:
+            show_pages(model, name, search_text)    # server index still building
+        else:
+            model.set_id_list(ids, rows_reader(name))
+
+    executor().submit(
+        (id(model), "search"),
+        lambda db: api_client.call(f"{name}.search", db, text=search_text),
+        show_ids,
+    )
+
+
+def show_pages(model, name: str, search_text: str = ""):
+    # keyset pages over the primary key, total estimated once per filter
+    model.set_pages(page_reader(name, search_text), cache_key=(name, search_text))
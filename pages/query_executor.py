@@ -0,0 +1,178 @@
+# pages/query_executor.py
+"""
+Runs database reads off the Qt main thread.
+
+Pages submit `fn(db)` under a *key* (e.g. "this page's department combo").
+The function runs on a QThreadPool worker with its own session, and its
+result is delivered back on the main thread through a queued signal.
+Submitting again under the same key supersedes the previous request: if
+it is still queued it never runs, if it is running its SQLite connection
+is interrupted, and either way its result is discarded.
+
+`fn` must return plain data (tuples, dicts, Row objects), never entities
+that would lazy-load after the worker's session is closed.
+
+In client mode (api_client.REMOTE) no session is opened: `fn` gets None
+and reaches the server through api_client. A superseded request then
+still runs to the end on the server; only its result is discarded.
+
+With MIS_SQL_TRACE, a request belongs to the action that submitted it
+(sql_trace.py): its statements and those of its on_result are counted
+there, and the action is not finished until the request is delivered.
+MIS_PROFILE sessions (action_profiler.py) follow requests the same way.
+"""
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+
+from database import SessionLocal
+import action_profiler
+import api_client
+import sql_trace
+
+
+logger = logging.getLogger(__name__)
+
+MAX_THREADS = 4
+
+
+class QueryTicket:
+    """One submitted request; `cancel()` may be called from any thread."""
+
+    def __init__(self, key, fn, on_result, on_error, action=None):
+        self.key = key
+        self.fn = fn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.action = action        # sql_trace action, held until delivered
+        self.profile = action_profiler.hold()
+        self.cancelled = False
+
+        self._lock = threading.Lock()
+        self._dbapi_connection = None   # set while the query is running
+
+    def attach(self, dbapi_connection):
+        with self._lock:
+            self._dbapi_connection = dbapi_connection
+
+    def detach(self):
+        with self._lock:
+            self._dbapi_connection = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            conn = self._dbapi_connection
+            # sqlite3.Connection.interrupt() is safe to call from another thread
+            if conn is not None and hasattr(conn, "interrupt"):
+                conn.interrupt()
+
+
+class _Signals(QObject):
+    finished = pyqtSignal(object, object, object)   # ticket, result, error
+
+
+class _QueryJob(QRunnable):
+    def __init__(self, ticket, signals):
+        super().__init__()
+        self.ticket = ticket
+        self.signals = signals
+
+    def run(self):
+        ticket = self.ticket
+        if ticket.cancelled:
+            # still reported, so the main thread lets go of its trace action
+            self.signals.finished.emit(ticket, None, None)
+            return
+
+        result, error = None, None
+        with sql_trace.activate(ticket.action), action_profiler.activate(ticket.profile):
+            if api_client.REMOTE:
+                try:
+                    result = ticket.fn(None)
+                except Exception as e:
+                    error = e
+                self.signals.finished.emit(ticket, result, error)
+                return
+
+            db = SessionLocal()
+            try:
+                proxied = db.connection().connection
+                ticket.attach(getattr(proxied, "dbapi_connection", None) or proxied.connection)
+                result = ticket.fn(db)
+            except Exception as e:
+                error = e
+            finally:
+                # never interrupt a pooled connection once it is handed back
+                ticket.detach()
+                db.close()
+
+        self.signals.finished.emit(ticket, result, error)
+
+
+class QueryExecutor(QObject):
+    def __init__(self, max_threads=MAX_THREADS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.latest = {}        # key -> newest QueryTicket
+
+        self._signals = _Signals()
+        self._signals.finished.connect(self._on_finished)
+
+    def submit(self, key, fn, on_result, on_error=None):
+        """Run `fn(db)` in the pool; call `on_result(result)` on the main thread."""
+        self.cancel(key)
+        label = key[-1] if isinstance(key, tuple) else key
+        ticket = QueryTicket(key, fn, on_result, on_error, sql_trace.hold(str(label)))
+        self.latest[key] = ticket
+        self.pool.start(_QueryJob(ticket, self._signals))
+        return ticket
+
+    def cancel(self, key):
+        ticket = self.latest.pop(key, None)
+        if ticket is not None:
+            ticket.cancel()
+
+    def is_busy(self, key) -> bool:
+        return key in self.latest
+
+    def wait_for_done(self, msecs=-1):
+        """Block until queued work is finished and delivered (scripts/benchmarks)."""
+        self.pool.waitForDone(msecs)
+        QCoreApplication.processEvents()
+
+    def _on_finished(self, ticket, result, error):
+        try:
+            with sql_trace.activate(ticket.action), action_profiler.activate(ticket.profile):
+                self._deliver(ticket, result, error)
+        finally:
+            sql_trace.release(ticket.action)
+            action_profiler.release(ticket.profile)
+
+    def _deliver(self, ticket, result, error):
+        # stale: cancelled, or superseded by a newer request under the same key
+        if ticket.cancelled or self.latest.get(ticket.key) is not ticket:
+            return
+        del self.latest[ticket.key]
+
+        if error is not None:
+            if ticket.on_error:
+                ticket.on_error(error)
+            else:
+                logger.error("Query %r failed: %s", ticket.key, error)
+            return
+
+        ticket.on_result(result)
+
+
+_executor = None
+
+
+def executor() -> QueryExecutor:
+    """The application-wide executor (created on first use)."""
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
@@ -0,0 +1,112 @@
+# pages/reports_page.py
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+    QTableWidget, QTableWidgetItem, QPushButton, QHeaderView
+)
+
+from pages.query_executor import executor
+import api_client
+
+
+GROUPINGS = [("Department", "department"), ("Course", "course"), ("Academic year", "year")]
+ALL_YEARS = "All years"
+
+
+class ReportsPage(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        main_layout = QVBoxLayout(self)
+
+        title = QLabel("Enrollment Summary")
+        title.setStyleSheet("font-size: 20px; font-weight: bold;")
+        main_layout.addWidget(title)
+
+        # -------- Filters --------
+        filters_layout = QHBoxLayout()
+
+        self.combo_group = QComboBox()
+        for label, key in GROUPINGS:
+            self.combo_group.addItem(label, key)
+        self.combo_year = QComboBox()
+        self.combo_year.addItem(ALL_YEARS, None)
+
+        filters_layout.addWidget(QLabel("Group by:"))
+        filters_layout.addWidget(self.combo_group)
+        filters_layout.addWidget(QLabel("Academic year:"))
+        filters_layout.addWidget(self.combo_year)
+        filters_layout.addStretch()
+
+        self.lbl_total = QLabel()
+        filters_layout.addWidget(self.lbl_total)
+
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(self.load_report)
+        filters_layout.addWidget(btn_refresh)
+
+        main_layout.addLayout(filters_layout)
+
+        # -------- Counts by status --------
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        main_layout.addWidget(self.table)
+
+        self.combo_group.currentIndexChanged.connect(self.load_report)
+        self.combo_year.currentIndexChanged.connect(self.load_report)
+
+        # Initial load
+        self.load_report()
+
+    def load_report(self):
+        # read from the summary tables only, off the UI thread
+        by = self.combo_group.currentData()
+        academic_year = self.combo_year.currentData()
+        executor().submit(
+            (id(self), "report"),
+            lambda db: api_client.call("reports.enrollment_summary", db,
+                                       by=by, academic_year=academic_year),
+            self.show_report,
+        )
+
+    def show_report(self, result):
+        self.update_years(result["academic_years"])
+
+        statuses, rows = result["statuses"], result["rows"]
+        with_detail = self.combo_group.currentData() != "year"
+        first = {"department": "Department", "course": "Code", "year": "Academic year"}
+        headers = [first[self.combo_group.currentData()]]
+        if with_detail:
+            headers.append("Faculty" if self.combo_group.currentData() == "department" else "Course")
+        headers += statuses + ["Total"]
+
+        self.table.clear()
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(len(rows))
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(
+            1 if with_detail else 0, QHeaderView.Stretch)
+
+        for r, row in enumerate(rows):
+            values = [row["label"]]
+            if with_detail:
+                values.append(row["detail"] or "")
+            values += [row["counts"].get(status, 0) for status in statuses] + [row["total"]]
+            for c, value in enumerate(values):
+                self.table.setItem(r, c, QTableWidgetItem(str(value)))
+
+        self.lbl_total.setText(f"Enrollments: {sum(row['total'] for row in rows):,}")
+
+    def update_years(self, years):
+        current = self.combo_year.currentData()
+        listed = [self.combo_year.itemData(i) for i in range(1, self.combo_year.count())]
+        if listed == years:
+            return
+        self.combo_year.blockSignals(True)
+        self.combo_year.clear()
+        self.combo_year.addItem(ALL_YEARS, None)
+        for year in years:
+            self.combo_year.addItem(year, year)
+        index = self.combo_year.findData(current)
+        self.combo_year.setCurrentIndex(max(index, 0))
+        self.combo_year.blockSignals(False)
@@ -1,24 +1,26 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QComboBox, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
-    QFileDialog
+    QComboBox, QTableView, QMessageBox, QHeaderView
 )
 from PyQt5.QtCore import Qt
 
-from sqlalchemy.exc import IntegrityError
-
-import csv
-
-from database import SessionLocal
-from models import Student, Department, Faculty
+from pages.table_model import LazyTableModel
+from pages.query_executor import executor
+from pages.live_search import debounce, ensure_index, export_query, show_search, rows_reader
+from pages.csv_export import start_csv_export
+from pages.csv_import import start_student_import
+from api_client import OperationError, NotFound, Conflict
+import api_client
+import repository
+import reference_cache
 
 
 class StudentsPage(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.db = SessionLocal()
         self.selected_student_id = None  # will store ID of selected row
+        self.ref = None                  # reference_cache snapshot behind the combos
 
         # === MAIN LAYOUT ===
         main_layout = QHBoxLayout(self)
@@ -97,11 +99,13 @@ class StudentsPage(QWidget):
         # Search row
         search_row = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search by name or University ID...")
+        self.search_input.setPlaceholderText("Search by name, University ID, email or phone...")
         btn_search = QPushButton("Search")
         btn_search.clicked.connect(self.on_search)
         btn_reset = QPushButton("Reset")
         btn_reset.clicked.connect(self.on_reset_search)
+        # search as you type, once typing pauses
+        self.search_timer = debounce(self.search_input, self.on_search)
 
         search_row.addWidget(self.search_input)
         search_row.addWidget(btn_search)
@@ -109,22 +113,30 @@ class StudentsPage(QWidget):
 
         right_layout.addLayout(search_row)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
+        # Table (rows are fetched lazily from the DB as the view scrolls)
+        self.model = LazyTableModel(
             ["ID", "University ID", "Name", "Faculty", "Dept", "Level", "Phone"]
         )
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
         self.table.setSelectionBehavior(self.table.SelectRows)
         self.table.setEditTriggers(self.table.NoEditTriggers)
-        self.table.cellClicked.connect(self.on_row_clicked)
+        self.table.clicked.connect(self.on_row_clicked)
 
         right_layout.addWidget(self.table)
 
-        # Export buttons row
+        # Import / Export buttons row
         export_row = QHBoxLayout()
+        # row count (estimated until the list has been scrolled to the end)
+        self.lbl_count = QLabel()
+        self.model.loaded.connect(lambda: self.lbl_count.setText(self.model.count_text()))
+        export_row.addWidget(self.lbl_count)
         export_row.addStretch()
+        btn_import_csv = QPushButton("Import from CSV")
+        btn_import_csv.clicked.connect(self.import_from_csv)
+        export_row.addWidget(btn_import_csv)
+
         btn_export_csv = QPushButton("Export to CSV (Excel)")
         btn_export_csv.clicked.connect(self.export_to_csv)
         export_row.addWidget(btn_export_csv)
@@ -133,6 +145,7 @@ class StudentsPage(QWidget):
 
         # Fill combos + table
         self.load_faculties()
+        ensure_index("students")
         self.load_students()
 
         # Add to main layout
@@ -143,14 +156,25 @@ class StudentsPage(QWidget):
 
     def load_faculties(self):
         """Fill faculty combo and trigger loading departments for first faculty."""
+        # the shared reference cache: only its first load reads the DB
+        executor().submit((id(self), "reference"), reference_cache.get, self.fill_faculties)
+
+    def fill_faculties(self, ref):
+        if ref is self.ref:
+            return
+        self.ref = ref
+
+        selected = self.input_faculty.currentData()
+        self.input_faculty.blockSignals(True)
         self.input_faculty.clear()
-        faculties = self.db.query(Faculty).order_by(Faculty.name).all()
-        for fac in faculties:
-            self.input_faculty.addItem(fac.name, fac.id)
+        for fac_id, fac_name in ref.faculties:
+            self.input_faculty.addItem(fac_name, fac_id)
+        self.input_faculty.setCurrentIndex(max(self.input_faculty.findData(selected), 0))
+        self.input_faculty.blockSignals(False)
 
-        # trigger dept loading for first faculty
+        # trigger dept loading for the selected faculty
         if self.input_faculty.count() > 0:
-            self.on_faculty_changed(0)
+            self.on_faculty_changed(self.input_faculty.currentIndex())
         else:
             self.input_dept.clear()
 
@@ -168,47 +192,23 @@ class StudentsPage(QWidget):
         # Special option: Not specified yet (value = 0)
         self.input_dept.addItem("Not specified yet", 0)
 
-        if faculty_id is None:
+        if faculty_id is None or self.ref is None:
             return
 
-        # Actual departments from DB
-        departments = (
-            self.db.query(Department)
-            .filter(Department.faculty_id == faculty_id)
-            .order_by(Department.name)
-            .all()
-        )
-        for dep in departments:
-            self.input_dept.addItem(dep.name, dep.id)
+        # Actual departments (from the cache, no query)
+        for dep_id, dep_name in self.ref.departments_of(faculty_id):
+            self.input_dept.addItem(dep_name, dep_id)
+
+    def showEvent(self, event):
+        # pick up faculties/departments changed on other pages
+        super().showEvent(event)
+        self.load_faculties()
 
     # ========= LOAD STUDENTS TABLE ==========
 
     def load_students(self, search_text: str = ""):
-        query = self.db.query(Student)
-
-        if search_text:
-            like = f"%{search_text}%"
-            query = query.filter(
-                (Student.full_name.ilike(like)) |
-                (Student.university_id.ilike(like))
-            )
-
-        students = query.all()
-        self.table.setRowCount(len(students))
-
-        for row, s in enumerate(students):
-            faculty_name = s.department.faculty.name if s.department and s.department.faculty else ""
-            # Show "Not specified yet" if no department
-            dept_name = s.department.name if s.department else "Not specified yet"
-
-            self.table.setItem(row, 0, QTableWidgetItem(str(s.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(s.university_id))
-            self.table.setItem(row, 2, QTableWidgetItem(s.full_name))
-            self.table.setItem(row, 3, QTableWidgetItem(faculty_name))
-            self.table.setItem(row, 4, QTableWidgetItem(dept_name))
-            self.table.setItem(row, 5, QTableWidgetItem(str(s.level) if s.level is not None else ""))
-            self.table.setItem(row, 6, QTableWidgetItem(s.phone or ""))
-
+        self.current_search = search_text
+        show_search(self.model, "students", search_text)
         self.selected_student_id = None
 
     # ========= ADD NEW STUDENT ==========
@@ -233,55 +233,60 @@ class StudentsPage(QWidget):
         # If "Not specified yet" chosen → store NULL in DB
         dept_id = None if dept_data == 0 else dept_data
 
-        new_student = Student(
-            university_id=univid,
-            full_name=name,
-            department_id=dept_id,
-            level=level,
-            phone=phone,
-            email=email
-        )
+        fields = {
+            "university_id": univid,
+            "full_name": name,
+            "department_id": dept_id,
+            "level": level,
+            "phone": phone,
+            "email": email,
+        }
 
         try:
-            self.db.add(new_student)
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Student added successfully.")
-            self.clear_form()
-            self.load_students()
-        except IntegrityError:
-            self.db.rollback()
-            QMessageBox.warning(self, "Error", "University ID already exists.")
+            student = api_client.call("students.create", fields=fields)
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        QMessageBox.information(self, "Success", "Student added successfully.")
+        self.clear_form()
+        self.model.refresh_row(student["id"], rows_reader("students", self.current_search))
 
     # ========= WHEN TABLE ROW CLICKED ==========
 
-    def on_row_clicked(self, row, column):
-        id_item = self.table.item(row, 0)
-        if not id_item:
+    def on_row_clicked(self, index):
+        student_id = self.model.row_id(index.row())
+        if student_id is None:
             return
 
-        student_id = int(id_item.text())
         self.selected_student_id = student_id
 
-        student = self.db.query(Student).get(student_id)
+        executor().submit(
+            (id(self), "selected"),
+            lambda db: api_client.call("students.get", db, id=student_id),
+            self.fill_form,
+        )
+
+    def fill_form(self, student):
         if not student:
             return
 
         # Fill form with selected student data
-        self.input_univid.setText(student.university_id)
-        self.input_name.setText(student.full_name)
-        self.input_phone.setText(student.phone or "")
-        self.input_email.setText(student.email or "")
+        self.input_univid.setText(student["university_id"])
+        self.input_name.setText(student["full_name"])
+        self.input_phone.setText(student["phone"] or "")
+        self.input_email.setText(student["email"] or "")
 
         # Faculty & Department combos
-        if student.department and student.department.faculty:
-            fac = student.department.faculty
-            dept = student.department
-
-            idx_fac = self.input_faculty.findData(fac.id)
+        if student["department_id"] is not None:
+            idx_fac = self.input_faculty.findData(student["faculty_id"])
             if idx_fac >= 0:
                 self.input_faculty.setCurrentIndex(idx_fac)  # this reloads departments
 
-            idx_dept = self.input_dept.findData(dept.id)
+            idx_dept = self.input_dept.findData(student["department_id"])
             if idx_dept >= 0:
                 self.input_dept.setCurrentIndex(idx_dept)
         else:
@@ -294,8 +299,8 @@ class StudentsPage(QWidget):
                 self.input_dept.setCurrentIndex(idx_not_spec)
 
         # Level
-        if student.level:
-            idx = self.input_level.findText(str(student.level))
+        if student["level"]:
+            idx = self.input_level.findText(str(student["level"]))
             if idx >= 0:
                 self.input_level.setCurrentIndex(idx)
 
@@ -306,11 +311,6 @@ class StudentsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select a student from the table.")
             return
 
-        student = self.db.query(Student).get(self.selected_student_id)
-        if not student:
-            QMessageBox.warning(self, "Error", "Student not found.")
-            return
-
         univid = self.input_univid.text().strip()
         name = self.input_name.text().strip()
         dept_data = self.input_dept.currentData()
@@ -328,20 +328,30 @@ class StudentsPage(QWidget):
 
         dept_id = None if dept_data == 0 else dept_data
 
-        student.university_id = univid
-        student.full_name = name
-        student.department_id = dept_id
-        student.level = level
-        student.phone = phone
-        student.email = email
+        fields = {
+            "university_id": univid,
+            "full_name": name,
+            "department_id": dept_id,
+            "level": level,
+            "phone": phone,
+            "email": email,
+        }
 
         try:
-            self.db.commit()
-            QMessageBox.information(self, "Success", "Student updated successfully.")
-            self.load_students()
-        except IntegrityError:
-            self.db.rollback()
-            QMessageBox.warning(self, "Error", "University ID already exists.")
+            api_client.call("students.update", id=self.selected_student_id, fields=fields)
+        except NotFound:
+            QMessageBox.warning(self, "Error", "Student not found.")
+            return
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        QMessageBox.information(self, "Success", "Student updated successfully.")
+        # patch the one row: the list keeps its scroll position and selection
+        self.model.refresh_row(self.selected_student_id, rows_reader("students", self.current_search))
 
     # ========= DELETE SELECTED STUDENT ==========
 
@@ -360,21 +370,28 @@ class StudentsPage(QWidget):
         if reply == QMessageBox.No:
             return
 
-        student = self.db.query(Student).get(self.selected_student_id)
-        if not student:
+        try:
+            api_client.call("students.delete", id=self.selected_student_id)
+        except NotFound:
             QMessageBox.warning(self, "Error", "Student not found.")
             return
-
-        self.db.delete(student)
-        self.db.commit()
+        except Conflict as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except OperationError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
 
         QMessageBox.information(self, "Success", "Student deleted.")
+        self.model.remove_row(self.selected_student_id)
         self.clear_form()
-        self.load_students()
 
     # ========= CLEAR FORM ==========
 
     def clear_form(self):
+        # a row click still being read must not refill the form
+        executor().cancel((id(self), "selected"))
+
         self.input_univid.clear()
         self.input_name.clear()
         self.input_phone.clear()
@@ -395,49 +412,31 @@ class StudentsPage(QWidget):
 
     def on_reset_search(self):
         self.search_input.clear()
+        self.search_timer.stop()
+        self.load_students()
+
+    # ========= BULK IMPORT FROM CSV ==========
+
+    def import_from_csv(self):
+        # validated + batched inserts on a worker thread, reload when done
+        start_student_import(self, on_finished=self.on_import_finished)
+
+    def on_import_finished(self, report):
+        # the import dropped the stale index: rebuild it in the background
+        ensure_index("students")
         self.load_students()
 
     # ========= EXPORT TO CSV (Excel) ==========
 
     def export_to_csv(self):
-        path, _ = QFileDialog.getSaveFileName(
+        # streamed from the DB on a worker thread, the rows the list shows
+        query_factory = export_query(
+            "students", repository.student_list_query, self.current_search)
+        start_csv_export(
             self,
             "Save Students Data",
             "students_export.csv",
-            "CSV Files (*.csv)"
+            self.model.headers,
+            query_factory,
+            "Students exported successfully",
         )
-
-        if not path:
-            return
-
-        row_count = self.table.rowCount()
-        column_count = self.table.columnCount()
-
-        headers = [
-            self.table.horizontalHeaderItem(c).text()
-            for c in range(column_count)
-        ]
-
-        try:
-            with open(path, mode="w", newline="", encoding="utf-8-sig") as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-                for row in range(row_count):
-                    row_data = []
-                    for col in range(column_count):
-                        item = self.table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
-
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Students exported successfully to:\n{path}\n\nYou can open it with Excel."
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Export Failed",
-                f"An error occurred while exporting:\n{e}"
-            )
@@ -0,0 +1,295 @@
+# pages/table_model.py
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from pages.query_executor import executor
+from pagination import record_total
+
+
+class LazyTableModel(QAbstractTableModel):
+    """Read-only table model that pulls rows in windows as the view scrolls.
+
+    The model is fed *readers* that return plain rows (lists or tuples,
+    never ORM entities) whose first column is the record id. Rows are
+    fetched ``batch_size`` at a time, only when the view scrolls near the
+    end of what is loaded (``canFetchMore`` / ``fetchMore``).
+
+    With ``set_pages`` the windows are keyset pages (see pagination.py):
+    ``read_page(db, after, limit, with_total)`` returns the rows after key
+    ``after`` as ``{"rows", "has_next", "total"}``, so scrolling deep into
+    a large table does not get slower. With ``set_id_list`` the model
+    instead shows a precomputed list of ids (e.g. from the search index),
+    in that order; ``read_rows(db, ids)`` selects the rows for those ids.
+    The readers are normally operations called through api_client, so the
+    same model works against the local database or the server.
+
+    Windows are read on the query executor, never on the UI thread; a
+    new data source discards any window still in flight for the old one.
+
+    After a save, ``refresh_row`` re-reads the one row that changed and
+    patches it in place (updated, appended or removed), so the view keeps
+    its scroll position and selection and the cost does not grow with
+    the table.
+    """
+
+    # emitted after each window is appended (or the source is exhausted)
+    loaded = pyqtSignal()
+
+    def __init__(self, headers, batch_size=200, parent=None):
+        super().__init__(parent)
+
+        self.headers = list(headers)
+        self.batch_size = batch_size
+
+        self._reader = None
+        self._cache_key = None  # keyset mode: names the filter for the count cache
+        self._after = None      # keyset mode: key of the last row read
+        self._ids = None        # id-list mode: the ids to show, in order
+        self._id_pos = 0        # how many of them have been fetched
+        self._rows = []
+        self._exhausted = True
+        self._loading = False
+        self._generation = 0    # bumped per data source; stale row patches are dropped
+
+        # estimated number of rows for the current source (None = unknown)
+        self.total_estimate = None
+
+    # ---------- Data source ----------
+
+    def set_pages(self, read_page, cache_key=None):
+        """Replace the data source with keyset pages and start from the first.
+
+        `cache_key` names the filter for the cached total estimate.
+        """
+        self._reset(read_page, None, cache_key)
+
+    def set_id_list(self, ids, read_rows):
+        """Show exactly `ids`, in order; `read_rows(db, ids)` selects their rows."""
+        self._reset(read_rows, list(ids))
+
+    def _reset(self, reader, ids, cache_key=None):
+        executor().cancel(self._key())
+
+        self.beginResetModel()
+        self._generation += 1
+        self._reader = reader
+        self._cache_key = cache_key
+        self._after = None
+        self._ids = ids
+        self._id_pos = 0
+        self.total_estimate = len(ids) if ids is not None else None
+        self._rows = []
+        self._exhausted = reader is None or ids == []
+        self._loading = False
+        self.endResetModel()
+
+        # load the first window right away so the view is never empty
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+        else:
+            self.loaded.emit()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+
+        reader = self._reader
+        limit = self.batch_size
+        self._loading = True
+
+        if self._ids is not None:
+            chunk = self._ids[self._id_pos:self._id_pos + limit]
+            self._id_pos += len(chunk)
+
+            def read_ids(db):
+                found = {r[0]: tuple(r) for r in reader(db, chunk)}
+                # keep the list order; ids deleted meanwhile are skipped
+                return [found[i] for i in chunk if i in found]
+
+            executor().submit(
+                self._key(), read_ids,
+                # ids appended meanwhile (refresh_row) still count
+                lambda batch: self._append_window(batch, self._id_pos >= len(self._ids)),
+                self._on_error,
+            )
+            return
+
+        after = self._after
+        # the total only matters (and is only estimated) once per source
+        executor().submit(
+            self._key(),
+            lambda db: reader(db, after, limit, after is None),
+            self._append_page, self._on_error,
+        )
+
+    def _append_window(self, batch, exhausted):
+        self._loading = False
+        self._exhausted = exhausted
+
+        if batch:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+            self._rows.extend(batch)
+            self.endInsertRows()
+
+        self.loaded.emit()
+
+    def _append_page(self, page):
+        rows = [tuple(r) for r in page["rows"]]
+        if rows:
+            self._after = rows[-1][0]
+        if page.get("total") is not None:
+            self.total_estimate = page["total"]
+
+        if not page["has_next"]:
+            # read to the end: the exact total is known now
+            self.total_estimate = len(self._rows) + len(rows)
+            record_total(self._cache_key, self.total_estimate)
+
+        self._append_window(rows, not page["has_next"])
+
+    def _on_error(self, error):
+        # stop asking for more; the next data source starts over
+        self._loading = False
+        self._exhausted = True
+        self.loaded.emit()
+
+    def _key(self):
+        return (id(self), "rows")
+
+    def is_loading(self) -> bool:
+        return self._loading
+
+    def count_text(self) -> str:
+        """e.g. "Showing 200 of ~40,000" for a label under the table."""
+        shown = len(self._rows)
+        if self.total_estimate is None:
+            return f"{shown:,} rows"
+        if shown >= self.total_estimate and self._exhausted:
+            return f"{shown:,} rows"
+        return f"Showing {shown:,} of ~{self.total_estimate:,}"
+
+    # ---------- Row helpers ----------
+
+    def row_id(self, row: int):
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+    def row_values(self, row: int):
+        return self._rows[row]
+
+    def row_of(self, record_id):
+        """The row showing `record_id`, or None if it is not loaded."""
+        for row, values in enumerate(self._rows):
+            if values[0] == record_id:
+                return row
+        return None
+
+    # ---------- Patching single rows ----------
+
+    def refresh_row(self, record_id, read_rows):
+        """Re-read one record after a save and patch its row.
+
+        `read_rows(db, ids)` selects list rows by id (like set_id_list's
+        reader). A loaded row is updated in place; a new record is added
+        at the end of the list; a record the reader no longer returns
+        (deleted, or no longer matching the search) is removed.
+        """
+        generation = self._generation
+        executor().submit(
+            (id(self), "refresh", record_id),
+            lambda db: [tuple(r) for r in read_rows(db, [record_id])],
+            lambda rows: self._patch(generation, record_id, rows[0] if rows else None),
+        )
+
+    def _patch(self, generation, record_id, values):
+        if generation != self._generation:
+            return      # the data source changed meanwhile
+        if values is None:
+            self.remove_row(record_id)
+        elif not self.update_row(values):
+            self.append_row(values)
+
+    def update_row(self, values) -> bool:
+        """Replace the loaded row with the same id; False if it is not loaded."""
+        row = self.row_of(values[0])
+        if row is None:
+            return False
+        self._rows[row] = tuple(values)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+        return True
+
+    def append_row(self, values):
+        """Add a new record at the end of the list.
+
+        Until the last window is loaded the row is left to the window that
+        reaches it: keyset pages read it (ids only grow), an id list gets
+        its id queued.
+        """
+        record_id = values[0]
+        if self._ids is not None:
+            if record_id in self._ids:
+                return
+            self._ids.append(record_id)
+        if self.total_estimate is not None:
+            self.total_estimate += 1
+        if self._exhausted and self._reader is not None:
+            if self._ids is not None:
+                self._id_pos = len(self._ids)
+            else:
+                self._after = record_id
+            row = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.append(tuple(values))
+            self.endInsertRows()
+        self.loaded.emit()
+
+    def remove_row(self, record_id) -> bool:
+        """Drop the record's row (and its place in an id list)."""
+        if self._ids is not None and record_id in self._ids:
+            position = self._ids.index(record_id)
+            del self._ids[position]
+            if position < self._id_pos:
+                self._id_pos -= 1
+
+        row = self.row_of(record_id)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+        if self.total_estimate:
+            self.total_estimate -= 1
+        self.loaded.emit()
+        return True
+
+    # ---------- QAbstractTableModel ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        value = self._rows[index.row()][index.column()]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
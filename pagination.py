@@ -0,0 +1,145 @@
+# pagination.py
+"""
+Keyset (seek) pagination for the list queries.
+
+Instead of OFFSET (which makes SQLite step over every earlier row, so
+page 500 costs 500 pages of work) each page continues from the key of
+the last row seen:
+    WHERE <filters> AND id > :last_id ORDER BY id LIMIT :page_size + 1
+The key must be unique and indexed (the integer primary key). Any list
+query from repository.py can be paged, search filters included; pages
+are always in key order.
+
+Totals are estimated, not counted per page turn: one COUNT(*) per filter,
+cached for COUNT_TTL_SECONDS, and replaced by the exact number as soon as
+someone pages through to the end.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+
+DEFAULT_PAGE_SIZE = 200
+COUNT_TTL_SECONDS = 60
+
+_count_lock = threading.Lock()
+_counts = {}        # cache_key -> (total, monotonic time it was recorded)
+
+
+@dataclass
+class Page:
+    rows: list
+    page_size: int
+    has_next: bool
+    has_previous: bool
+    key_index: int = 0
+
+    @property
+    def first_key(self):
+        return self.rows[0][self.key_index] if self.rows else None
+
+    @property
+    def last_key(self):
+        return self.rows[-1][self.key_index] if self.rows else None
+
+
+class KeysetPager:
+    """Pages over `query_factory(db)` ordered by `key_column`.
+
+    `key_index` is the position of the key in each row (the list queries
+    put the id first). `cache_key` identifies the filter for the count
+    cache, e.g. ("students", search_text); None disables the cache.
+    """
+
+    def __init__(self, query_factory, key_column, page_size=DEFAULT_PAGE_SIZE,
+                 key_index=0, cache_key=None):
+        self.query_factory = query_factory
+        self.key_column = key_column
+        self.page_size = page_size
+        self.key_index = key_index
+        self.cache_key = cache_key
+
+    def _seek(self, db, after=None, before=None):
+        query = self.query_factory(db).order_by(None)
+        key = self.key_column
+
+        if before is not None:
+            query = query.filter(key < before).order_by(key.desc())
+        else:
+            if after is not None:
+                query = query.filter(key > after)
+            query = query.order_by(key)
+
+        # one extra row tells whether there is another page, without a COUNT
+        rows = [tuple(r) for r in query.limit(self.page_size + 1).all()]
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if before is not None:
+            rows.reverse()
+        return rows, more
+
+    def _page(self, rows, has_next, has_previous):
+        return Page(rows, self.page_size, has_next, has_previous, self.key_index)
+
+    def first(self, db) -> Page:
+        return self.after(db, None)
+
+    def after(self, db, key) -> Page:
+        """The page that follows `key` (the first page for None)."""
+        rows, more = self._seek(db, after=key)
+        if key is None and not more:
+            record_total(self.cache_key, len(rows))
+        return self._page(rows, more, key is not None)
+
+    def next(self, db, page: Page) -> Page:
+        if not page.has_next:
+            return self._page([], False, True)
+        return self.after(db, page.last_key)
+
+    def previous(self, db, page: Page) -> Page:
+        if not page.has_previous:
+            return self._page([], True, False)
+        rows, more = self._seek(db, before=page.first_key)
+        return self._page(rows, True, more)
+
+    def estimate_total(self, db) -> int:
+        """Cached total for this filter; counted at most once per TTL."""
+        cached = cached_total(self.cache_key)
+        if cached is not None:
+            return cached
+
+        total = self.query_factory(db).order_by(None).count()
+        record_total(self.cache_key, total)
+        return total
+
+
+# ---------- Count cache ----------
+
+def cached_total(cache_key):
+    if cache_key is None:
+        return None
+    with _count_lock:
+        entry = _counts.get(cache_key)
+    if entry is None:
+        return None
+    total, at = entry
+    if time.monotonic() - at > COUNT_TTL_SECONDS:
+        return None
+    return total
+
+
+def record_total(cache_key, total: int):
+    if cache_key is None:
+        return
+    with _count_lock:
+        _counts[cache_key] = (total, time.monotonic())
+
+
+def invalidate_counts(name=None):
+    """Forget cached totals (all, or those whose cache_key starts with `name`)."""
+    with _count_lock:
+        if name is None:
+            _counts.clear()
+            return
+        for key in [k for k in _counts if k[0] == name]:
+            del _counts[key]
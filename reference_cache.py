@@ -0,0 +1,152 @@
+# reference_cache.py
+"""
+Application-wide cache of the Faculty → Department → Course hierarchy.
+
+The combos on every page are filled from one ReferenceData snapshot, so
+changing a faculty or department selection never queries the database.
+The snapshot is loaded with three small SELECTs the first time it is
+needed, and dropped automatically when a session commits a change to
+faculties, departments or courses (tracked with the `after_flush` /
+`after_commit` / `after_rollback` session events). Code that changes
+those tables without the ORM (e.g. seed_data's Core inserts) has to call
+invalidate() itself.
+
+In client mode (see api_client.py) the snapshot comes from the server
+instead; other desks' changes cannot be seen committing, so it is only
+trusted for max_age seconds.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from database import SessionLocal
+from models import Faculty, Department, Course
+
+
+REFERENCE_MODELS = (Faculty, Department, Course)
+
+_lock = threading.Lock()
+_data = None
+_version = 0        # bumped by invalidate(), so a load that raced it is not kept
+_loaded_at = 0.0
+
+_loader = None      # fn() -> ReferenceData replacing the database (client mode)
+max_age = None      # seconds a snapshot is kept; None = until invalidated
+
+
+class ReferenceData:
+    """Read-only snapshot; all lists are (id, name) tuples."""
+
+    def __init__(self, faculties, departments, courses):
+        # faculties: (id, name) / departments: (id, name, faculty_id)
+        # courses: (id, name, department_id)
+        self._lists = (faculties, departments, courses)
+        self.faculty_names = dict(faculties)
+        self.faculties = sorted(faculties, key=lambda f: f[1])
+
+        self._departments = {}
+        self._departments_of = defaultdict(list)
+        for dep_id, name, faculty_id in sorted(departments, key=lambda d: d[1]):
+            self._departments[dep_id] = (name, faculty_id)
+            self._departments_of[faculty_id].append((dep_id, name))
+
+        self._courses_of = defaultdict(list)
+        for course_id, name, department_id in sorted(courses, key=lambda c: c[1]):
+            self._courses_of[department_id].append((course_id, name))
+
+    @classmethod
+    def from_lists(cls, lists):
+        """Rebuild a snapshot sent as JSON by as_lists()."""
+        return cls(*([tuple(item) for item in items] for items in lists))
+
+    def as_lists(self):
+        return [[list(item) for item in items] for items in self._lists]
+
+    def departments_of(self, faculty_id) -> list:
+        return self._departments_of.get(faculty_id, [])
+
+    def courses_of(self, department_id) -> list:
+        return self._courses_of.get(department_id, [])
+
+    def faculty_of(self, department_id):
+        dep = self._departments.get(department_id)
+        return dep[1] if dep else None
+
+    def departments_with_faculty(self) -> list:
+        """(id, "Faculty - Department") for every department, by id."""
+        items = []
+        for dep_id in sorted(self._departments):
+            name, faculty_id = self._departments[dep_id]
+            faculty_name = self.faculty_names.get(faculty_id, "Unknown Faculty")
+            items.append((dep_id, f"{faculty_name} - {name}"))
+        return items
+
+
+def load(db) -> ReferenceData:
+    return ReferenceData(
+        [tuple(r) for r in db.query(Faculty.id, Faculty.name)],
+        [tuple(r) for r in db.query(Department.id, Department.name, Department.faculty_id)],
+        [tuple(r) for r in db.query(Course.id, Course.name, Course.department_id)],
+    )
+
+
+def get(db=None) -> ReferenceData:
+    """The cached snapshot, loaded first if needed (safe from worker threads)."""
+    global _data, _loaded_at
+
+    data = _data
+    if data is not None and (max_age is None or time.monotonic() - _loaded_at < max_age):
+        return data
+
+    version = _version
+    if db is not None:
+        data = load(db)
+    elif _loader is not None:
+        data = _loader()
+    else:
+        with SessionLocal() as session:
+            data = load(session)
+
+    with _lock:
+        if _version == version:
+            _data = data
+            _loaded_at = time.monotonic()
+    return data
+
+
+def invalidate():
+    global _data, _version
+    with _lock:
+        _data = None
+        _version += 1
+
+
+def use_loader(loader, max_age_seconds):
+    """Read snapshots with `loader()` (no session) and keep each for a while."""
+    global _loader, max_age
+    _loader = loader
+    max_age = max_age_seconds
+    invalidate()
+
+
+# ---------- Automatic invalidation ----------
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_reference_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, REFERENCE_MODELS):
+            session.info["reference_changed"] = True
+            return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("reference_changed", False):
+        invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("reference_changed", None)
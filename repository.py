@@ -0,0 +1,174 @@
+# repository.py
+"""
+Query layer used by the pages.
+
+List views select only the columns they display, joined explicitly, so a
+list costs one SELECT per window however many rows it shows. Single-record
+lookups that walk relationships (student → department → faculty,
+enrollment → course → department → faculty) eager-load them with
+joinedload instead of triggering one lazy SELECT per hop.
+"""
+from sqlalchemy import String, case, cast, func, null, select
+from sqlalchemy.orm import aliased, joinedload
+
+from models import Student, Course, Instructor, Enrollment, Department, Faculty
+from seat_allocation import WAITLISTED
+from student_search import apply_student_search
+
+
+# ---------- LIST VIEWS (display columns only, first column = id) ----------
+
+def student_list_query(db, search_text: str = "", ids=None):
+    """ID, University ID, Name, Faculty, Dept, Level, Phone."""
+    query = (
+        db.query(
+            Student.id,
+            Student.university_id,
+            Student.full_name,
+            Faculty.name,
+            # Show "Not specified yet" if no department
+            func.coalesce(Department.name, "Not specified yet"),
+            Student.level,
+            Student.phone,
+        )
+        .outerjoin(Department, Student.department_id == Department.id)
+        .outerjoin(Faculty, Department.faculty_id == Faculty.id)
+    )
+
+    if ids is not None:
+        # rows for ids found by the in-memory search index (caller orders them)
+        return query.filter(Student.id.in_(ids))
+
+    if search_text:
+        # FTS5 index when available, ranked best match first
+        return apply_student_search(query, search_text)
+
+    return query.order_by(Student.id)
+
+
+def course_list_query(db, search_text: str = "", ids=None):
+    """ID, Code, Name, Dept, Credits, Semester."""
+    query = (
+        db.query(
+            Course.id,
+            Course.code,
+            Course.name,
+            Department.name,
+            Course.credits,
+            Course.semester,
+        )
+        .outerjoin(Department, Course.department_id == Department.id)
+    )
+
+    if ids is not None:
+        return query.filter(Course.id.in_(ids))
+
+    if search_text:
+        like = f"%{search_text}%"
+        query = query.filter(
+            (Course.code.ilike(like)) |
+            (Course.name.ilike(like))
+        )
+
+    return query.order_by(Course.id)
+
+
+def instructor_list_query(db, search_text: str = "", ids=None):
+    """ID, Name, Dept, Rank, Email, Phone."""
+    query = (
+        db.query(
+            Instructor.id,
+            Instructor.full_name,
+            Department.name,
+            Instructor.rank,
+            Instructor.email,
+            Instructor.phone,
+        )
+        .outerjoin(Department, Instructor.department_id == Department.id)
+    )
+
+    if ids is not None:
+        return query.filter(Instructor.id.in_(ids))
+
+    if search_text:
+        like = f"%{search_text}%"
+        query = query.filter(
+            (Instructor.full_name.ilike(like)) |
+            (Instructor.email.ilike(like))
+        )
+
+    return query.order_by(Instructor.id)
+
+
+def _status_with_waitlist_rank():
+    """Status, with the place in the queue for waitlisted rows ("Waitlisted #3")."""
+    ahead = aliased(Enrollment)
+    rank = (
+        select(func.count(ahead.id))
+        .where(
+            ahead.course_id == Enrollment.course_id,
+            func.coalesce(ahead.academic_year, "") == func.coalesce(Enrollment.academic_year, ""),
+            func.coalesce(ahead.semester, 0) == func.coalesce(Enrollment.semester, 0),
+            ahead.status == WAITLISTED,
+            ahead.waitlist_position <= Enrollment.waitlist_position,
+        )
+        .scalar_subquery()
+    )
+    return case(
+        (Enrollment.status == WAITLISTED, Enrollment.status + " #" + cast(rank, String)),
+        else_=Enrollment.status,
+    )
+
+
+def enrollment_list_query(db, student_id: int):
+    """ID, Course, Faculty, Department, Academic Year, Level, Grade, Status."""
+    return (
+        db.query(
+            Enrollment.id,
+            Course.name,
+            Faculty.name,
+            Department.name,
+            Enrollment.academic_year,
+            null(),     # Enrollment has no level column yet
+            Enrollment.grade,
+            _status_with_waitlist_rank(),
+        )
+        .outerjoin(Course, Enrollment.course_id == Course.id)
+        .outerjoin(Department, Course.department_id == Department.id)
+        .outerjoin(Faculty, Department.faculty_id == Faculty.id)
+        .filter(Enrollment.student_id == student_id)
+        .order_by(Enrollment.id)
+    )
+
+
+# ---------- SINGLE RECORDS (relationships eager-loaded) ----------
+
+def get_student(db, student_id: int):
+    return (
+        db.query(Student)
+        .options(joinedload(Student.department).joinedload(Department.faculty))
+        .filter(Student.id == student_id)
+        .first()
+    )
+
+
+def get_student_by_university_id(db, university_id: str):
+    return (
+        db.query(Student)
+        .options(joinedload(Student.department).joinedload(Department.faculty))
+        .filter(Student.university_id == university_id)
+        .first()
+    )
+
+
+def get_enrollment(db, enrollment_id: int):
+    return (
+        db.query(Enrollment)
+        .options(
+            joinedload(Enrollment.course)
+            .joinedload(Course.department)
+            .joinedload(Department.faculty)
+        )
+        .filter(Enrollment.id == enrollment_id)
+        .first()
+    )
@@ -0,0 +1,257 @@
+# search_index.py
+"""
+In-memory word-prefix index for search-as-you-type.
+
+Every indexed field is split into lower-case words ("Ahmed Ali",
+"ahmed.ali7@example.edu", "2025-0000123" → ahmed, ali, ahmed, ali7,
+example, edu, 2025, 0000123). The words are kept in one sorted list, so
+the records matching a prefix are one bisect away. A search matches the
+records in which every typed word is the prefix of some indexed word.
+
+Indexes are built once per process (from a worker thread, see
+pages/live_search.py and server.py) and then kept up to date by the
+record operations through record_saved()/record_deleted(), once their
+unit of work has committed. Bulk changes
+(CSV import) call invalidate() and the index is rebuilt on the next
+search. search() and the updates share a lock, so server worker threads
+can use one index concurrently.
+"""
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from models import Student, Course, Instructor
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# last code point: "abc" + PREFIX_END sorts after every word starting with "abc"
+PREFIX_END = chr(sys.maxunicode)
+
+# The first keystrokes ("m", "01") match most records; turning a word range
+# that long into distinct sorted ids costs several ms per keystroke, so the
+# ids of such short prefixes are kept ready (and updated with the index).
+COMMON_PREFIX_LENGTH = 2
+COMMON_PREFIX_ENTRIES = 10_000     # word range at least this long
+
+# name -> (model, indexed columns); the fields the old ilike search covered
+INDEXED = {
+    "students": (Student, ("university_id", "full_name", "email", "phone")),
+    "courses": (Course, ("code", "name")),
+    "instructors": (Instructor, ("full_name", "email")),
+}
+
+
+def tokenize(*fields) -> list:
+    words = []
+    for value in fields:
+        if value:
+            words.extend(WORD_PATTERN.findall(str(value).lower()))
+    return words
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._words = []    # sorted
+        self._ids = []      # record id of the word at the same position
+        self._docs = {}     # record id -> its distinct words
+        self._common = {}   # common short prefix -> its record ids, sorted
+
+    @classmethod
+    def build(cls, rows):
+        """Build from (id, field, field, ...) rows in one sort."""
+        index = cls()
+        pairs = []
+        for row in rows:
+            doc_id, fields = row[0], row[1:]
+            words = index._doc_words(fields)
+            index._docs[doc_id] = words
+            pairs.extend((w, doc_id) for w in words)
+
+        pairs.sort()
+        index._words = [w for w, _ in pairs]
+        index._ids = [i for _, i in pairs]
+        index._find_common_prefixes()
+        return index
+
+    def _find_common_prefixes(self):
+        prefixes = {w[:n] for w in dict.fromkeys(self._words)
+                    for n in range(1, COMMON_PREFIX_LENGTH + 1)}
+        for prefix in prefixes:
+            lo, hi = self._prefix_range(prefix)
+            if hi - lo >= COMMON_PREFIX_ENTRIES:
+                # ints iterate out of a set nearly in order: the sort is cheap
+                self._common[prefix] = sorted(set(self._ids[lo:hi]))
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _doc_words(fields):
+        # interned: the same first names repeat across thousands of records
+        return tuple(sys.intern(w) for w in dict.fromkeys(tokenize(*fields)))
+
+    def _common_prefixes_of(self, words):
+        return {w[:n] for w in words for n in range(1, COMMON_PREFIX_LENGTH + 1)} & self._common.keys()
+
+    # ---------- Incremental updates ----------
+
+    def add(self, doc_id, *fields):
+        if doc_id in self._docs:
+            self.remove(doc_id)
+
+        words = self._doc_words(fields)
+        self._docs[doc_id] = words
+        for w in words:
+            pos = bisect_left(self._words, w)
+            self._words.insert(pos, w)
+            self._ids.insert(pos, doc_id)
+        for prefix in self._common_prefixes_of(words):
+            insort(self._common[prefix], doc_id)
+
+    def remove(self, doc_id):
+        words = self._docs.pop(doc_id, ())
+        for w in words:
+            lo = bisect_left(self._words, w)
+            hi = bisect_right(self._words, w, lo)
+            pos = self._ids.index(doc_id, lo, hi)
+            del self._words[pos]
+            del self._ids[pos]
+        for prefix in self._common_prefixes_of(words):
+            ids = self._common[prefix]
+            del ids[bisect_left(ids, doc_id)]
+
+    update = add
+
+    # ---------- Lookup ----------
+
+    def _prefix_range(self, prefix):
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + PREFIX_END, lo)
+        return lo, hi
+
+    def search(self, text: str) -> list:
+        """Ids of the records matching every word of `text`, ascending."""
+        prefixes = list(dict.fromkeys(tokenize(text)))
+        if not prefixes:
+            return sorted(self._docs)
+
+        if len(prefixes) == 1 and prefixes[0] in self._common:
+            return list(self._common[prefixes[0]])
+
+        # start from the rarest prefix; each further prefix only probes the
+        # (shrinking) candidate set with its ids
+        matches = sorted((self._matches(p) for p in prefixes), key=len)
+        candidates = set(matches[0])
+        for ids in matches[1:]:
+            if not candidates:
+                break
+            candidates = candidates.intersection(ids)
+
+        return sorted(candidates)
+
+    def matches(self, doc_id, text: str) -> bool:
+        """Whether record `doc_id` would be among search(text)."""
+        words = self._docs.get(doc_id)
+        if words is None:
+            return False
+        return all(any(w.startswith(p) for w in words) for p in tokenize(text))
+
+    def _matches(self, prefix) -> list:
+        """Ids of the records with a word starting with `prefix` (may repeat)."""
+        ids = self._common.get(prefix)
+        if ids is not None:
+            return ids
+        lo, hi = self._prefix_range(prefix)
+        return self._ids[lo:hi]
+
+
+# ---------- Application-wide indexes ----------
+
+_lock = threading.Lock()
+_indexes = {}       # name -> PrefixIndex (only once built)
+_changes = {}       # name -> number of changes seen, to spot builds that raced a save
+
+
+def index_rows(db, name: str):
+    """(id, fields...) rows to build the named index from."""
+    model, columns = INDEXED[name]
+    return db.query(model.id, *(getattr(model, c) for c in columns)).yield_per(5000)
+
+
+def build_index(db, name: str) -> PrefixIndex:
+    return PrefixIndex.build(index_rows(db, name))
+
+
+def get_index(name: str):
+    """The built index, or None while it is not available yet."""
+    return _indexes.get(name)
+
+
+def set_index(name: str, index: PrefixIndex):
+    with _lock:
+        _indexes[name] = index
+
+
+def search(name: str, text: str):
+    """Ids matching `text` in the named index; None while it is not built."""
+    with _lock:
+        index = _indexes.get(name)
+        return None if index is None else index.search(text)
+
+
+def matches(name: str, doc_id: int, text: str):
+    """Whether one record matches `text` in the named index; None while it is not built."""
+    with _lock:
+        index = _indexes.get(name)
+        return None if index is None else index.matches(doc_id, text)
+
+
+def change_count(name: str) -> int:
+    return _changes.get(name, 0)
+
+
+def _changed(name: str):
+    _changes[name] = _changes.get(name, 0) + 1
+
+
+def invalidate(name: str = None):
+    """Drop one index (or all); it is rebuilt on the next search."""
+    with _lock:
+        for key in ([name] if name else list(INDEXED)):
+            _indexes.pop(key, None)
+            _changed(key)
+
+
+def _name_of(model):
+    for name, (indexed_model, _) in INDEXED.items():
+        if indexed_model is model:
+            return name
+    return None
+
+
+def indexed_fields(obj) -> list:
+    """The values record_saved() indexes for `obj`, read while its session is open."""
+    _, columns = INDEXED[_name_of(type(obj))]
+    return [getattr(obj, c) for c in columns]
+
+
+def record_saved(model, doc_id: int, fields):
+    """Index an added/updated Student, Course or Instructor once it is committed."""
+    name = _name_of(model)
+    with _lock:
+        _changed(name)
+        index = _indexes.get(name)
+        if index is not None:
+            index.update(doc_id, *fields)
+
+
+def record_deleted(model, doc_id: int):
+    """Drop a Student, Course or Instructor once its delete is committed."""
+    name = _name_of(model)
+    with _lock:
+        _changed(name)
+        index = _indexes.get(name)
+        if index is not None:
+            index.remove(doc_id)
@@ -0,0 +1,209 @@
+# seat_allocation.py
+"""
+Course capacity and waitlists.
+
+A course with a capacity has that many seats per term (academic year +
+semester). Every registration that holds a seat (any status except
+Waitlisted and Withdrawn) counts against it. A registration that finds
+the course full is kept as Waitlisted, with the next waitlist position,
+instead. When a seat frees up (withdrawal, deletion, a move to another
+course or term, a larger capacity), the first students on the waitlist
+are promoted in position order, so nobody waits while a seat is free.
+
+Counting the seats and taking one must not be split by another desk's
+write, or two desks can both see the last free seat. Every function
+here first takes SQLite's write lock for the caller's transaction
+(database.begin_immediate, i.e. BEGIN IMMEDIATE): allocations from any
+number of threads or processes are serialized while plain reads carry
+on. The lock is held until the caller commits, so keep that unit of work
+short.
+
+Lowering a capacity below the seats already taken removes no one; new
+registrations are waitlisted until enough seats free up.
+"""
+from sqlalchemy import and_, func, literal_column, or_
+
+from database import begin_immediate
+from models import Course, Enrollment
+
+
+WAITLISTED = "Waitlisted"
+WITHDRAWN = "Withdrawn"
+NO_SEAT_STATUSES = (WAITLISTED, WITHDRAWN)
+PROMOTED_STATUS = "In Progress"     # what a student taken off the waitlist becomes
+
+
+def holds_seat(status) -> bool:
+    return status not in NO_SEAT_STATUSES
+
+
+def same_term(academic_year, semester):
+    """Enrollment is in this term, with the expressions of the enrollment indexes.
+
+    The defaults are literal SQL (not bound parameters) so SQLite can match
+    the COALESCE(...) index expressions.
+    """
+    return and_(
+        func.coalesce(Enrollment.academic_year, literal_column("''")) == (academic_year or ""),
+        func.coalesce(Enrollment.semester, literal_column("0")) == (semester or 0),
+    )
+
+
+def _in_course_term(course_id, academic_year, semester):
+    return and_(Enrollment.course_id == course_id, same_term(academic_year, semester))
+
+
+def holding_seat():
+    # NULL status is a plain registration, it holds a seat too
+    return or_(Enrollment.status.is_(None), Enrollment.status.notin_(NO_SEAT_STATUSES))
+
+
+def seats_taken(db, course_id, academic_year, semester, exclude_id=None) -> int:
+    query = db.query(func.count(Enrollment.id)).filter(
+        _in_course_term(course_id, academic_year, semester), holding_seat(),
+    )
+    if exclude_id is not None:
+        query = query.filter(Enrollment.id != exclude_id)
+    return query.scalar()
+
+
+def capacity_of(db, course_id):
+    return db.query(Course.capacity).filter(Course.id == course_id).scalar()
+
+
+def next_position(db, course_id, academic_year, semester) -> int:
+    last = db.query(func.max(Enrollment.waitlist_position)).filter(
+        _in_course_term(course_id, academic_year, semester),
+        Enrollment.status == WAITLISTED,
+    ).scalar()
+    return (last or 0) + 1
+
+
+def waitlist_rank(db, enr):
+    """1-based place of a waitlisted enrollment in its queue (None if not waitlisted)."""
+    if enr.status != WAITLISTED or enr.waitlist_position is None:
+        return None
+    return db.query(func.count(Enrollment.id)).filter(
+        _in_course_term(enr.course_id, enr.academic_year, enr.semester),
+        Enrollment.status == WAITLISTED,
+        Enrollment.waitlist_position <= enr.waitlist_position,
+    ).scalar()
+
+
+def _place(db, enr, keep_position=False):
+    """Seat `enr` if a seat is free, otherwise queue it (its status asks for a seat).
+
+    This may replace the status the caller set (Waitlisted <-> a seated
+    status); callers report enr.status as the one applied.
+    """
+    if enr.status == WITHDRAWN:
+        enr.waitlist_position = None
+        return
+
+    capacity = capacity_of(db, enr.course_id)
+    if capacity is None or seats_taken(
+        db, enr.course_id, enr.academic_year, enr.semester, exclude_id=enr.id,
+    ) < capacity:
+        if enr.status == WAITLISTED:
+            enr.status = PROMOTED_STATUS
+        enr.waitlist_position = None
+        return
+
+    enr.status = WAITLISTED
+    if not (keep_position and enr.waitlist_position):
+        enr.waitlist_position = next_position(db, enr.course_id, enr.academic_year, enr.semester)
+
+
+# ---------- Allocation (each takes the write lock first) ----------
+
+def enroll(db, student_id: int, course_id: int, **fields):
+    """Add a registration: seated if the course has room, waitlisted if not."""
+    begin_immediate(db)
+    enr = Enrollment(student_id=student_id, course_id=course_id, **fields)
+    if enr.status is None:
+        enr.status = PROMOTED_STATUS
+    _place(db, enr)
+    db.add(enr)
+    db.flush()
+    return enr
+
+
+def update(db, enrollment_id: int, fields: dict):
+    """Change a registration; (enrollment, promoted ids) or (None, []) if it is gone.
+
+    A registration that needs a new seat (other course/term, or back from
+    Waitlisted/Withdrawn) is placed again; the seat it gave up goes to the
+    waitlist of its old course and term.
+    """
+    begin_immediate(db)
+    enr = db.query(Enrollment).get(enrollment_id)
+    if enr is None:
+        return None, []
+
+    old_term = (enr.course_id, enr.academic_year, enr.semester)
+    old_status = enr.status
+    for field, value in fields.items():
+        setattr(enr, field, value)
+
+    moved = (enr.course_id, enr.academic_year, enr.semester) != old_term
+    if moved or not holds_seat(old_status) or enr.status in NO_SEAT_STATUSES:
+        _place(db, enr, keep_position=not moved and old_status == WAITLISTED)
+    db.flush()
+
+    promoted = []
+    if holds_seat(old_status) and (moved or not holds_seat(enr.status)):
+        promoted = fill_free_seats(db, *old_term)
+    return enr, promoted
+
+
+def delete(db, enrollment_id: int):
+    """Remove a registration; (True, promoted ids) or (False, []) if it is gone."""
+    begin_immediate(db)
+    enr = db.query(Enrollment).get(enrollment_id)
+    if enr is None:
+        return False, []
+
+    term = (enr.course_id, enr.academic_year, enr.semester)
+    had_seat = holds_seat(enr.status)
+    db.delete(enr)
+    db.flush()
+    return True, fill_free_seats(db, *term) if had_seat else []
+
+
+def fill_free_seats(db, course_id, academic_year, semester) -> list:
+    """Promote waitlisted students into free seats, in waitlist order; their ids."""
+    begin_immediate(db)
+    capacity = capacity_of(db, course_id)
+    waiting = (
+        db.query(Enrollment)
+        .filter(_in_course_term(course_id, academic_year, semester), Enrollment.status == WAITLISTED)
+        .order_by(Enrollment.waitlist_position, Enrollment.id)
+    )
+    if capacity is not None:
+        free = capacity - seats_taken(db, course_id, academic_year, semester)
+        if free <= 0:
+            return []
+        waiting = waiting.limit(free)
+
+    promoted = waiting.all()
+    for enr in promoted:
+        enr.status = PROMOTED_STATUS
+        enr.waitlist_position = None
+    db.flush()
+    return [enr.id for enr in promoted]
+
+
+def fill_all_terms(db, course_id) -> list:
+    """fill_free_seats for every term with a waitlist (e.g. after a capacity change)."""
+    begin_immediate(db)
+    terms = (
+        db.query(Enrollment.academic_year, Enrollment.semester)
+        .filter(Enrollment.course_id == course_id, Enrollment.status == WAITLISTED)
+        .distinct()
+        .all()
+    )
+    promoted = []
+    for academic_year, semester in terms:
+        promoted += fill_free_seats(db, course_id, academic_year, semester)
+    return promoted
+
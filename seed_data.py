@@ -1,44 +1,62 @@
 # seed_data.py
-from database import SessionLocal
-from models import Faculty, Department, User
+"""
+Initial data (faculties, departments, admin user) plus an optional
+synthetic-data generator for testing the app at university scale.
+
+    python seed_data.py                      # faculties, departments, admin
+    python seed_data.py --students 40000 --instructors 800 \
+        --courses 2000 --enrollments-per-student 6
+"""
+import argparse
+import random
+import time
+from datetime import date
+
+from database import SessionLocal, engine
+from models import Faculty, Department, User, Student, Instructor, Course, CourseSlot, Enrollment
+from sqlalchemy import insert, select, func
 from sqlalchemy.exc import IntegrityError
 
+from migrations import upgrade
+from gpa import GRADE_POINTS
+
+
+# === Faculties and their departments/majors ===
+FACULTY_STRUCTURE = {
+    "Faculty of Computers & Information": [
+        "Computer Science",
+        "Information Systems",
+        "Information Technology",
+        "Software Engineering",
+        "Artificial Intelligence",
+    ],
+    "Faculty of Engineering": [
+        "Civil Engineering",
+        "Electrical Engineering",
+        "Mechanical Engineering",
+        "Architecture",
+    ],
+    "Faculty of Commerce": [
+        "Accounting",
+        "Business Administration",
+        "Marketing",
+        "Finance"
+    ],
+    "Faculty of Science": [
+        "Mathematics",
+        "Physics",
+        "Chemistry",
+        "Biology",
+    ],
+}
+
 
 def create_initial_data():
     db = SessionLocal()
 
     try:
-        # === Faculties and their departments/majors ===
-        faculty_structure = {
-            "Faculty of Computers & Information": [
-                "Computer Science",
-                "Information Systems",
-                "Information Technology",
-                "Software Engineering",
-                "Artificial Intelligence",
-            ],
-            "Faculty of Engineering": [
-                "Civil Engineering",
-                "Electrical Engineering",
-                "Mechanical Engineering",
-                "Architecture",
-            ],
-            "Faculty of Commerce": [
-                "Accounting",
-                "Business Administration",
-                "Marketing",
-                "Finance"
-            ],
-            "Faculty of Science": [
-                "Mathematics",
-                "Physics",
-                "Chemistry",
-                "Biology",
-            ],
-        }
-
         # Create faculties and departments if not exist
-        for faculty_name, dept_list in faculty_structure.items():
+        for faculty_name, dept_list in FACULTY_STRUCTURE.items():
             faculty = db.query(Faculty).filter_by(name=faculty_name).first()
             if not faculty:
                 faculty = Faculty(name=faculty_name)
@@ -74,5 +92,232 @@ def create_initial_data():
         db.close()
 
 
+# ---------- SYNTHETIC DATA GENERATOR ----------
+
+FIRST_NAMES = [
+    "Ahmed", "Mohamed", "Mahmoud", "Omar", "Youssef", "Karim", "Mostafa", "Hassan",
+    "Ali", "Khaled", "Amr", "Tarek", "Mona", "Sara", "Nour", "Laila", "Hana",
+    "Mariam", "Salma", "Aya", "Yasmin", "Reem", "Dina", "Farida",
+]
+LAST_NAMES = [
+    "Hassan", "Ali", "Mahmoud", "Ibrahim", "Fathy", "Saleh", "Mostafa", "Kamal",
+    "Nabil", "Adel", "Samir", "Farouk", "Gamal", "Hosny", "Shawky", "Ezzat",
+]
+INSTRUCTOR_RANKS = [
+    ("Teaching Assistant", 40), ("Assistant Lecturer", 25), ("Lecturer", 20),
+    ("Associate Professor", 10), ("Professor", 5),
+]
+# first-year intakes are bigger than final-year classes
+LEVEL_WEIGHTS = [(1, 31), (2, 26), (3, 23), (4, 20)]
+STUDENT_STATUSES = [("active", 92), ("suspended", 3), ("graduated", 5)]
+ENROLLMENT_STATUSES = [("In Progress", 70), ("Completed", 25), ("Failed", 5)]
+CREDITS = [(2, 20), (3, 65), (4, 15)]
+PASSING_GRADES = [("A", 12), ("A-", 10), ("B+", 14), ("B", 18), ("B-", 12),
+                  ("C+", 12), ("C", 10), ("C-", 6), ("D+", 4), ("D", 2)]
+# class blocks: 08:00-09:30, 09:40-11:10, ... 16:20-17:50
+SLOT_GRID_START = 8 * 60
+SLOT_BLOCK_STEP = 100
+SLOT_BLOCKS = 6
+SLOT_LENGTH = 90
+
+INSERT_BATCH = 10_000
+
+
+def _weighted(rnd, pairs):
+    values, weights = zip(*pairs)
+    return rnd.choices(values, weights)[0]
+
+
+def _random_name(rnd, parts=3):
+    first = rnd.choice(FIRST_NAMES)
+    middle = " ".join(rnd.choice(FIRST_NAMES) for _ in range(parts - 2))
+    return f"{first} {middle} {rnd.choice(LAST_NAMES)}".replace("  ", " ")
+
+
+def random_student(rnd, number: int, year: int = 2025) -> dict:
+    """University ID, name, email and phone of one synthetic student."""
+    name = _random_name(rnd)
+    first, last = name.split()[0].lower(), name.split()[-1].lower()
+    return {
+        "university_id": f"{year}-{number:07d}",
+        "full_name": name,
+        "email": f"{first}.{last}{number}@student.example.edu",
+        "phone": f"01{rnd.randint(0, 2)}{rnd.randint(10_000_000, 99_999_999)}",
+    }
+
+
+def _insert_batched(conn, model, rows):
+    for i in range(0, len(rows), INSERT_BATCH):
+        conn.execute(insert(model), rows[i:i + INSERT_BATCH])
+
+
+def generate_bulk_data(students=0, instructors=0, courses=0,
+                       enrollments_per_student=0, academic_year="2025/2026",
+                       seed=42, bind=engine):
+    """Add synthetic students, instructors, courses and enrollments.
+
+    Department sizes follow a skewed (Pareto) distribution, levels shrink
+    from first to fourth year, ~3% of students have no department yet,
+    and every student enrolls in roughly `enrollments_per_student`
+    courses of their own department and level. Faculties/departments must
+    already exist (see create_initial_data). Returns the counts inserted.
+    """
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+
+    with bind.begin() as conn:
+        dept_ids = list(conn.execute(select(Department.id).order_by(Department.id)).scalars())
+        if not dept_ids:
+            raise RuntimeError("No departments found, run create_initial_data() first.")
+
+        # popular departments are much bigger than small ones
+        dept_weights = [rnd.paretovariate(1.5) for _ in dept_ids]
+
+        # ---- instructors ----
+        instructor_rows = []
+        for i in range(instructors):
+            name = _random_name(rnd)
+            instructor_rows.append({
+                "full_name": f"Dr. {name}",
+                "email": f"{name.split()[0].lower()}.{name.split()[-1].lower()}{i}@staff.example.edu",
+                "phone": f"01{rnd.randint(0, 2)}{rnd.randint(10_000_000, 99_999_999)}",
+                "rank": _weighted(rnd, INSTRUCTOR_RANKS),
+                "department_id": rnd.choices(dept_ids, dept_weights)[0],
+            })
+        _insert_batched(conn, Instructor, instructor_rows)
+
+        instructors_by_dept = {}
+        for ins_id, dep_id in conn.execute(select(Instructor.id, Instructor.department_id)):
+            instructors_by_dept.setdefault(dep_id, []).append(ins_id)
+
+        # ---- courses ----
+        next_code = conn.execute(select(func.coalesce(func.max(Course.id), 0))).scalar() + 1
+        first_course_id = next_code
+        course_rows = []
+        for _ in range(courses):
+            dep_id = rnd.choices(dept_ids, dept_weights)[0]
+            level = _weighted(rnd, LEVEL_WEIGHTS)
+            candidates = instructors_by_dept.get(dep_id)
+            course_rows.append({
+                "code": f"C{level}{next_code:05d}",
+                "name": f"Course {next_code} (Level {level})",
+                "credits": _weighted(rnd, CREDITS),
+                "semester": rnd.randint(1, 2),
+                "department_id": dep_id,
+                "instructor_id": rnd.choice(candidates) if candidates else None,
+            })
+            next_code += 1
+        _insert_batched(conn, Course, course_rows)
+
+        # two 90-minute meetings a week (Mon/Wed, Tue/Thu or Wed/Fri) on a block grid
+        slot_rows = []
+        for course_id in conn.execute(select(Course.id).where(Course.id >= first_course_id)).scalars():
+            day = rnd.randint(0, 2)
+            start = SLOT_GRID_START + rnd.randrange(SLOT_BLOCKS) * SLOT_BLOCK_STEP
+            room = f"{rnd.choice('ABCDE')}{rnd.randint(1, 40)}"
+            for meeting_day in (day, day + 2):
+                slot_rows.append({
+                    "course_id": course_id, "day": meeting_day, "start_minute": start,
+                    "end_minute": start + SLOT_LENGTH, "room": room,
+                })
+        _insert_batched(conn, CourseSlot, slot_rows)
+
+        # course level is encoded in its code: C<level>xxxxx
+        courses_by_dept_level = {}
+        for course_id, code, dep_id, semester in conn.execute(
+            select(Course.id, Course.code, Course.department_id, Course.semester)
+        ):
+            level = int(code[1]) if code[:1] == "C" and code[1:2].isdigit() else None
+            courses_by_dept_level.setdefault((dep_id, level), []).append((course_id, semester))
+
+        # ---- students ----
+        year = int(academic_year[:4])
+        last_student_id = conn.execute(select(func.coalesce(func.max(Student.id), 0))).scalar()
+        student_rows = []
+        for i in range(last_student_id + 1, last_student_id + 1 + students):
+            name = _random_name(rnd, parts=rnd.choice([3, 3, 4]))
+            level = _weighted(rnd, LEVEL_WEIGHTS)
+            student_rows.append({
+                "university_id": f"{year - level + 1}-{i:06d}",
+                "full_name": name,
+                "gender": rnd.choice(["Male", "Female"]),
+                "date_of_birth": date(year - 17 - level, rnd.randint(1, 12), rnd.randint(1, 28)),
+                "email": f"{name.split()[0].lower()}{i}@student.example.edu",
+                "phone": f"01{rnd.randint(0, 2)}{rnd.randint(10_000_000, 99_999_999)}",
+                "level": level,
+                "status": _weighted(rnd, STUDENT_STATUSES),
+                "department_id": None if rnd.random() < 0.03 else rnd.choices(dept_ids, dept_weights)[0],
+            })
+        _insert_batched(conn, Student, student_rows)
+
+        # ---- enrollments ----
+        enrollment_count = 0
+        if enrollments_per_student:
+            enrollment_rows = []
+            new_students = conn.execute(
+                select(Student.id, Student.department_id, Student.level)
+                .where(Student.id > last_student_id)
+            ).all()
+            for student_id, dep_id, level in new_students:
+                offered = courses_by_dept_level.get((dep_id, level))
+                if not offered:
+                    continue
+                take = min(len(offered), max(1, int(rnd.gauss(enrollments_per_student, 1.5))))
+                for course_id, semester in rnd.sample(offered, take):
+                    status = _weighted(rnd, ENROLLMENT_STATUSES)
+                    grade = None
+                    if status == "Completed":
+                        grade = _weighted(rnd, PASSING_GRADES)
+                    elif status == "Failed":
+                        grade = "F"
+                    enrollment_rows.append({
+                        "student_id": student_id,
+                        "course_id": course_id,
+                        "academic_year": academic_year,
+                        "semester": semester,
+                        "status": status,
+                        "grade": grade,
+                        "grade_points": GRADE_POINTS.get(grade),
+                    })
+                if len(enrollment_rows) >= INSERT_BATCH:
+                    _insert_batched(conn, Enrollment, enrollment_rows)
+                    enrollment_count += len(enrollment_rows)
+                    enrollment_rows = []
+            _insert_batched(conn, Enrollment, enrollment_rows)
+            enrollment_count += len(enrollment_rows)
+
+    counts = {
+        "students": students,
+        "instructors": instructors,
+        "courses": courses,
+        "enrollments": enrollment_count,
+    }
+    print(
+        "Generated " + ", ".join(f"{n:,} {name}" for name, n in counts.items())
+        + f" in {time.perf_counter() - started:.1f}s."
+    )
+    return counts
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the MIS database.")
+    parser.add_argument("--students", type=int, default=0)
+    parser.add_argument("--instructors", type=int, default=0)
+    parser.add_argument("--courses", type=int, default=0)
+    parser.add_argument("--enrollments-per-student", type=int, default=0)
+    parser.add_argument("--academic-year", default="2025/2026")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    upgrade()
     create_initial_data()
+
+    if args.students or args.instructors or args.courses:
+        generate_bulk_data(
+            students=args.students,
+            instructors=args.instructors,
+            courses=args.courses,
+            enrollments_per_student=args.enrollments_per_student,
+            academic_year=args.academic_year,
+            seed=args.seed,
+        )
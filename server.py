@@ -0,0 +1,280 @@
+# server.py
+"""
+Headless server: the operations in operations.py over HTTP/JSON, so
+several registrar desks can share one database.
+
+    python server.py --port 8765 --workers 8
+    MIS_SERVER_URL=http://<server>:8765 python main.py      # on each desk
+
+Endpoints (all bodies are JSON):
+    GET  /health          {"status": "ok", "workers": N, "requests": n, "operations": [...]}
+    POST /api/<name>      params object -> result
+    POST /batch           [{"op": name, "params": {...}}, ...] -> [result, ...]
+                          one unit of work: all committed, or none on error
+Errors come back as {"error": message} with status 400 (bad request),
+401 (not logged in), 404 (unknown operation / record), 409 (conflict) or 500.
+
+Every POST except /api/auth.login needs the token a successful login
+returns ({"username", "role", "token"}), sent as "Authorization: Bearer
+<token>". Tokens live in the server's memory: they end with the process
+or after SESSION_IDLE_SECONDS without a request.
+
+Connections are served by asyncio (HTTP/1.1 keep-alive, so a desk reuses
+one connection per thread). Operations run on a pool of `--workers`
+threads, each with its own session; the engine's connection pool has
+exactly that many connections, so requests beyond that wait in the
+executor queue instead of piling up on SQLite's write lock. The search
+indexes are built in the background at start-up and kept current by
+every write, for all desks.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from sqlalchemy.pool import QueuePool
+
+from database import SessionLocal, DATABASE_URL, make_engine
+from migrations import upgrade
+import operations
+import search_index
+
+
+logger = logging.getLogger("mis.server")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+
+IDLE_TIMEOUT_SECONDS = 60       # keep-alive connections idle this long are closed
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH = 100
+SESSION_IDLE_SECONDS = 8 * 3600
+LOGIN_OPERATION = "auth.login"
+
+
+class BadRequest(Exception):
+    pass
+
+
+# ---------- HTTP/1.1 ----------
+
+async def read_request(reader):
+    """(method, path, headers, keep_alive, body), or None when the client has gone."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    try:
+        method, path, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("Malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Malformed Content-Length") from None
+    if length < 0:
+        raise BadRequest("Malformed Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise BadRequest("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path, headers, keep_alive, body
+
+
+def write_response(writer, status: int, payload, keep_alive: bool):
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+# ---------- Server ----------
+
+class Server:
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mis-op")
+        self.requests = 0
+        self.sessions = {}      # token -> last request (monotonic); event loop thread only
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT_SECONDS)
+                except BadRequest as e:
+                    write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, keep_alive, body = request
+                status, payload = await self.dispatch(method, path, body, headers)
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes, headers: dict = None):
+        self.requests += 1
+        started = time.perf_counter()
+
+        if method == "GET" and path == "/health":
+            return 200, {
+                "status": "ok",
+                "workers": self.workers,
+                "requests": self.requests,
+                "operations": operations.names(),
+            }
+        if method != "POST":
+            return 405, {"error": f"{method} not allowed"}
+
+        logging_in = path == f"/api/{LOGIN_OPERATION}"
+        if not logging_in and not self._authorized(headers or {}):
+            return 401, {"error": "Not logged in (or the session expired)"}
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "Body is not valid JSON"}
+
+        if path.startswith("/api/"):
+            if not isinstance(payload, dict):
+                return 400, {"error": "Parameters must be a JSON object"}
+            work = (operations.run_in_scope, path[len("/api/"):], payload)
+        elif path == "/batch":
+            calls = self._batch_calls(payload)
+            if calls is None:
+                return 400, {"error": f"Batch must be a list of at most {MAX_BATCH} "
+                                      '{"op": name, "params": {...}} objects'}
+            work = (operations.run_batch_in_scope, calls)
+        else:
+            return 404, {"error": f"No such endpoint {path}"}
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.pool, *work)
+        except operations.OperationError as e:
+            return e.status, {"error": str(e)}
+        except Exception:
+            logger.exception("%s failed", path)
+            return 500, {"error": "Internal server error"}
+        finally:
+            logger.debug("%s %.1f ms", path, (time.perf_counter() - started) * 1000)
+
+        if logging_in and result:
+            token = secrets.token_urlsafe(32)
+            self.sessions[token] = time.monotonic()
+            result = dict(result, token=token)
+        return 200, result
+
+    def _authorized(self, headers: dict) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        last_seen = self.sessions.get(token) if scheme.lower() == "bearer" else None
+        now = time.monotonic()
+        if last_seen is None or now - last_seen > SESSION_IDLE_SECONDS:
+            self.sessions.pop(token, None)
+            return False
+        self.sessions[token] = now
+        return True
+
+    @staticmethod
+    def _batch_calls(payload):
+        if not isinstance(payload, list) or len(payload) > MAX_BATCH:
+            return None
+        calls = []
+        for item in payload:
+            if not isinstance(item, dict) or not isinstance(item.get("op"), str):
+                return None
+            params = item.get("params") or {}
+            if not isinstance(params, dict):
+                return None
+            calls.append((item["op"], params))
+        return calls
+
+    def build_search_indexes(self):
+        for name in search_index.INDEXED:
+            self.pool.submit(_build_current_index, name)
+
+
+def _build_current_index(name: str):
+    # rebuilt when a write lands while the snapshot is being read
+    while True:
+        changes = search_index.change_count(name)
+        with SessionLocal() as db:
+            index = search_index.build_index(db, name)
+        if search_index.change_count(name) == changes:
+            search_index.set_index(name, index)
+            logger.info("Search index %s ready (%d records)", name, len(index))
+            return
+
+
+def configure_database(workers: int, url: str = DATABASE_URL):
+    """Point SessionLocal at an engine whose pool matches the worker threads."""
+    engine = make_engine(url, poolclass=QueuePool, pool_size=workers, max_overflow=0)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+async def serve(host: str, port: int, workers: int):
+    server = Server(workers)
+    server.build_search_indexes()
+
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    logger.info("Serving on http://%s:%d with %d workers", host, port, workers)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the MIS operations over HTTP/JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="address to listen on (0.0.0.0 for the whole network)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="operation threads = database connections")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s: %(message)s")
+
+    engine = configure_database(args.workers)
+    upgrade(engine)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
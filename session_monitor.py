@@ -0,0 +1,84 @@
+# session_monitor.py
+"""
+Identity-map memory report.
+
+Every session made by SessionLocal is tracked (weakly) from its first
+transaction. A sample counts the sessions still holding objects, the
+ORM objects in their identity maps and the process memory, so a long
+day of use can be checked for growth. main.py samples every
+SAMPLE_SECONDS when MIS_SESSION_REPORT is set:
+    MIS_SESSION_REPORT=1              print one line per sample to the terminal
+    MIS_SESSION_REPORT=sessions.jsonl append one JSON line per sample
+"""
+import json
+import os
+import sys
+import threading
+import weakref
+from datetime import datetime
+
+from sqlalchemy import event
+
+from database import SessionLocal
+
+try:
+    import resource     # not available on Windows
+except ImportError:
+    resource = None
+
+
+REPORT_TARGET = os.environ.get("MIS_SESSION_REPORT", "")
+SAMPLE_SECONDS = 60
+
+_lock = threading.Lock()
+_sessions = weakref.WeakSet()
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _track_session(session, transaction, connection):
+    with _lock:
+        _sessions.add(session)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def sample() -> dict:
+    with _lock:
+        sessions = list(_sessions)
+
+    sizes = [len(s.identity_map) for s in sessions]
+    return {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "sessions_alive": len(sessions),
+        "sessions_holding_objects": sum(1 for n in sizes if n),
+        "identity_map_objects": sum(sizes),
+        "largest_identity_map": max(sizes, default=0),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def report():
+    """Take a sample and write it to MIS_SESSION_REPORT (no-op when unset)."""
+    if not REPORT_TARGET:
+        return None
+
+    row = sample()
+    if REPORT_TARGET.lower() in ("1", "true", "stdout"):
+        print(
+            f"[sessions {row['at']}] alive={row['sessions_alive']} "
+            f"holding={row['sessions_holding_objects']} "
+            f"objects={row['identity_map_objects']} "
+            f"largest={row['largest_identity_map']} "
+            f"peak_rss={row['peak_rss_mb']} MB",
+            file=sys.stderr,
+        )
+    else:
+        with open(REPORT_TARGET, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+    return row
@@ -0,0 +1,330 @@
+# sql_trace.py
+"""
+What each UI action costs in SQL.
+
+An action is everything one user event sets off: the click handler, the
+reads it submits to the query executor and whatever their results
+trigger in turn, until the last of them is delivered. Every statement
+run on its behalf, on the main thread or a worker, is recorded on it
+(cursor execute events, so ORM, Core and raw SQL alike): the count, the
+total time, the slowest statements, and the statements repeated with
+only their parameters changing - the N+1 pattern of a loop doing one
+query per row.
+
+Actions are opened explicitly (`with sql_trace.action("Students: open")`)
+or, once main.py has called install_event_loop(), implicitly by the first
+api_client call or executor submit of an event-loop turn. When one
+finishes, a one-line summary goes to the listeners (the main window's
+status bar).
+
+Only active when MIS_SQL_TRACE is set; otherwise nothing is listened to:
+    MIS_SQL_TRACE=1                  status bar, and one summary line per action on the terminal
+    MIS_SQL_TRACE=sql_trace.jsonl    status bar, and one JSON line per action (every statement)
+
+Offline:
+    python sql_trace.py summarize sql_trace.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+TRACE_TARGET = os.environ.get("MIS_SQL_TRACE", "")
+ENABLED = bool(TRACE_TARGET) and TRACE_TARGET != "0"
+
+N_PLUS_ONE_THRESHOLD = 5    # the same statement this often in one action
+SLOWEST_KEPT = 5
+
+_local = threading.local()
+_listeners = []
+_write_lock = threading.Lock()
+
+_schedule = None            # runs a callable after the current event-loop turn
+_scope = None               # prefix for implicit action names (e.g. the page shown)
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+
+class Action:
+    def __init__(self, name: str):
+        self.name = name
+        self.operations = []        # api_client operations / executor keys, first seen order
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.statements = 0
+        self.seconds = 0.0
+        self.by_statement = defaultdict(lambda: [0, 0.0])     # sql -> [count, seconds]
+        self.slowest = []           # (seconds, sql), longest first
+
+        self._lock = threading.Lock()
+        self._holds = 0             # executor jobs not delivered yet
+        self._closed = False
+        self._finished = False
+
+    def note(self, label):
+        with self._lock:
+            if label and label not in self.operations:
+                self.operations.append(label)
+
+    def record(self, sql: str, seconds: float):
+        with self._lock:
+            self.statements += 1
+            self.seconds += seconds
+            entry = self.by_statement[sql]
+            entry[0] += 1
+            entry[1] += seconds
+            if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+                self.slowest.append((seconds, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[SLOWEST_KEPT:]
+
+    def n_plus_one(self) -> list:
+        """(sql, count, seconds) of the statements repeated N_PLUS_ONE_THRESHOLD+ times."""
+        with self._lock:
+            repeated = [(sql, count, seconds) for sql, (count, seconds) in self.by_statement.items()
+                        if count >= N_PLUS_ONE_THRESHOLD]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def summary(self) -> str:
+        text = (f"{self.name}: {self.statements} SQL in {self.seconds * 1000:.1f} ms"
+                f" (wall {self.wall_seconds * 1000:.0f} ms")
+        if self.slowest:
+            text += f", slowest {self.slowest[0][0] * 1000:.1f} ms"
+        text += ")"
+        repeated = self.n_plus_one()
+        if repeated:
+            sql, count, _ = repeated[0]
+            text += f"  ⚠ N+1: {count}x {_table_of(sql)}"
+            if len(repeated) > 1:
+                text += f" (+{len(repeated) - 1} more)"
+        return text
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            statements = sorted(self.by_statement.items(), key=lambda item: item[1][1], reverse=True)
+            slowest = list(self.slowest)
+            operations = list(self.operations)
+        return {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "action": self.name,
+            "operations": operations,
+            "statements": self.statements,
+            "sql_ms": round(self.seconds * 1000, 2),
+            "wall_ms": round(self.wall_seconds * 1000, 1),
+            "slowest": [{"ms": round(s * 1000, 2), "sql": sql} for s, sql in slowest],
+            "n_plus_one": [{"count": count, "ms": round(s * 1000, 2), "sql": sql}
+                           for sql, count, s in self.n_plus_one()],
+            "by_statement": [{"count": count, "ms": round(s * 1000, 2), "sql": sql}
+                             for sql, (count, s) in statements],
+        }
+
+    # ---- lifetime: open until closed and every held job is delivered ----
+
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+
+    def release(self):
+        with self._lock:
+            self._holds -= 1
+            done = self._closed and self._holds <= 0 and not self._finished
+            self._finished = self._finished or done
+        if done:
+            _finish(self)
+
+    def close(self):
+        if getattr(_local, "action", None) is self:
+            _local.action = None
+        with self._lock:
+            self._closed = True
+            done = self._holds <= 0 and not self._finished
+            self._finished = self._finished or done
+        if done:
+            _finish(self)
+
+
+def _table_of(sql: str) -> str:
+    match = _TABLE.search(sql)
+    return match.group(1) if match else sql[:40]
+
+
+def _finish(act: Action):
+    act.wall_seconds = time.perf_counter() - act.started
+    for listener in list(_listeners):
+        listener(act)
+    if TRACE_TARGET.lower() in ("1", "true", "stdout"):
+        print(f"[sql] {act.summary()}", file=sys.stderr)
+    else:
+        line = json.dumps(act.as_dict())
+        with _write_lock, open(TRACE_TARGET, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# ---------- Opening actions ----------
+
+def current():
+    """The action of this thread (None when tracing is off or outside any action)."""
+    return getattr(_local, "action", None)
+
+
+@contextlib.contextmanager
+def action(name: str):
+    """Trace the with-block (and the reads it submits) as one action."""
+    if not ENABLED or current() is not None:
+        yield current()
+        return
+    act = Action(name)
+    _local.action = act
+    try:
+        yield act
+    finally:
+        act.close()
+
+
+def enter(label: str):
+    """The action `label` belongs to: this thread's, or a new one for this event-loop turn.
+
+    Called by api_client and the query executor. A new action is only
+    opened on the main thread once install_event_loop() was called; it is
+    closed when the turn ends.
+    """
+    if not ENABLED:
+        return None
+    act = current()
+    if act is None:
+        if _schedule is None or threading.current_thread() is not threading.main_thread():
+            return None
+        scope = _scope() if _scope else None
+        act = Action(f"{scope}: {label}" if scope else label)
+        _local.action = act
+        _schedule(act.close)
+    act.note(label)
+    return act
+
+
+def hold(label: str):
+    """enter() for work delivered later: the action stays open until release()."""
+    act = enter(label)
+    if act is not None:
+        act.hold()
+    return act
+
+
+def release(act):
+    if act is not None:
+        act.release()
+
+
+def activate(act):
+    """Run the with-block on behalf of `act` (e.g. on a worker thread)."""
+    if act is None:
+        return contextlib.nullcontext()
+    return _activated(act)
+
+
+@contextlib.contextmanager
+def _activated(act):
+    previous = current()
+    _local.action = act
+    try:
+        yield act
+    finally:
+        _local.action = previous
+
+
+def install_event_loop(schedule, scope=None):
+    """schedule(fn): run fn once the current event-loop turn is over; scope(): name prefix."""
+    global _schedule, _scope
+    _schedule, _scope = schedule, scope
+
+
+def add_listener(fn):
+    """fn(action) for every finished action (on the thread that finished it)."""
+    _listeners.append(fn)
+
+
+# ---------- Statement timing ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_trace_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["sql_trace_started"].pop()
+    act = current()
+    if act is not None:
+        act.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # the after event never comes for a failed statement
+    stack = exception_context.connection.info.get("sql_trace_started") \
+        if exception_context.connection is not None else None
+    if stack:
+        stack.pop()
+
+
+if ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+# ---------- Offline analysis ----------
+
+def summarize(path: str, top: int = 15):
+    """Print the costliest actions and statements of a JSON lines trace."""
+    by_action = defaultdict(lambda: [0, 0, 0.0, 0.0])   # name -> [runs, statements, sql ms, wall ms]
+    repeated = defaultdict(lambda: [0, 0, set()])       # sql -> [actions, executions, action names]
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            totals = by_action[row["action"]]
+            totals[0] += 1
+            totals[1] += row["statements"]
+            totals[2] += row["sql_ms"]
+            totals[3] += row["wall_ms"]
+            for item in row["n_plus_one"]:
+                entry = repeated[item["sql"]]
+                entry[0] += 1
+                entry[1] += item["count"]
+                entry[2].add(row["action"])
+
+    print(f"{'action':<48}{'runs':>6}{'SQL/run':>9}{'SQL ms/run':>12}{'wall ms/run':>13}")
+    ranked = sorted(by_action.items(), key=lambda item: item[1][2], reverse=True)
+    for name, (runs, statements, sql_ms, wall_ms) in ranked[:top]:
+        print(f"{name[:47]:<48}{runs:>6}{statements / runs:>9.1f}"
+              f"{sql_ms / runs:>12.1f}{wall_ms / runs:>13.1f}")
+
+    if repeated:
+        print("\nN+1 candidates (statement repeated within one action):")
+        for sql, (actions, executions, names) in sorted(
+            repeated.items(), key=lambda item: item[1][1], reverse=True
+        )[:top]:
+            print(f"  {executions:>7}x in {actions} action(s), e.g. {sorted(names)[0]}")
+            print(f"           {' '.join(sql.split())[:110]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a MIS_SQL_TRACE JSON lines file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_parser = sub.add_parser("summarize", help="costliest actions and N+1 candidates")
+    summary_parser.add_argument("path")
+    summary_parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    summarize(args.path, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
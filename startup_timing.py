@@ -0,0 +1,60 @@
+# startup_timing.py
+"""
+Cold-start timing report.
+
+Import this module first in main.py: its import time is the reference
+point for everything measured afterwards. The report is only produced
+when MIS_STARTUP_REPORT is set:
+    MIS_STARTUP_REPORT=1             print the report to the terminal
+    MIS_STARTUP_REPORT=startup.jsonl append one JSON line per start (for tracking)
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+REPORT_TARGET = os.environ.get("MIS_STARTUP_REPORT", "")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries = []       # (name, milliseconds)
+
+    def mark(self, name: str, since: float = None):
+        """Record the time elapsed since process start (or since `since`)."""
+        ms = (time.perf_counter() - (self.started if since is None else since)) * 1000
+        self.entries.append((name, ms))
+        return ms
+
+    @contextmanager
+    def measure(self, name: str):
+        """Record how long the body of the with-block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, since=start)
+
+    def report(self):
+        if not REPORT_TARGET:
+            return
+
+        if REPORT_TARGET.lower() in ("1", "true", "stdout"):
+            print("---- startup timing ----", file=sys.stderr)
+            for name, ms in self.entries:
+                print(f"  {name:<36}{ms:>9.1f} ms", file=sys.stderr)
+            return
+
+        with open(REPORT_TARGET, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "timings_ms": {name: round(ms, 1) for name, ms in self.entries},
+            }) + "\n")
+
+
+# one timer per process, started when main.py imports this module
+timer = StartupTimer()
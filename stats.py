@@ -0,0 +1,105 @@
+# stats.py
+"""
+Set-based statistics for the dashboard and reports.
+
+Every function runs a fixed number of grouped aggregate queries and
+returns plain rows (no ORM entities are loaded into the session).
+Rows support attribute access by the labels shown in each docstring.
+"""
+from sqlalchemy import func
+
+from models import Student, Course, Instructor, Faculty, Department
+
+
+def _count_per_department(db, model):
+    """Subquery: (dept_id, n) = number of `model` rows per department."""
+    return (
+        db.query(
+            model.department_id.label("dept_id"),
+            func.count(model.id).label("n"),
+        )
+        .group_by(model.department_id)
+        .subquery()
+    )
+
+
+def totals(db):
+    """Row(students, courses, instructors) for the whole university."""
+    return db.query(
+        db.query(func.count(Student.id)).scalar_subquery().label("students"),
+        db.query(func.count(Course.id)).scalar_subquery().label("courses"),
+        db.query(func.count(Instructor.id)).scalar_subquery().label("instructors"),
+    ).one()
+
+
+def faculty_summary(db):
+    """Rows(faculty_id, faculty, departments, students, courses, instructors)."""
+    students = _count_per_department(db, Student)
+    courses = _count_per_department(db, Course)
+    instructors = _count_per_department(db, Instructor)
+
+    return (
+        db.query(
+            Faculty.id.label("faculty_id"),
+            Faculty.name.label("faculty"),
+            func.count(Department.id).label("departments"),
+            func.coalesce(func.sum(students.c.n), 0).label("students"),
+            func.coalesce(func.sum(courses.c.n), 0).label("courses"),
+            func.coalesce(func.sum(instructors.c.n), 0).label("instructors"),
+        )
+        .outerjoin(Department, Department.faculty_id == Faculty.id)
+        .outerjoin(students, students.c.dept_id == Department.id)
+        .outerjoin(courses, courses.c.dept_id == Department.id)
+        .outerjoin(instructors, instructors.c.dept_id == Department.id)
+        .group_by(Faculty.id, Faculty.name)
+        .order_by(Faculty.id)
+        .all()
+    )
+
+
+def department_summary(db, faculty_id: int = None):
+    """Rows(department_id, department, faculty, students, courses, instructors)."""
+    students = _count_per_department(db, Student)
+    courses = _count_per_department(db, Course)
+    instructors = _count_per_department(db, Instructor)
+
+    query = (
+        db.query(
+            Department.id.label("department_id"),
+            Department.name.label("department"),
+            Faculty.name.label("faculty"),
+            func.coalesce(students.c.n, 0).label("students"),
+            func.coalesce(courses.c.n, 0).label("courses"),
+            func.coalesce(instructors.c.n, 0).label("instructors"),
+        )
+        .join(Faculty, Department.faculty_id == Faculty.id)
+        .outerjoin(students, students.c.dept_id == Department.id)
+        .outerjoin(courses, courses.c.dept_id == Department.id)
+        .outerjoin(instructors, instructors.c.dept_id == Department.id)
+    )
+
+    if faculty_id is not None:
+        query = query.filter(Department.faculty_id == faculty_id)
+
+    return query.order_by(Faculty.name, Department.name).all()
+
+
+def level_breakdown(db, faculty_id: int = None, department_id: int = None):
+    """Rows(level, students) — student counts per level, optionally scoped.
+
+    Students without a level are reported with level None.
+    """
+    query = db.query(
+        Student.level.label("level"),
+        func.count(Student.id).label("students"),
+    )
+
+    if department_id is not None:
+        query = query.filter(Student.department_id == department_id)
+    elif faculty_id is not None:
+        query = (
+            query.join(Department, Student.department_id == Department.id)
+            .filter(Department.faculty_id == faculty_id)
+        )
+
+    return query.group_by(Student.level).order_by(Student.level).all()
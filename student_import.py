@@ -0,0 +1,262 @@
+# student_import.py
+"""
+Bulk import of students from a CSV file.
+
+Every row is validated against the models.py schema first (university ID
+format, faculty/department names, level, status, date of birth); valid
+rows are then inserted with Core `insert()` executemany in large batches,
+one transaction per batch. Bad rows and duplicates are collected in the
+report and never abort the rest of the file.
+
+Expected header (case-insensitive, only the first two are required):
+    university_id, full_name, faculty, department, level,
+    gender, date_of_birth, email, phone, status
+
+Headless usage:
+    python student_import.py students.csv [--batch-size 5000] [--dry-run]
+"""
+import argparse
+import csv
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from database import engine
+from models import Student, Department, Faculty
+from pagination import invalidate_counts
+import search_index
+
+
+UNIVERSITY_ID_PATTERN = re.compile(r"^\d{4}-\d{3,7}$")   # e.g. 2025-12345
+VALID_LEVELS = {1, 2, 3, 4}
+VALID_STATUSES = {"active", "graduated", "suspended"}
+REQUIRED_COLUMNS = {"university_id", "full_name"}
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    inserted: int = 0
+    duplicates: list = field(default_factory=list)   # (line, university_id, reason)
+    errors: list = field(default_factory=list)       # (line, message)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.rows_read:,} rows read, {self.inserted:,} inserted, "
+            f"{len(self.duplicates):,} duplicates, {len(self.errors):,} errors "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+class DepartmentLookup:
+    """Faculty/department names → department id, preloaded in one query."""
+
+    def __init__(self, conn):
+        self.faculties = set()
+        self.by_pair = {}       # (faculty, department) -> id
+        self.by_name = {}       # department -> [ids]  (ambiguous if > 1)
+
+        rows = conn.execute(
+            select(Faculty.name, Department.name, Department.id)
+            .join(Department, Department.faculty_id == Faculty.id, isouter=True)
+        )
+        for fac_name, dep_name, dep_id in rows:
+            fac_key = fac_name.strip().lower()
+            self.faculties.add(fac_key)
+            if dep_id is None:
+                continue
+            dep_key = dep_name.strip().lower()
+            self.by_pair[(fac_key, dep_key)] = dep_id
+            self.by_name.setdefault(dep_key, []).append(dep_id)
+
+    def resolve(self, faculty: str, department: str):
+        """Return the department id (None = not specified) or raise ValueError."""
+        fac_key = faculty.strip().lower()
+        dep_key = department.strip().lower()
+
+        if fac_key and fac_key not in self.faculties:
+            raise ValueError(f"unknown faculty '{faculty}'")
+        if not dep_key:
+            return None
+        if fac_key:
+            dep_id = self.by_pair.get((fac_key, dep_key))
+            if dep_id is None:
+                raise ValueError(f"no department '{department}' in faculty '{faculty}'")
+            return dep_id
+
+        ids = self.by_name.get(dep_key, [])
+        if not ids:
+            raise ValueError(f"unknown department '{department}'")
+        if len(ids) > 1:
+            raise ValueError(f"department '{department}' is ambiguous, give the faculty")
+        return ids[0]
+
+
+def parse_row(row: dict, lookup: DepartmentLookup) -> dict:
+    """Validate one CSV row and return the values to insert (or raise ValueError)."""
+    univid = (row.get("university_id") or "").strip()
+    name = (row.get("full_name") or "").strip()
+
+    if not univid or not name:
+        raise ValueError("university_id and full_name are required")
+    if not UNIVERSITY_ID_PATTERN.match(univid):
+        raise ValueError(f"invalid university ID '{univid}' (expected e.g. 2025-12345)")
+
+    level_text = (row.get("level") or "").strip()
+    level = None
+    if level_text:
+        if not level_text.isdigit() or int(level_text) not in VALID_LEVELS:
+            raise ValueError(f"invalid level '{level_text}' (expected 1-4)")
+        level = int(level_text)
+
+    status = (row.get("status") or "").strip().lower() or "active"
+    if status not in VALID_STATUSES:
+        raise ValueError(f"invalid status '{status}'")
+
+    dob_text = (row.get("date_of_birth") or "").strip()
+    dob = None
+    if dob_text:
+        try:
+            dob = date.fromisoformat(dob_text)
+        except ValueError:
+            raise ValueError(f"invalid date_of_birth '{dob_text}' (expected YYYY-MM-DD)")
+
+    department_id = lookup.resolve(row.get("faculty") or "", row.get("department") or "")
+
+    return {
+        "university_id": univid,
+        "full_name": name,
+        "gender": (row.get("gender") or "").strip() or None,
+        "date_of_birth": dob,
+        "email": (row.get("email") or "").strip() or None,
+        "phone": (row.get("phone") or "").strip() or None,
+        "level": level,
+        "status": status,
+        "department_id": department_id,
+    }
+
+
+def _students_committed():
+    # Core inserts bypass the record operations: the cached row counts and
+    # the in-memory search index (rebuilt on the next search) are stale now
+    invalidate_counts("students")
+    search_index.invalidate("students")
+
+
+def _insert_batch(bind, batch, report: ImportReport):
+    """Insert one batch in a single transaction; on a conflict retry row by row."""
+    values = [v for _, v in batch]
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(Student), values)
+        report.inserted += len(values)
+        _students_committed()
+        return
+    except IntegrityError:
+        pass
+
+    # someone else inserted one of these IDs meanwhile: isolate the offenders
+    inserted = report.inserted
+    for line, v in batch:
+        try:
+            with bind.begin() as conn:
+                conn.execute(insert(Student), [v])
+            report.inserted += 1
+        except IntegrityError:
+            report.duplicates.append((line, v["university_id"], "already in database"))
+    if report.inserted > inserted:
+        _students_committed()
+
+
+def import_students_csv(path, bind=engine, batch_size=DEFAULT_BATCH_SIZE,
+                        dry_run=False, progress=None, is_cancelled=None) -> ImportReport:
+    """Validate and insert every student in the CSV file at `path`.
+
+    `progress(rows_read)` is called after each batch; `is_cancelled()` is
+    polled between batches (rows already committed stay committed).
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+
+    with bind.connect() as conn:
+        lookup = DepartmentLookup(conn)
+        existing_ids = set(conn.execute(select(Student.university_id)).scalars())
+
+    seen_ids = {}
+    batch = []
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+
+        missing = REQUIRED_COLUMNS - set(reader.fieldnames)
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+
+        # line 1 is the header
+        for line, row in enumerate(reader, start=2):
+            report.rows_read += 1
+
+            try:
+                values = parse_row(row, lookup)
+            except ValueError as e:
+                report.errors.append((line, str(e)))
+                continue
+
+            univid = values["university_id"]
+            if univid in existing_ids:
+                report.duplicates.append((line, univid, "already in database"))
+                continue
+            if univid in seen_ids:
+                report.duplicates.append((line, univid, f"repeats line {seen_ids[univid]}"))
+                continue
+            seen_ids[univid] = line
+
+            batch.append((line, values))
+            if len(batch) >= batch_size:
+                if not dry_run:
+                    _insert_batch(bind, batch, report)
+                batch = []
+                if progress:
+                    progress(report.rows_read)
+                if is_cancelled and is_cancelled():
+                    break
+
+    if batch and not dry_run and not (is_cancelled and is_cancelled()):
+        _insert_batch(bind, batch, report)
+
+    if progress:
+        progress(report.rows_read)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import students from a CSV file.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="validate only, insert nothing")
+    args = parser.parse_args(argv)
+
+    report = import_students_csv(args.csv_path, batch_size=args.batch_size, dry_run=args.dry_run)
+
+    for line, univid, reason in report.duplicates:
+        print(f"line {line}: duplicate {univid} ({reason})")
+    for line, message in report.errors:
+        print(f"line {line}: {message}")
+    print(report.summary())
+
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# student_search.py
+"""
+SQLite FTS5 full-text index over the students table.
+
+`students_fts` is an external-content FTS5 table (trigram tokenizer) over
+full_name, university_id, email and phone. Triggers on `students` keep it
+in sync, so the application never writes to it directly.
+
+Usage (existing databases):
+    python student_search.py            # create the index + triggers if missing
+    python student_search.py rebuild    # rebuild the index from the students table
+"""
+import sys
+
+from sqlalchemy import text, table, column, literal_column, inspect
+from sqlalchemy.exc import OperationalError
+
+from database import engine
+from models import Student
+
+
+FTS_TABLE = "students_fts"
+
+# The trigram tokenizer cannot match terms shorter than 3 characters,
+# shorter searches fall back to a plain LIKE scan.
+MIN_FTS_TERM_LENGTH = 3
+
+FTS_COLUMNS = "full_name, university_id, email, phone"
+
+CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {FTS_COLUMNS},
+        content='students',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON students BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.full_name, new.university_id, new.email, new.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON students BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.full_name, old.university_id, old.email, old.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON students BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.full_name, old.university_id, old.email, old.phone);
+        INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.full_name, new.university_id, new.email, new.phone);
+    END
+    """,
+]
+
+students_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+# None = not checked yet in this process, see fts_enabled()
+_fts_ready = None
+
+
+def create_student_fts(conn):
+    """Create the FTS table and triggers on an open connection (idempotent).
+
+    Raises OperationalError when SQLite was built without FTS5.
+    """
+    is_new = not inspect(conn).has_table(FTS_TABLE)
+    for stmt in CREATE_STATEMENTS:
+        conn.execute(text(stmt))
+    if is_new:
+        # index the rows that existed before the triggers
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def ensure_student_fts(bind=engine) -> bool:
+    """Create the FTS table and its triggers if missing.
+
+    Returns False (and leaves search on the LIKE fallback) when the
+    students table does not exist yet or SQLite was built without FTS5.
+    """
+    global _fts_ready
+
+    if not inspect(bind).has_table("students"):
+        return False
+
+    try:
+        with bind.begin() as conn:
+            create_student_fts(conn)
+    except OperationalError:
+        # e.g. "no such module: fts5"
+        _fts_ready = False
+        return False
+
+    _fts_ready = True
+    return True
+
+
+def fts_enabled(db) -> bool:
+    """Whether the index exists in this database (checked once per process)."""
+    global _fts_ready
+
+    if _fts_ready is None:
+        _fts_ready = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first() is not None
+    return _fts_ready
+
+
+def rebuild_student_fts(bind=engine):
+    """Re-index every student from scratch (repairs a stale index)."""
+    ensure_student_fts(bind)
+    with bind.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')"))
+
+
+def fts_phrase(search_text: str) -> str:
+    """Quote user text as one FTS5 phrase (substring match with trigrams)."""
+    return '"' + search_text.replace('"', '""') + '"'
+
+
+def apply_student_search(query, search_text: str):
+    """Filter a query over Student by search text, best matches first."""
+    if len(search_text) >= MIN_FTS_TERM_LENGTH and fts_enabled(query.session):
+        return (
+            query.join(students_fts, students_fts.c.rowid == Student.id)
+            .filter(literal_column(FTS_TABLE).op("MATCH")(fts_phrase(search_text)))
+            .order_by(students_fts.c.rank, Student.id)
+        )
+
+    like = f"%{search_text}%"
+    return query.filter(
+        (Student.full_name.ilike(like)) |
+        (Student.university_id.ilike(like)) |
+        (Student.email.ilike(like)) |
+        (Student.phone.ilike(like))
+    ).order_by(Student.id)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "create"
+
+    if command == "rebuild":
+        print("Rebuilding students full-text index...")
+        rebuild_student_fts()
+        print("Done.")
+    elif command == "create":
+        if ensure_student_fts():
+            print("Students full-text index is ready.")
+        else:
+            print("Could not create the index (missing students table or FTS5 support).")
+    else:
+        print("Usage: python student_search.py [create|rebuild]")
+        sys.exit(1)
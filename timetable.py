@@ -0,0 +1,345 @@
+# timetable.py
+"""
+Weekly meeting slots and time-clash detection.
+
+A course meets in slots (day, start, end, room) every week of the term
+it runs. Two registrations of a student in the same term clash when any
+of their slots overlap: same day, and each starts before the other ends
+(end times are exclusive, so 09:00-10:30 and 10:30-12:00 do not clash).
+
+The index is the week mask of each course: one bit per minute of the
+week that the course meets in (a Python int of 7 x 1440 bits). Whether a
+course fits a student's timetable is `mask & other_mask` for each of
+their few registrations that term, whatever the slot count or lengths.
+The semester report is one pass over the term's registrations ordered by
+student, keeping the union of the masks seen so far: only a course that
+hits the union is compared with the student's earlier courses.
+
+The masks live in a process-wide SlotIndex, loaded with one SELECT and
+dropped when a session commits a change to course slots (like
+reference_cache).
+
+Only registrations that hold a seat count (see seat_allocation.py):
+waitlisted and withdrawn students do not attend.
+
+Headless usage:
+    python timetable.py report --year 2025/2026 --semester 1 [--csv clashes.csv]
+"""
+import argparse
+import csv
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import groupby
+
+from sqlalchemy import bindparam, event, func, literal_column, select
+
+from database import SessionLocal, session_scope
+from models import Student, Course, CourseSlot, Enrollment
+from seat_allocation import holding_seat, same_term
+
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MINUTES_PER_DAY = 24 * 60
+
+_SLOT_PATTERN = re.compile(
+    r"^\s*(?P<day>[A-Za-z]{3})[a-z]*\s+(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})"
+    r"(?:\s+(?P<room>.+?))?\s*$"
+)
+
+# a student's seat-holding registrations in a term; built once, since building
+# the statement costs several times more than running it
+_TERM_SCHEDULE = select(Enrollment.id, Enrollment.course_id).where(
+    Enrollment.student_id == bindparam("student_id"),
+    func.coalesce(Enrollment.academic_year, literal_column("''")) == bindparam("academic_year"),
+    func.coalesce(Enrollment.semester, literal_column("0")) == bindparam("semester"),
+    holding_seat(),
+)
+
+_lock = threading.Lock()
+_index = None
+_version = 0        # bumped by invalidate(), so a load that raced it is not kept
+
+
+# ---------- Slots as text ("Mon 09:00-10:30 B12") ----------
+
+def parse_time(text: str) -> int:
+    hours, minutes = (int(part) for part in text.split(":"))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time: {text!r}")
+    return hours * 60 + minutes
+
+
+def format_time(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def format_slot(slot: dict) -> str:
+    text = f"{DAYS[slot['day']]} {format_time(slot['start'])}-{format_time(slot['end'])}"
+    return f"{text} {slot['room']}" if slot.get("room") else text
+
+
+def format_slots(slots) -> str:
+    return "; ".join(format_slot(slot) for slot in slots)
+
+
+def validate_slot(slot: dict) -> dict:
+    """{"day", "start", "end", "room"} checked and normalized; ValueError if invalid."""
+    try:
+        day, start, end = int(slot["day"]), int(slot["start"]), int(slot["end"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"A slot needs day, start and end: {slot!r}") from None
+    if not 0 <= day < len(DAYS):
+        raise ValueError(f"Invalid day {day} (0 = Monday ... 6 = Sunday)")
+    if not 0 <= start < end <= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid slot time {format_time(start)}-{format_time(end)}")
+    room = (slot.get("room") or "").strip() or None
+    return {"day": day, "start": start, "end": end, "room": room}
+
+
+def parse_slots(text: str) -> list:
+    """"Mon 09:00-10:30 B12; Wed 09:00-10:30" -> slot dicts; ValueError if malformed."""
+    slots = []
+    for part in filter(None, (p.strip() for p in text.split(";"))):
+        match = _SLOT_PATTERN.match(part)
+        day = match and match["day"].title()
+        if not match or day not in DAYS:
+            raise ValueError(f"Cannot read slot {part!r} (expected e.g. 'Mon 09:00-10:30 B12')")
+        slots.append(validate_slot({
+            "day": DAYS.index(day),
+            "start": parse_time(match["start"]),
+            "end": parse_time(match["end"]),
+            "room": match["room"],
+        }))
+    return slots
+
+
+def week_mask(slots) -> int:
+    """One bit per minute of the week covered by `slots` (day, start, end, ...)."""
+    mask = 0
+    for day, start, end, *_ in slots:
+        mask |= ((1 << (end - start)) - 1) << (day * MINUTES_PER_DAY + start)
+    return mask
+
+
+def _overlap(a, b) -> bool:
+    return a[0] == b[0] and a[1] < b[2] and b[1] < a[2]
+
+
+# ---------- Index ----------
+
+class SlotIndex:
+    """Read-only snapshot of every course's slots and week mask."""
+
+    def __init__(self, rows):
+        # rows: (course_id, code, day, start, end, room)
+        self.codes = {}
+        self.slots = {}         # course_id -> [(day, start, end, room)]
+        for course_id, code, day, start, end, room in rows:
+            self.codes[course_id] = code
+            self.slots.setdefault(course_id, []).append((day, start, end, room))
+        self.masks = {course_id: week_mask(slots) for course_id, slots in self.slots.items()}
+
+    def clashes_between(self, course_id, other_id) -> list:
+        """The overlapping slot pairs of two courses, as dicts for display."""
+        found = []
+        for mine in self.slots.get(course_id, ()):
+            for theirs in self.slots.get(other_id, ()):
+                if _overlap(mine, theirs):
+                    found.append({
+                        "course_id": other_id,
+                        "code": self.codes.get(other_id),
+                        "day": DAYS[mine[0]],
+                        "time": f"{format_time(max(mine[1], theirs[1]))}-"
+                                f"{format_time(min(mine[2], theirs[2]))}",
+                    })
+        return found
+
+
+def load(db) -> SlotIndex:
+    return SlotIndex(db.execute(
+        select(CourseSlot.course_id, Course.code, CourseSlot.day,
+               CourseSlot.start_minute, CourseSlot.end_minute, CourseSlot.room)
+        .join(Course, Course.id == CourseSlot.course_id)
+    ).all())
+
+
+def get(db=None) -> SlotIndex:
+    """The cached index, loaded first if needed (safe from worker threads)."""
+    global _index
+
+    index = _index
+    if index is not None:
+        return index
+
+    version = _version
+    if db is not None:
+        index = load(db)
+    else:
+        with SessionLocal() as session:
+            index = load(session)
+
+    with _lock:
+        if _version == version:
+            _index = index
+    return index
+
+
+def invalidate():
+    global _index, _version
+    with _lock:
+        _index = None
+        _version += 1
+
+
+# ---------- One registration ----------
+
+def find_clashes(db, student_id: int, course_id: int, academic_year, semester,
+                 exclude_enrollment_id=None) -> list:
+    """What `course_id` would clash with in the student's timetable for that term."""
+    index = get(db)
+    proposed = index.masks.get(course_id)
+    if not proposed:
+        return []
+
+    schedule = db.execute(_TERM_SCHEDULE, {
+        "student_id": student_id, "academic_year": academic_year or "", "semester": semester or 0,
+    })
+    clashes = []
+    for enrollment_id, other_id in schedule:
+        if enrollment_id == exclude_enrollment_id or other_id == course_id:
+            continue
+        if index.masks.get(other_id, 0) & proposed:
+            clashes.extend(index.clashes_between(course_id, other_id))
+    return clashes
+
+
+def describe(clashes) -> str:
+    return "; ".join(f"{c['code']} ({c['day']} {c['time']})" for c in clashes)
+
+
+# ---------- Whole term ----------
+
+@dataclass
+class ClashReport:
+    academic_year: str
+    semester: int
+    enrollments: int = 0            # seat-holding registrations in the term
+    students: int = 0
+    students_with_clashes: int = 0
+    # (university_id, full_name, course code, other course code, day, time)
+    clashes: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.academic_year} semester {self.semester}: {self.enrollments:,} registrations "
+            f"of {self.students:,} students, {self.students_with_clashes:,} students with "
+            f"{len(self.clashes):,} clashes ({self.seconds:.2f}s)"
+        )
+
+
+def clash_report(db, academic_year, semester) -> ClashReport:
+    """Every clash in a term: one pass over its registrations, grouped by student."""
+    started = time.perf_counter()
+    report = ClashReport(academic_year, semester)
+    index = get(db)
+    masks = index.masks
+
+    rows = db.execute(
+        select(Enrollment.student_id, Enrollment.course_id)
+        .where(same_term(academic_year, semester), holding_seat())
+        .order_by(Enrollment.student_id)
+    )
+    found = []      # (student_id, course_a, course_b)
+    for student_id, group in groupby(rows, key=lambda r: r[0]):
+        report.students += 1
+        seen, union, clashing = [], 0, False
+        for _, course_id in group:
+            report.enrollments += 1
+            mask = masks.get(course_id, 0)
+            if union & mask:
+                for earlier, earlier_mask in seen:
+                    if earlier_mask & mask and earlier != course_id:
+                        found.append((student_id, earlier, course_id))
+                        clashing = True
+            union |= mask
+            seen.append((course_id, mask))
+        report.students_with_clashes += clashing
+
+    names = _student_names(db, {student_id for student_id, _, _ in found})
+    for student_id, a, b in found:
+        university_id, full_name = names.get(student_id, (None, None))
+        for clash in index.clashes_between(a, b):
+            report.clashes.append(
+                (university_id, full_name, index.codes[a], clash["code"], clash["day"], clash["time"])
+            )
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _student_names(db, student_ids, chunk=500) -> dict:
+    ids = sorted(student_ids)
+    names = {}
+    for start in range(0, len(ids), chunk):
+        names.update({
+            r[0]: (r[1], r[2]) for r in db.execute(
+                select(Student.id, Student.university_id, Student.full_name)
+                .where(Student.id.in_(ids[start:start + chunk]))
+            )
+        })
+    return names
+
+
+# ---------- Automatic invalidation ----------
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_slot_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (CourseSlot, Course)):
+            session.info["slots_changed"] = True
+            return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("slots_changed", False):
+        invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("slots_changed", None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timetable clash report for one term.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report", help="list every clash in a term")
+    report_parser.add_argument("--year", required=True, help="academic year, e.g. 2025/2026")
+    report_parser.add_argument("--semester", type=int, required=True)
+    report_parser.add_argument("--csv", help="write the clashes to this CSV file")
+    args = parser.parse_args(argv)
+
+    with session_scope() as db:
+        report = clash_report(db, args.year, args.semester)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["University ID", "Name", "Course", "Clashes With", "Day", "Time"])
+            writer.writerows(report.clashes)
+    else:
+        for row in report.clashes[:50]:
+            print("  ".join(str(value) for value in row))
+        if len(report.clashes) > 50:
+            print(f"... {len(report.clashes) - 50:,} more (use --csv)")
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())